@@ -1,15 +1,280 @@
+import datetime
+import functools
+import hashlib
+import json
+from typing import Any, List, Optional, Tuple
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
+from django.db.models import Count, F, Q, Window
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import OrderBy
 import graphene
 from graphene import relay
 from graphene.utils.str_converters import to_snake_case
 from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.utils import maybe_queryset
+from graphql import GraphQLError
+from graphql_relay import get_offset_with_default, offset_to_cursor
+from graphql_relay.utils import base64, unbase64
+from promise import Promise
+
+_KEYSET_ALIAS = "_graphene_django_plus_keyset_{}"
+_WINDOW_COUNT_ALIAS = "_graphene_django_plus_total_count"
+
+
+def _get_keyset_ordering(qs: models.QuerySet) -> List[Tuple[str, bool]]:
+    """Get the ordering of the queryset as a list of (lookup, descending).
+
+    The primary key is appended to it to make the ordering unique.
+
+    """
+    ordering = qs.query.order_by
+    if not ordering and qs.query.default_ordering:
+        ordering = qs.model._meta.ordering
+
+    pk = qs.model._meta.pk
+    keys = []
+    for o in ordering:
+        if isinstance(o, str) and o != "?":
+            keys.append((o.lstrip("-"), o.startswith("-")))
+        elif isinstance(o, OrderBy) and isinstance(o.expression, F):
+            keys.append((o.expression.name, o.descending))
+        else:
+            raise GraphQLError(f"Keyset pagination does not support ordering by {o!r}")
+
+    if not any(k in ["pk", pk.name, pk.attname] for k, _ in keys):
+        keys.append(("pk", False))
+
+    return keys
+
+
+def _is_keyset_nullable(model, lookup: str, output_field) -> bool:
+    """Check if the values ordered by `lookup` can be `NULL`.
+
+    Besides nullable fields, the lookups going through a nullable or a
+    multi-valued relation are `NULL` when the relation is empty.
+
+    """
+    if getattr(output_field, "null", True):
+        return True
+
+    opts = model._meta
+    for name in lookup.split(LOOKUP_SEP)[:-1]:
+        try:
+            field = opts.pk if name == "pk" else opts.get_field(name)
+        except FieldDoesNotExist:
+            return True
+        if not field.is_relation:
+            break
+        if field.null or not field.concrete or field.many_to_many:
+            return True
+        opts = field.related_model._meta
+
+    return False
+
+
+def _get_keyset_q(keys: List[Tuple[str, bool, bool]], values: List[Any], before: bool) -> Q:
+    """Get the lookup for the objects after (or before) the given values.
+
+    `NULL` values are considered greater than any other value, matching
+    PostgreSQL's default ordering.
+
+    """
+    cond = None
+    for (alias, desc, null), value in reversed(list(zip(keys, values))):
+        if desc != before:
+            after = (
+                Q(**{f"{alias}__isnull": False}) if value is None else Q(**{f"{alias}__lt": value})
+            )
+        elif value is None:
+            after = Q(pk__in=[])
+        else:
+            after = Q(**{f"{alias}__gt": value})
+            if null:
+                after |= Q(**{f"{alias}__isnull": True})
+
+        if cond is None:
+            cond = after
+        else:
+            equal = Q(**{f"{alias}__isnull": True}) if value is None else Q(**{alias: value})
+            cond = after | (equal & cond)
+
+    # Restricting the first column by itself allows the database to use its index
+    alias, desc, null = keys[0]
+    if values[0] is not None and not null:
+        cond &= Q(**{f"{alias}__lte" if desc != before else f"{alias}__gte": values[0]})
+
+    assert cond is not None
+    return cond
+
+
+class _KeysetEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder truncates them to milliseconds
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _get_keyset_cursor(values: List[Any]) -> str:
+    return base64(json.dumps(values, cls=_KeysetEncoder))
+
+
+def _get_keyset_values(cursor: str, length: int) -> List[Any]:
+    try:
+        values = json.loads(unbase64(cursor))
+    except ValueError:
+        values = None
+
+    if not isinstance(values, list) or len(values) != length:
+        raise GraphQLError(f"Invalid cursor: {cursor}")
+
+    return values
+
+
+class TotalCountStrategy:
+    """Strategy used by :class:`CountableConnection` to get its total count.
+
+    Subclasses should implement :meth:`get_total_count`, and may annotate the
+    page's queryset in :meth:`prepare_page` to retrieve the count with it.
+
+    """
+
+    def prepare_page(self, qs: models.QuerySet) -> models.QuerySet:
+        """Prepare the queryset that will be sliced to get the page's nodes."""
+        return qs
+
+    def get_total_count(self, connection: relay.Connection, info) -> Optional[int]:
+        """Get the total count of objects in the connection."""
+        raise NotImplementedError
+
+
+class ExactCount(TotalCountStrategy):
+    """Count the objects with a `COUNT(*)` query, when it is requested."""
+
+    def get_total_count(self, connection, info):
+        if hasattr(connection, "length"):
+            return connection.length
+
+        return connection.iterable.count()
+
+
+class WindowCount(ExactCount):
+    """Fetch the count with the page's nodes using a `COUNT(*) OVER()` column.
+
+    Falls back to a `COUNT(*)` query if the page is empty or was not
+    fetched with the count.
+
+    """
+
+    def prepare_page(self, qs):
+        if qs.query.distinct or qs.query.combinator:
+            return qs
+        return qs.annotate(**{_WINDOW_COUNT_ALIAS: Window(Count("*"))})
+
+    def get_total_count(self, connection, info):
+        if connection.edges:
+            count = getattr(connection.edges[0].node, _WINDOW_COUNT_ALIAS, None)
+            if count is not None:
+                return count
+
+        return super().get_total_count(connection, info)
+
+
+class CachedCount(ExactCount):
+    """Cache the count in django's cache for `timeout` seconds.
+
+    The cache key is generated from the queryset's SQL, which contains its
+    filter arguments (including the ones filtering the objects the user is
+    allowed to see).
+
+    :param timeout: the number of seconds to cache the count for
+    :param cache_alias: the django cache to use
+
+    """
+
+    def __init__(self, timeout: int = 60, cache_alias: str = DEFAULT_CACHE_ALIAS):
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+
+    def get_total_count(self, connection, info):
+        qs = connection.iterable
+        try:
+            sql, params = qs.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+
+        digest = hashlib.sha256(f"{qs.db}:{sql}:{params!r}".encode()).hexdigest()
+        key = f"graphene_django_plus:count:{qs.model._meta.label_lower}:{digest}"
+        cache = caches[self.cache_alias]
+        count = cache.get(key)
+        if count is None:
+            count = super().get_total_count(connection, info)
+            cache.set(key, count, self.timeout)
+
+        return count
+
+
+class EstimatedCount(ExactCount):
+    """Return PostgreSQL's row estimate for unfiltered querysets.
+
+    The estimate comes from the table statistics, which are updated by
+    `ANALYZE`, so it may be off from the exact count. Filtered querysets,
+    other databases and tables not analyzed yet fall back to an exact count.
+
+    :param threshold: use the exact count if the estimate is lower than this
+
+    """
+
+    def __init__(self, threshold: int = 1000):
+        self.threshold = threshold
+
+    def get_total_count(self, connection, info):
+        qs = connection.iterable
+        query = qs.query
+        if (
+            connections[qs.db].vendor == "postgresql"
+            and not query.where
+            and not query.distinct
+            and not query.combinator
+            and not query.is_sliced
+        ):
+            with connections[qs.db].cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [qs.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row is not None and row[0] >= self.threshold:
+                return row[0]
+
+        return super().get_total_count(connection, info)
 
 
 class CountableConnection(relay.Connection):
-    """Connection that provides a total_count attribute."""
+    """Connection that provides a total_count attribute.
+
+    The count is retrieved by the :class:`TotalCountStrategy` set in the
+    connection's `total_count_strategy` attribute, which can be changed in
+    subclasses::
+
+        class CachedCountableConnection(CountableConnection):
+            class Meta:
+                abstract = True
+
+            total_count_strategy = CachedCount(timeout=300)
+
+    """
 
     class Meta:
         abstract = True
 
+    #: The strategy used to retrieve the total count.
+    total_count_strategy: TotalCountStrategy = ExactCount()
+
     #: Total objects count in the query.
     total_count = graphene.Int(
         description="The total count of objects in this query.",
@@ -17,16 +282,27 @@ class CountableConnection(relay.Connection):
 
     @staticmethod
     def resolve_total_count(parent, info, **kwargs):
-        if hasattr(parent, "length"):
-            return parent.length
-
-        return parent.iterable.count()  # pragma:nocover
+        return parent.total_count_strategy.get_total_count(parent, info)
 
 
 class OrderableConnectionField(DjangoFilterConnectionField):
-    """Filter connection with ordering functionality."""
+    """Filter connection with ordering functionality.
+
+    When `keyset=True`, the connection is paginated by seeking instead of
+    using offsets. The cursors will contain the values of the ordering
+    columns (plus the primary key) of their node, and `after`/`before`
+    will filter the objects that come after/before those values, which
+    can make use of the indexes on those columns. The `offset` argument
+    is not supported in this mode.
+
+    In both modes the objects are not counted to paginate them. The total
+    count is only retrieved when requested, by the connection's
+    `total_count_strategy` (see :class:`CountableConnection`).
+
+    """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, keyset: bool = False, **kwargs):
+        self.keyset = keyset
         return super().__init__(
             *args,
             **kwargs,
@@ -53,3 +329,204 @@ class OrderableConnectionField(DjangoFilterConnectionField):
             qs = qs.order_by(*[to_snake_case(o) for o in order])
 
         return qs
+
+    @classmethod
+    def resolve_connection(cls, connection, args, iterable, max_limit=None):
+        """Resolve the connection slicing the queryset by offsets.
+
+        Different from graphene-django, the objects are not counted to slice
+        the page (unless paginating backwards without a `before` cursor),
+        leaving that to the connection's `total_count_strategy` when the
+        total count is requested.
+
+        """
+        qs = maybe_queryset(iterable)
+        if not isinstance(qs, models.QuerySet) or (
+            args.get("last") is not None and args.get("before") is None
+        ):
+            return super().resolve_connection(connection, args, iterable, max_limit=max_limit)
+
+        first = args.get("first")
+        last = args.get("last")
+        if max_limit is not None and first is None and last is None:
+            first = max_limit
+        for name, value in [("first", first), ("last", last)]:
+            if value is not None and value < 0:
+                raise GraphQLError(f"Argument '{name}' must be a non-negative integer.")
+
+        # Convert the offset parameter to an after cursor, like graphene-django
+        lower = get_offset_with_default(args.get("after"), -1) + 1
+        offset = args.pop("offset", None)
+        if offset:
+            lower += offset
+        upper = get_offset_with_default(args.get("before"), None)
+
+        start, end = lower, upper
+        if first is not None:
+            end = lower + first if end is None else min(end, lower + first)
+        if last is not None:
+            start = max(start, end - last)
+
+        strategy = getattr(connection, "total_count_strategy", None)
+        page = strategy.prepare_page(qs) if strategy is not None else qs
+        if end is None:
+            nodes = list(page[start:])
+            has_next_page = False
+        else:
+            # Fetch an extra object to know if there is a next page
+            fetch_extra = first is not None and (upper is None or end < upper)
+            stop = max(end, start) + int(fetch_extra)
+            nodes = list(page[start:stop])
+            has_next_page = first is not None and (
+                len(nodes) > end - start if fetch_extra else end < upper
+            )
+            nodes = nodes[: max(end - start, 0)]
+
+        edges = [
+            connection.Edge(node=node, cursor=offset_to_cursor(start + i))
+            for i, node in enumerate(nodes)
+        ]
+        ret = connection(
+            edges=edges,
+            page_info=relay.PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=last is not None and start > lower,
+                has_next_page=has_next_page,
+            ),
+        )
+        ret.iterable = qs
+        return ret
+
+    @classmethod
+    def resolve_keyset_connection(cls, connection, args, iterable, max_limit=None):
+        first = args.get("first")
+        last = args.get("last")
+        after = args.get("after")
+        before = args.get("before")
+        if max_limit is not None and first is None and last is None:
+            first = max_limit
+
+        qs = maybe_queryset(iterable)
+        if not isinstance(qs, models.QuerySet):
+            raise GraphQLError("Keyset pagination can only be used with querysets")
+
+        ordering = _get_keyset_ordering(qs)
+        qs = qs.annotate(
+            **{_KEYSET_ALIAS.format(i): F(lookup) for i, (lookup, _) in enumerate(ordering)}
+        )
+        keys = []
+        for i, (lookup, desc) in enumerate(ordering):
+            alias = _KEYSET_ALIAS.format(i)
+            output_field = getattr(qs.query.annotations[alias], "output_field", None)
+            keys.append((alias, desc, _is_keyset_nullable(qs.model, lookup, output_field)))
+
+        page = qs
+        if after is not None:
+            page = page.filter(_get_keyset_q(keys, _get_keyset_values(after, len(keys)), False))
+        if before is not None:
+            page = page.filter(_get_keyset_q(keys, _get_keyset_values(before, len(keys)), True))
+
+        order_by = []
+        for alias, desc, null in keys:
+            # Paginating backwards, get the last objects in the reversed order
+            if desc == (last is not None and first is None):
+                order_by.append(F(alias).asc(nulls_last=True) if null else F(alias).asc())
+            else:
+                order_by.append(F(alias).desc(nulls_first=True) if null else F(alias).desc())
+        page = page.order_by(*order_by)
+
+        has_previous_page = after is not None
+        has_next_page = before is not None
+        if first is not None:
+            nodes = list(page[: first + 1])
+            has_next_page = len(nodes) > first
+            nodes = nodes[:first]
+            if last is not None and len(nodes) > last:
+                has_previous_page = True
+                nodes = nodes[-last:]
+        elif last is not None:
+            nodes = list(page[: last + 1])
+            has_previous_page = len(nodes) > last
+            nodes = nodes[:last][::-1]
+        else:
+            nodes = list(page)
+
+        edges = [
+            connection.Edge(
+                node=node,
+                cursor=_get_keyset_cursor([getattr(node, alias) for alias, _, _ in keys]),
+            )
+            for node in nodes
+        ]
+        ret = connection(
+            edges=edges,
+            page_info=relay.PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_previous_page,
+                has_next_page=has_next_page,
+            ),
+        )
+        ret.iterable = qs
+        return ret
+
+    @classmethod
+    def keyset_connection_resolver(
+        cls,
+        resolver,
+        connection,
+        default_manager,
+        queryset_resolver,
+        max_limit,
+        enforce_first_or_last,
+        root,
+        info,
+        **args,
+    ):
+        first = args.get("first")
+        last = args.get("last")
+        if args.get("offset") is not None:
+            raise GraphQLError(
+                f"The `{info.field_name}` connection does not support the `offset` argument",
+            )
+        if enforce_first_or_last and not (first or last):
+            raise GraphQLError(
+                f"You must provide a `first` or `last` value to properly paginate the "
+                f"`{info.field_name}` connection.",
+            )
+        if max_limit and max(first or 0, last or 0) > max_limit:
+            raise GraphQLError(
+                f"Requesting {max(first or 0, last or 0)} records on the `{info.field_name}` "
+                f"connection exceeds the limit of {max_limit} records.",
+            )
+
+        iterable = resolver(root, info, **args)
+        if iterable is None:
+            iterable = default_manager
+        iterable = queryset_resolver(connection, iterable, info, args)
+        on_resolve = functools.partial(
+            cls.resolve_keyset_connection,
+            connection,
+            args,
+            max_limit=max_limit,
+        )
+
+        if Promise.is_thenable(iterable):
+            return Promise.resolve(iterable).then(on_resolve)
+
+        return on_resolve(iterable)
+
+    def wrap_resolve(self, parent_resolver):
+        if self.keyset:
+            return functools.partial(
+                self.keyset_connection_resolver,
+                parent_resolver,
+                self.connection_type,
+                self.get_manager(),
+                self.get_queryset_resolver(),
+                self.max_limit,
+                self.enforce_first_or_last,
+            )
+
+        return super().wrap_resolve(parent_resolver)
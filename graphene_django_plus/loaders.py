@@ -0,0 +1,239 @@
+"""Request scoped loaders that batch and memoize database lookups.
+
+:class:`NodeLoader` is used by :meth:`ModelType.get_node
+<graphene_django_plus.types.ModelType.get_node>` to fetch relay nodes. When a
+node is not loaded yet, the ids requested by the node fields next to the one
+being resolved (e.g. aliases of the same field) are collected as well, and
+all of them are fetched with a single `pk__in` query passing through the
+type's `get_queryset`. The results are memoized for the rest of the request.
+
+When running inside an event loop, :meth:`NodeLoader.aload` fetches the
+nodes with Django's async ORM instead. Concurrent loads of the same node
+wait for the query that is already fetching it.
+
+"""
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Type
+
+from asgiref.sync import sync_to_async
+from django.db import models
+from graphql import (
+    FieldNode,
+    GraphQLError,
+    SelectionSetNode,
+    get_named_type,
+    is_abstract_type,
+)
+from graphql.execution.values import get_argument_values
+from graphql_relay import from_global_id
+
+from .planner import _Planner, disable_planning, get_query_plan
+
+if TYPE_CHECKING:  # pragma: nocover
+    from .types import ModelType, ResolverInfo
+
+_LOADER_ATTR = "_graphene_django_plus_node_loader"
+
+
+def _get_parent_selection_set(info: "ResolverInfo") -> Optional[SelectionSetNode]:
+    target = info.field_nodes[0]
+    stack = [info.operation.selection_set]
+    stack.extend(f.selection_set for f in info.fragments.values())
+    while stack:
+        selection_set = stack.pop()
+        for selection in selection_set.selections:
+            if selection is target:
+                return selection_set
+            if getattr(selection, "selection_set", None) is not None:
+                stack.append(selection.selection_set)
+    return None  # pragma: nocover
+
+
+def _get_sibling_pks(
+    graphene_type: Type["ModelType"],
+    info: "ResolverInfo",
+) -> Tuple[List[Any], List[FieldNode]]:
+    """Get the pks of the type requested by the sibling node fields.
+
+    Returns the pks and the field nodes requesting them.
+
+    """
+    selection_set = _get_parent_selection_set(info)
+    if selection_set is None:  # pragma: nocover
+        return [], []
+
+    schema = info.schema
+    gql_type = schema.get_type(graphene_type._meta.name)
+    parent_type = info.parent_type
+    pks = []
+    nodes = []
+    for node in _Planner(info).iter_fields([selection_set], parent_type):
+        field_def = parent_type.fields.get(node.name.value)
+        if field_def is None or "id" not in field_def.args:
+            continue
+
+        return_type = get_named_type(field_def.type)
+        if return_type is not gql_type and not (
+            is_abstract_type(return_type) and schema.is_sub_type(return_type, gql_type)
+        ):
+            continue
+
+        try:
+            global_id = get_argument_values(field_def, node, info.variable_values).get("id")
+            type_name, pk = from_global_id(global_id)
+        except (GraphQLError, TypeError, ValueError):
+            continue
+
+        if type_name == graphene_type._meta.name:
+            pks.append(pk)
+            nodes.append(node)
+
+    return pks, nodes
+
+
+class NodeLoader:
+    """Batch and memoize node lookups, keyed by (type, pk)."""
+
+    def __init__(self):
+        self._cache: Dict[Tuple[Type["ModelType"], Any], Optional[models.Model]] = {}
+        self._pending: Dict[Tuple[Type["ModelType"], Any], asyncio.Future] = {}
+
+    def clear(self):
+        """Clear all memoized nodes."""
+        self._cache.clear()
+
+    def load(
+        self,
+        graphene_type: Type["ModelType"],
+        info: "ResolverInfo",
+        pk: Any,
+    ) -> Optional[models.Model]:
+        """Load the node of the given type and pk.
+
+        Returns `None` if the node does not exist or was filtered out by the
+        type's `get_queryset`.
+
+        """
+        pk = graphene_type._meta.model._meta.pk.to_python(pk)
+        key = (graphene_type, pk)
+        if key in self._cache:
+            return self._cache[key]
+
+        pks, field_nodes = self._get_pks(graphene_type, info, pk)
+        qs = self._get_queryset(graphene_type, info, pks, field_nodes)
+        self._store(graphene_type, info, pks, list(qs))
+        return self._cache[key]
+
+    async def aload(
+        self,
+        graphene_type: Type["ModelType"],
+        info: "ResolverInfo",
+        pk: Any,
+    ) -> Optional[models.Model]:
+        """Load the node of the given type and pk using Django's async ORM.
+
+        The same as :meth:`.load`, but the permission checks of the type's
+        `get_queryset` run in a thread while the query itself is awaited.
+
+        """
+        pk = graphene_type._meta.model._meta.pk.to_python(pk)
+        key = (graphene_type, pk)
+        if key in self._cache:
+            return self._cache[key]
+        if key in self._pending:
+            return await self._pending[key]
+
+        pks, field_nodes = self._get_pks(graphene_type, info, pk)
+        pks = {p for p in pks if (graphene_type, p) not in self._pending}
+        loop = asyncio.get_running_loop()
+        futures = {p: loop.create_future() for p in pks}
+        self._pending.update(((graphene_type, p), f) for p, f in futures.items())
+        try:
+            qs = await sync_to_async(self._get_queryset)(graphene_type, info, pks, field_nodes)
+            self._store(graphene_type, info, pks, [obj async for obj in qs])
+        except Exception as e:
+            for f in futures.values():
+                f.set_exception(e)
+                # Avoid "exception was never retrieved" warnings
+                f.exception()
+            raise
+        else:
+            for p, f in futures.items():
+                f.set_result(self._cache[(graphene_type, p)])
+        finally:
+            for p in pks:
+                self._pending.pop((graphene_type, p), None)
+
+        return self._cache[key]
+
+    def _get_pks(
+        self,
+        graphene_type: Type["ModelType"],
+        info: "ResolverInfo",
+        pk: Any,
+    ) -> Tuple[Set[Any], Optional[List[FieldNode]]]:
+        pk_field = graphene_type._meta.model._meta.pk
+        pks: Set[Any] = {pk}
+        field_nodes = None
+        sibling_pks, sibling_nodes = _get_sibling_pks(graphene_type, info)
+        for sibling_pk in sibling_pks:
+            try:
+                sibling_pk = pk_field.to_python(sibling_pk)
+            except Exception:
+                continue
+            if (graphene_type, sibling_pk) not in self._cache:
+                pks.add(sibling_pk)
+
+        if len(sibling_nodes) > 1:
+            # The plan should contain the fields selected by all siblings
+            field_nodes = sibling_nodes
+
+        return pks, field_nodes
+
+    def _get_queryset(
+        self,
+        graphene_type: Type["ModelType"],
+        info: "ResolverInfo",
+        pks: Set[Any],
+        field_nodes: Optional[List[FieldNode]] = None,
+    ) -> models.QuerySet:
+        model = graphene_type._meta.model
+        with disable_planning():
+            qs = graphene_type.get_queryset(model.objects, info)
+        if isinstance(qs, models.Manager):
+            qs = qs.get_queryset()
+
+        plan = get_query_plan(graphene_type, info, field_nodes=field_nodes)
+        if plan is not None:
+            qs = plan.apply(qs, info)
+
+        return qs.filter(pk__in=pks)
+
+    def _store(
+        self,
+        graphene_type: Type["ModelType"],
+        info: "ResolverInfo",
+        pks: Set[Any],
+        objs: List[models.Model],
+    ):
+        instances = {obj.pk: obj for obj in objs}
+        graphene_type.prefetch_object_permissions(info, list(instances.values()))
+        for pk in pks:
+            self._cache[(graphene_type, pk)] = instances.get(pk)
+
+
+def get_node_loader(context=None) -> NodeLoader:
+    """Get the node loader for the request.
+
+    :param context: the request (`info.context`) to cache the loader in
+
+    """
+    if context is None:
+        return NodeLoader()
+
+    loader = getattr(context, _LOADER_ATTR, None)
+    if loader is None:
+        loader = NodeLoader()
+        setattr(context, _LOADER_ATTR, loader)
+
+    return loader
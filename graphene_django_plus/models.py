@@ -3,7 +3,18 @@ try:
 except ImportError:
     from collections import Iterable
 
-from typing import TYPE_CHECKING, List, Optional, Tuple, Type, TypeVar, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 try:
     from guardian.conf import settings as guardian_settings
@@ -17,10 +28,11 @@ except ImportError:  # pragma: no cover
 from django.apps import apps
 from django.contrib.auth.models import AbstractUser, AnonymousUser
 from django.db import models
-from django.db.models.query import QuerySet
+from django.db.models.query import QuerySet, prefetch_related_objects
 
 _T = TypeVar("_T", bound="GuardedModel")
 _TR = TypeVar("_TR", bound="GuardedRelatedModel")
+_CHECKER_ATTR = "_graphene_django_plus_perms_checker"
 
 
 def _separate_perms(
@@ -43,6 +55,89 @@ def _has_anonymous_user():
     return guardian_settings.ANONYMOUS_USER_NAME is not None
 
 
+class BatchedPermissionChecker:
+    """Object permission checker that prefetches permissions in batches.
+
+    Instances added through :meth:`.add` are not checked right away. The
+    first time the permissions of an instance of a given model are retrieved,
+    the permissions for all the pending instances of that model are
+    prefetched at once, making every other check for them a dict lookup.
+
+    """
+
+    def __init__(self, user: Union[AbstractUser, AnonymousUser]):
+        self.user = user
+        self.checker = ObjectPermissionChecker(user)
+        self._pending: Dict[Type[models.Model], Dict[Any, models.Model]] = {}
+
+    def add(self, instances: Iterable):
+        """Add instances to have their permissions prefetched when needed."""
+        for instance in instances:
+            self._pending.setdefault(type(instance), {}).setdefault(instance.pk, instance)
+
+    def prefetch_perms(self, instances: Iterable):
+        """Prefetch the permissions for the instances right away."""
+        instances = list(instances)
+        if not instances:
+            return
+
+        model = type(instances[0])
+        if issubclass(model, GuardedRelatedModel):
+            # Load the related objects in one query and make them pending so
+            # their permissions get prefetched once they are needed
+            prefetch_related_objects(instances, model.related_attr)
+            self.add(
+                r
+                for r in (getattr(i, model.related_attr) for i in instances)
+                if isinstance(r, GuardedModel)
+            )
+
+        self.checker.prefetch_perms(instances)
+
+    def prefetch_pending(self, model: Type[models.Model]):
+        """Prefetch the permissions for the pending instances of the model."""
+        pending = self._pending.pop(model, None)
+        if pending:
+            self.prefetch_perms(pending.values())
+
+    def get_perms(self, obj: models.Model) -> List[str]:
+        self.prefetch_pending(type(obj))
+        return self.checker.get_perms(obj)
+
+    def has_perm(self, perm: str, obj: models.Model) -> bool:
+        perm = perm.split(".", 1)[1] if "." in perm else perm
+        return perm in self.get_perms(obj)
+
+
+def get_perms_checker(
+    user: Union[AbstractUser, AnonymousUser]
+) -> Optional[BatchedPermissionChecker]:
+    """Get the object permission checker shared by the user's checks.
+
+    Instances added to it get their permissions prefetched together. It
+    lives in the user object until :func:`clear_perms_checker` is called,
+    which the GraphQL views do at the end of each request.
+
+    :param user: the user itself, which should be the request's user
+
+    """
+    if not has_guardian:
+        return None
+
+    checker = getattr(user, _CHECKER_ATTR, None)
+    if checker is None:
+        checker = BatchedPermissionChecker(user)
+        setattr(user, _CHECKER_ATTR, checker)
+
+    return checker
+
+
+def clear_perms_checker(user: Union[AbstractUser, AnonymousUser]):
+    """Clear the user's object permission checker and its cached permissions."""
+    if hasattr(user, _CHECKER_ATTR):
+        delattr(user, _CHECKER_ATTR)
+
+
 class GuardedModelManager(models.Manager[_T]):
     """Model manager that integrates with guardian to check for permissions."""
 
@@ -173,15 +268,16 @@ class GuardedModel(models.Model):
         user: Union[AbstractUser, AnonymousUser],
         perms: Union[str, List[str]],
         any_perm: bool = True,
-        checker: Optional["ObjectPermissionChecker"] = None,
+        checker: Optional[Union["ObjectPermissionChecker", BatchedPermissionChecker]] = None,
     ) -> bool:
         """Check if the user has the given permissions to this object.
 
         :param user: the user itself
         :param perms: a string or list of perms to check for
         :param any_perm: if any perm or all perms should be considered
-        :param checker: a `guardian.core.ObjectPermissionChecker` that
-            can be used to optimize performance in checking for permissions
+        :param checker: a `guardian.core.ObjectPermissionChecker` or a
+            :class:`BatchedPermissionChecker` that can be used to optimize
+            performance in checking for permissions
 
         """
         # No guardian means we are not checking perms
@@ -233,7 +329,7 @@ class GuardedRelatedModel(GuardedModel):
         user: Union[AbstractUser, AnonymousUser],
         perms: Union[str, List[str]],
         any_perm: bool = True,
-        checker: Optional["ObjectPermissionChecker"] = None,
+        checker: Optional[Union["ObjectPermissionChecker", BatchedPermissionChecker]] = None,
     ) -> bool:
         # No guardian means we are not checking perms
         if not has_guardian:
@@ -261,6 +357,9 @@ class GuardedRelatedModel(GuardedModel):
 
         if other_perms:
             assert self.related_attr is not None
+            if isinstance(checker, BatchedPermissionChecker):
+                # Make sure the related objects of the whole batch are loaded
+                checker.prefetch_pending(self.__class__)
             related = getattr(self, self.related_attr)
             other_check = lambda: related.has_perm(
                 user,
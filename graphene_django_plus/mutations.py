@@ -3,23 +3,38 @@
 
 import collections
 import collections.abc
+import contextlib
+import contextvars
+import copy
+import datetime
+import decimal
 import itertools
 from typing import (
     TYPE_CHECKING,
     Any,
     Dict,
     Generic,
+    Iterable,
     List,
     Optional,
+    Tuple,
     Type,
     TypeVar,
+    Union,
     cast,
 )
+import uuid
 
-from django.core.exceptions import NON_FIELD_ERRORS, ImproperlyConfigured
+from asgiref.sync import sync_to_async
+from django.core.exceptions import (
+    NON_FIELD_ERRORS,
+    FieldDoesNotExist,
+    ImproperlyConfigured,
+)
 from django.core.exceptions import PermissionDenied as DJPermissionDenied
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
+from django.db import connections, models, router, transaction
+from django.db.models.constants import LOOKUP_SEP
 from django.db.models.fields import NOT_PROVIDED
 from django.db.models.fields.reverse_related import ManyToManyRel, ManyToOneRel
 import graphene
@@ -30,23 +45,41 @@ from graphene.types.utils import yank_fields_from_attrs
 from graphene.utils.str_converters import to_camel_case, to_snake_case
 from graphene_django.converter import BlankValueField
 from graphene_django.registry import Registry, get_global_registry
+from graphene_django.types import DjangoObjectType
+from graphql import get_named_type
 from graphql.error import GraphQLError
+from graphql_relay import from_global_id, to_global_id
 
 from .exceptions import PermissionDenied
 from .input_types import get_input_field
-from .models import GuardedModel
-from .perms import check_authenticated, check_perms
+from .loaders import get_node_loader
+from .models import GuardedModel, clear_perms_checker, get_perms_checker
+from .perms import check_authenticated, check_perms, clear_perms_snapshot
+from .planner import _Planner, disable_planning, get_query_plan
 from .settings import graphene_django_plus_settings
 from .types import (
+    BulkMutationErrorType,
     MutationErrorType,
     ResolverInfo,
     UploadType,
     schema_for_field,
     schema_registry,
 )
-from .utils import get_model_fields, get_node, get_nodes, update_dict_nested
+from .utils import (
+    _is_async,
+    _resolve_graphene_type,
+    aget_node,
+    aget_nodes,
+    get_model_fields,
+    get_node,
+    get_nodes,
+    update_dict_nested,
+)
 
 _registry = get_global_registry()
+_ORIGINAL_ATTR = "_graphene_django_plus_original"
+_prefetched_nodes: "contextvars.ContextVar[Optional[Dict[Tuple[Type[models.Model], Any], Any]]]"
+_prefetched_nodes = contextvars.ContextVar("_prefetched_nodes", default=None)
 _T = TypeVar("_T", bound=models.Model)
 _M = TypeVar("_M", bound="BaseMutation")
 _MM = TypeVar("_MM", bound="ModelMutation")
@@ -72,7 +105,7 @@ def _get_output_fields(model, return_field_name, registry):
     return {return_field_name: f}
 
 
-def _get_validation_errors(validation_error):
+def _get_validation_errors(validation_error, error_type=MutationErrorType, **kwargs):
     e_list = []
 
     if hasattr(validation_error, "error_dict"):
@@ -83,11 +116,11 @@ def _get_validation_errors(validation_error):
                     field = None
                 else:
                     field = to_camel_case(field)
-                e_list.append(MutationErrorType(field=field, message=e))
+                e_list.append(error_type(field=field, message=e, **kwargs))
     else:
         # convert non-field errors
         for e in validation_error.error_list:
-            e_list.append(MutationErrorType(message=e.message))
+            e_list.append(error_type(message=e.message, **kwargs))
 
     return e_list
 
@@ -160,6 +193,195 @@ def _is_upload_field(field):
     return t == UploadType
 
 
+_INPUT_VALUE = "value"
+_INPUT_ID = "id"
+_INPUT_IDS = "ids"
+_INPUT_UPLOAD = "upload"
+
+
+def _get_input_plan(input_class, input_fields):
+    # Collect the fields the same way graphene does when creating the input
+    # type, which also inherits the ones declared in the mutation's `Input`
+    fields = {}
+    for base in reversed(getattr(input_class, "__mro__", ())):
+        fields.update(yank_fields_from_attrs(base.__dict__, _as=graphene.InputField))
+    fields.update(input_fields)
+
+    plan = []
+    for name, field in fields.items():
+        if _is_list_of_ids(field):
+            kind = _INPUT_IDS
+        elif _is_id_field(field):
+            kind = _INPUT_ID
+        elif _is_upload_field(field):
+            kind = _INPUT_UPLOAD
+        else:
+            kind = _INPUT_VALUE
+        plan.append((name, kind))
+
+    return tuple(plan)
+
+
+_IMMUTABLE_TYPES = (
+    type(None),
+    bool,
+    int,
+    float,
+    str,
+    bytes,
+    decimal.Decimal,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    uuid.UUID,
+)
+
+
+def _get_field_values(instance):
+    # Only the loaded fields, to avoid fetching deferred ones. Mutable values
+    # (e.g. from json and array fields) are copied to detect in-place changes
+    ret = {}
+    for f in instance._meta.concrete_fields:
+        if f.primary_key or f.attname not in instance.__dict__:
+            continue
+
+        value = instance.__dict__[f.attname]
+        if not isinstance(value, _IMMUTABLE_TYPES):
+            value = copy.deepcopy(value)
+        ret[f.attname] = value
+
+    return ret
+
+
+def _get_changed_fields(instance, original):
+    return [
+        f.name
+        for f in instance._meta.concrete_fields
+        if not f.primary_key
+        and f.attname in instance.__dict__
+        and (f.attname not in original or instance.__dict__[f.attname] != original[f.attname])
+    ]
+
+
+def _get_unique_fields(model, changed):
+    # The changed fields plus the ones sharing a unique check with them
+    checks = [
+        (f.name, f.unique_for_date, f.unique_for_year, f.unique_for_month)
+        for f in model._meta.fields
+    ]
+    for m in [model, *model._meta.get_parent_list()]:
+        checks.extend(m._meta.unique_together)
+        checks.extend(c.fields for c in getattr(m._meta, "total_unique_constraints", []))
+
+    ret = set(changed)
+    for check in checks:
+        check = {name for name in check if name}
+        if check & changed:
+            ret.update(check)
+
+    return ret
+
+
+def _get_referenced_fields(expr):
+    # The names of the fields referenced by a Q object or an expression
+    ret = set()
+    if isinstance(expr, models.Q):
+        for child in expr.children:
+            if isinstance(child, tuple):
+                ret.add(child[0].split(LOOKUP_SEP)[0])
+                ret |= _get_referenced_fields(child[1])
+            else:
+                ret |= _get_referenced_fields(child)
+    elif isinstance(expr, models.F):
+        ret.add(expr.name.split(LOOKUP_SEP)[0])
+    elif hasattr(expr, "get_source_expressions"):
+        for e in expr.get_source_expressions():
+            ret |= _get_referenced_fields(e)
+
+    return ret
+
+
+def _get_constraint_fields(model, changed):
+    # The changed fields plus the ones sharing a constraint with them
+    ret = set(changed)
+    for m in [model, *model._meta.get_parent_list()]:
+        for constraint in m._meta.constraints:
+            refs = set(getattr(constraint, "fields", None) or [])
+            for attr in ["check", "condition"]:
+                refs |= _get_referenced_fields(getattr(constraint, attr, None))
+            for e in getattr(constraint, "expressions", None) or []:
+                refs |= _get_referenced_fields(e)
+
+            names = set()
+            for ref in refs:
+                try:
+                    names.add(model._meta.get_field(ref).name)
+                except FieldDoesNotExist:
+                    # "pk" and other aliases
+                    names.add(model._meta.pk.name if ref == "pk" else ref)
+
+            if names & changed:
+                ret |= names
+
+    return ret
+
+
+def _get_unique_checks(model):
+    # The sets of fields that must be unique together, besides the pk
+    checks = [(f.name,) for f in model._meta.fields if f.unique and not f.primary_key]
+    for m in [model, *model._meta.get_parent_list()]:
+        checks.extend(tuple(c) for c in m._meta.unique_together)
+        checks.extend(tuple(c.fields) for c in getattr(m._meta, "total_unique_constraints", []))
+
+    return checks
+
+
+def _get_resolved_fields(instance, cleaned_input):
+    # The foreign keys set to an object that was resolved from the input
+    ret = set()
+    for f in instance._meta.concrete_fields:
+        if not f.many_to_one or f.remote_field.limit_choices_to:
+            continue
+
+        value = cleaned_input.get(f.name)
+        if isinstance(value, models.Model) and getattr(value, f.target_field.attname) == getattr(
+            instance, f.attname
+        ):
+            ret.add(f.name)
+
+    return ret
+
+
+_SAVE_RELATED = "related"
+_SAVE_FORM_DATA = "form_data"
+
+
+def _get_save_plan(model, input_plan):
+    # Only the relations that can be present in the input need to be saved
+    names = {name for name, _ in input_plan}
+
+    plan = []
+    for f in itertools.chain(
+        model._meta.many_to_many,
+        model._meta.related_objects,
+        model._meta.private_fields,
+    ):
+        if isinstance(f, (ManyToOneRel, ManyToManyRel)):
+            # Handle reverse side relationships.
+            name = f.related_name or f.name + "_set"
+            kind = _SAVE_RELATED
+        elif hasattr(f, "save_form_data"):
+            name = f.name
+            kind = _SAVE_FORM_DATA
+        else:
+            continue
+
+        if name in names:
+            plan.append((name, kind, f))
+
+    return tuple(plan)
+
+
 class BaseMutationOptions(MutationOptions):
     """Model type options for :class:`BaseMutation` and subclasses."""
 
@@ -270,6 +492,176 @@ class BaseMutation(ClientIDMutation):
 
         return instances
 
+    @classmethod
+    async def get_node_async(
+        cls,
+        info: ResolverInfo,
+        node_id: str,
+        field: str = "id",
+        only_type: Optional[ObjectType] = None,
+    ) -> Any:
+        """Get the node object given a relay global id asynchronously."""
+        if not node_id:
+            return None
+
+        try:
+            node = await aget_node(
+                info,
+                node_id,
+                graphene_type=only_type,
+                registry=cls._meta.registry,
+            )
+        except (AssertionError, GraphQLError) as e:
+            raise ValidationError({field: str(e)})
+        else:
+            if node is None:  # pragma: no cover
+                raise ValidationError({field: f"Couldn't resolve to a node: {node_id}"})
+
+        return node
+
+    @classmethod
+    async def get_nodes_async(
+        cls,
+        info: ResolverInfo,
+        ids: List[str],
+        field: str = "ids",
+        only_type: Optional[ObjectType] = None,
+    ) -> List[Any]:
+        """Get a list of node objects given a list of relay global ids asynchronously."""
+        try:
+            instances = await aget_nodes(
+                info,
+                ids,
+                graphene_type=only_type,
+                registry=cls._meta.registry,
+            )
+        except GraphQLError as e:
+            raise ValidationError({field: str(e)})
+
+        return instances
+
+    @classmethod
+    def _get_pending_nodes(
+        cls,
+        ids: Dict[Any, Union[str, List[str]]],
+    ) -> Dict[Any, Tuple[Type[models.Model], List[Any]]]:
+        # Map each field to the model and the pks to fetch for it
+        registry = cls._meta.registry
+        batch_single = cls.get_node.__func__ is BaseMutation.get_node.__func__
+        batch_list = cls.get_nodes.__func__ is BaseMutation.get_nodes.__func__
+
+        pending = {}
+        for field, value in ids.items():
+            is_list = isinstance(value, list)
+            if not (batch_list if is_list else batch_single) or not value:
+                continue
+
+            model = None
+            pks = []
+            for node_id in value if is_list else [value]:
+                try:
+                    type_name, pk = from_global_id(node_id)
+                    graphene_type = _resolve_graphene_type(type_name, registry)
+                except Exception:
+                    model = None
+                    break
+                if not issubclass(graphene_type, DjangoObjectType) or (
+                    model is not None and graphene_type._meta.model is not model
+                ):
+                    model = None
+                    break
+                model = graphene_type._meta.model
+                try:
+                    pks.append(model._meta.pk.to_python(pk))
+                except ValidationError:
+                    model = None
+                    break
+
+            if model is not None:
+                pending[field] = (model, pks)
+
+        return pending
+
+    @classmethod
+    @contextlib.contextmanager
+    def prefetch_nodes_for_fields(
+        cls,
+        info: ResolverInfo,
+        ids_list: List[Dict[str, Union[str, List[str]]]],
+        nodes: Iterable[models.Model] = (),
+    ):
+        """Prefetch the nodes for multiple calls of :meth:`.get_nodes_for_fields`.
+
+        Inside this context, the nodes of all the given ids will be retrieved
+        without querying the database again, which allows resolving the ids
+        of many objects with a single query for each model.
+
+        :param nodes: nodes already retrieved, which will be used as they are
+
+        """
+        pending = cls._get_pending_nodes(
+            {(i, field): value for i, ids in enumerate(ids_list) for field, value in ids.items()},
+        )
+        prefetched = dict(_prefetched_nodes.get() or {})
+        prefetched.update(((type(node), node.pk), node) for node in nodes)
+
+        by_model: Dict[Type[models.Model], set] = collections.defaultdict(set)
+        for model, pks in pending.values():
+            by_model[model].update(pk for pk in pks if (model, pk) not in prefetched)
+
+        for model, pks in by_model.items():
+            prefetched.update(
+                ((model, pk), obj) for pk, obj in model.objects.in_bulk(list(pks)).items()
+            )
+
+        token = _prefetched_nodes.set(prefetched)
+        try:
+            yield
+        finally:
+            _prefetched_nodes.reset(token)
+
+    @classmethod
+    def get_nodes_for_fields(
+        cls,
+        info: ResolverInfo,
+        ids: Dict[str, Union[str, List[str]]],
+    ) -> Dict[str, Any]:
+        """Get the node objects for multiple fields given their relay global ids.
+
+        `ids` maps each field to either an id or a list of ids. All nodes are
+        fetched together, with a single query for each model.
+
+        Fields that can't be resolved that way (e.g. an id that doesn't
+        exist) are resolved by :meth:`.get_node`/:meth:`.get_nodes`, which
+        will report their errors.
+
+        """
+        pending = cls._get_pending_nodes(ids)
+        prefetched = _prefetched_nodes.get() or {}
+        by_model: Dict[Type[models.Model], set] = collections.defaultdict(set)
+        for model, pks in pending.values():
+            by_model[model].update(pk for pk in pks if (model, pk) not in prefetched)
+        fetched = {
+            model: model.objects.in_bulk(list(pks)) for model, pks in by_model.items() if pks
+        }
+
+        ret: Dict[str, Any] = {}
+        for field, value in ids.items():
+            if field in pending:
+                model, pks = pending[field]
+                nodes = [prefetched.get((model, pk)) or fetched[model].get(pk) for pk in pks]
+                if all(n is not None for n in nodes):
+                    # Duplicated ids return their node once, like get_nodes
+                    ret[field] = list(dict.fromkeys(nodes)) if isinstance(value, list) else nodes[0]
+                    continue
+
+            if isinstance(value, list):
+                ret[field] = cls.get_nodes(info, value, field) if value else []
+            else:
+                ret[field] = cls.get_node(info, value, field)
+
+        return ret
+
     @classmethod
     def check_permissions(cls, info: ResolverInfo) -> bool:
         """Check permissions for the given user.
@@ -288,6 +680,15 @@ class BaseMutation(ClientIDMutation):
 
         return check_perms(user, cls._meta.permissions, any_perm=cls._meta.permissions_any)
 
+    @classmethod
+    async def check_permissions_async(cls, info: ResolverInfo) -> bool:
+        """Check permissions for the given user asynchronously.
+
+        By default this runs :meth:`.check_permissions` in a thread.
+
+        """
+        return await sync_to_async(cls.check_permissions)(info)
+
     @classmethod
     def mutate_and_get_payload(cls: Type[_M], root, info: ResolverInfo, **data) -> _M:
         """Mutate checking permissions.
@@ -298,23 +699,67 @@ class BaseMutation(ClientIDMutation):
 
         The mutation itself should be defined in :meth:`.perform_mutation`.
 
+        When executed by the async view (see
+        :func:`graphene_django_plus.utils.set_async_context`), this returns
+        the awaitable :meth:`.mutate_and_get_payload_async` instead.
+
         """
+        if _is_async(info):
+            return cls.mutate_and_get_payload_async(root, info, **data)
+
         try:
             if not cls.check_permissions(info):
                 raise PermissionDenied()
 
             response = cls.perform_mutation(root, info, **data)
-            if response.errors is None:
-                response.errors = []
-            return response
-        except ValidationError as e:
+        except (ValidationError, DJPermissionDenied) as e:
+            return cls._get_error_response(e)
+
+        return cls._get_response(info, response)
+
+    @classmethod
+    async def mutate_and_get_payload_async(
+        cls: Type[_M],
+        root,
+        info: ResolverInfo,
+        **data,
+    ) -> _M:
+        """Mutate checking permissions asynchronously.
+
+        The same as :meth:`.mutate_and_get_payload`, but awaiting
+        :meth:`.check_permissions_async` and :meth:`.perform_mutation_async`.
+
+        """
+        try:
+            if not await cls.check_permissions_async(info):
+                raise PermissionDenied()
+
+            response = await cls.perform_mutation_async(root, info, **data)
+        except (ValidationError, DJPermissionDenied) as e:
+            return cls._get_error_response(e)
+
+        return cls._get_response(info, response)
+
+    @classmethod
+    def _get_response(cls, info, response):
+        # Nodes and permissions loaded before the mutation may be outdated now
+        get_node_loader(info.context).clear()
+        clear_perms_snapshot(info.context.user)
+        clear_perms_checker(info.context.user)
+        if response.errors is None:
+            response.errors = []
+        return response
+
+    @classmethod
+    def _get_error_response(cls, e):
+        if isinstance(e, ValidationError):
             errors = _get_validation_errors(e)
             return cls(errors=errors)
-        except DJPermissionDenied as e:
-            if not graphene_django_plus_settings.MUTATIONS_SWALLOW_PERMISSION_DENIED:
-                raise
-            msg = str(e) or "Permission denied..."
-            return cls(errors=[MutationErrorType(message=msg)])
+
+        if not graphene_django_plus_settings.MUTATIONS_SWALLOW_PERMISSION_DENIED:
+            raise e
+        msg = str(e) or "Permission denied..."
+        return cls(errors=[MutationErrorType(message=msg)])
 
     @classmethod
     def perform_mutation(cls: Type[_M], root, info: ResolverInfo, **data) -> _M:
@@ -326,6 +771,16 @@ class BaseMutation(ClientIDMutation):
         """
         raise NotImplementedError
 
+    @classmethod
+    async def perform_mutation_async(cls: Type[_M], root, info: ResolverInfo, **data) -> _M:
+        """Perform the mutation asynchronously.
+
+        By default this runs :meth:`.perform_mutation` in a thread. Override
+        this to perform the mutation using Django's async ORM instead.
+
+        """
+        return await sync_to_async(cls.perform_mutation)(root, info, **data)
+
 
 class ModelMutationOptions(BaseMutationOptions, Generic[_T]):
     """Model type options for :class:`BaseModelMutation` and subclasses."""
@@ -354,6 +809,27 @@ class ModelMutationOptions(BaseMutationOptions, Generic[_T]):
     #: provided, it will default to the model's name.
     return_field_name: Optional[str] = None
 
+    #: When updating an instance, validate only the fields present in the
+    #: input and run unique checks only for the ones involving a changed field.
+    validate_changed_only: bool = True
+
+    #: Re-fetch the mutated objects to resolve the payload, passing through
+    #: the type's `get_queryset` and the query planner, like a query would.
+    refetch_payload: bool = False
+
+    #: The input object type of a single object, when the mutation's input
+    #: is not the object itself (e.g. in bulk mutations).
+    object_input: Optional[Type[graphene.InputObjectType]] = None
+
+    #: The fields of the object's input, as `(name, kind, type)` tuples
+    #: computed when the mutation is created, used by `clean_input`.
+    input_plan: Tuple[Tuple[str, str], ...] = ()
+
+    #: The m2m and related objects present in the input, as
+    #: `(name, kind, field)` tuples computed when the mutation is created,
+    #: used by `save`.
+    save_plan: Tuple[Tuple[str, str, Any], ...] = ()
+
 
 class BaseModelMutation(BaseMutation, Generic[_T]):
     """Base mutation for models.
@@ -381,6 +857,8 @@ class BaseModelMutation(BaseMutation, Generic[_T]):
         model=None,
         object_permissions=None,
         object_permissions_any=True,
+        validate_changed_only=True,
+        refetch_payload=False,
         return_field_name=None,
         required_fields=None,
         exclude_fields=None,
@@ -399,24 +877,29 @@ class BaseModelMutation(BaseMutation, Generic[_T]):
         exclude_fields = exclude_fields or []
         only_fields = only_fields or []
         if not return_field_name:
-            return_field_name = _get_model_name(model)
+            return_field_name = cls._get_return_field_name(model)
 
         fdata = _get_fields(model, only_fields, exclude_fields, required_fields, registry)
         input_fields = yank_fields_from_attrs(
             {k: v["field"] for k, v in fdata.items()},
             _as=graphene.InputField,
         )
+        _meta.input_plan = _get_input_plan(getattr(cls, "Input", None), input_fields)
+        input_fields = cls._get_input_fields(_meta, input_fields)
+        _meta.save_plan = _get_save_plan(model, _meta.input_plan)
 
         input_schema = update_dict_nested(
             {k: v["schema"] for k, v in fdata.items()},
             input_schema or {},
         )
 
-        fields = _get_output_fields(model, return_field_name, registry)
+        fields = cls._get_output_fields(model, return_field_name, registry)
 
         _meta.model = model
         _meta.object_permissions = object_permissions or []
         _meta.object_permissions_any = object_permissions_any
+        _meta.validate_changed_only = validate_changed_only
+        _meta.refetch_payload = refetch_payload
         _meta.return_field_name = return_field_name
         _meta.exclude_fields = exclude_fields
         _meta.only_fields = only_fields
@@ -432,6 +915,18 @@ class BaseModelMutation(BaseMutation, Generic[_T]):
 
         cls._meta.fields.update(fields)
 
+    @classmethod
+    def _get_return_field_name(cls, model):
+        return _get_model_name(model)
+
+    @classmethod
+    def _get_input_fields(cls, _meta, input_fields):
+        return input_fields
+
+    @classmethod
+    def _get_output_fields(cls, model, return_field_name, registry):
+        return _get_output_fields(model, return_field_name, registry)
+
     @classmethod
     def check_object_permissions(
         cls,
@@ -458,7 +953,80 @@ class BaseModelMutation(BaseMutation, Generic[_T]):
             info.context.user,
             cls._meta.object_permissions,
             any_perm=cls._meta.object_permissions_any,
+            checker=get_perms_checker(info.context.user),
+        )
+
+    @classmethod
+    def refetch_instances(cls, info: ResolverInfo, instances: List[_T]) -> List[Optional[_T]]:
+        """Re-fetch the mutated instances to resolve the payload.
+
+        The instances are retrieved with a single query through the type's
+        `get_queryset`, optimized by the query planner for the selection of
+        the payload's return field. Instances filtered out by `get_queryset`
+        will be `None`.
+
+        """
+        model = cls._meta.model
+        graphene_type = cls._meta.registry.get_type_for_model(model)
+        payload_type = get_named_type(info.return_type)
+        name = next(
+            (
+                n
+                for n in [to_camel_case(cls._meta.return_field_name), cls._meta.return_field_name]
+                if n in payload_type.fields
+            ),
+            None,
         )
+        if graphene_type is None or name is None:  # pragma: nocover
+            return instances
+
+        field_nodes = [
+            n
+            for n in _Planner(info).iter_fields(
+                [n.selection_set for n in info.field_nodes],
+                payload_type,
+            )
+            if n.name.value == name
+        ]
+        if not field_nodes:
+            # The instances were not requested
+            return instances
+
+        with disable_planning():
+            qs = graphene_type.get_queryset(model.objects, info)
+        if isinstance(qs, models.Manager):
+            qs = qs.get_queryset()
+
+        plan = get_query_plan(
+            graphene_type,
+            info,
+            field_nodes=field_nodes,
+            return_type=payload_type.fields[name].type,
+        )
+        if plan is not None:
+            qs = plan.apply(qs, info)
+
+        fetched = qs.in_bulk([instance.pk for instance in instances])
+        return [fetched.get(instance.pk) for instance in instances]
+
+    @classmethod
+    def prefetch_object_permissions(cls, info: ResolverInfo, instances: Iterable[_T]):
+        """Prepare the object permissions of a list of instances to be checked.
+
+        The permissions for all of them will be fetched at once when the
+        first one gets checked by :meth:`.check_object_permissions`.
+
+        """
+        if not cls._meta.object_permissions:
+            return
+
+        instances = [i for i in instances if isinstance(i, GuardedModel)]
+        if not instances:
+            return
+
+        checker = get_perms_checker(info.context.user)
+        if checker is not None:
+            checker.add(instances)
 
     @classmethod
     def get_instance(cls, info: ResolverInfo, obj_id: str) -> _T:
@@ -468,6 +1036,26 @@ class BaseModelMutation(BaseMutation, Generic[_T]):
             raise PermissionDenied()
         return cast(_T, instance)
 
+    @classmethod
+    def get_instances(
+        cls,
+        info: ResolverInfo,
+        obj_ids: List[str],
+        field: str = "id",
+    ) -> List[_T]:
+        """Get the objects given a list of relay global ids.
+
+        All of them are retrieved with a single query and their object
+        permissions are checked in a single batch.
+
+        """
+        only_type = cls._meta.registry.get_type_for_model(cls._meta.model)
+        instances = cls.get_nodes(info, obj_ids, field=field, only_type=only_type)
+        cls.prefetch_object_permissions(info, instances)
+        if not all(cls.check_object_permissions(info, instance) for instance in instances):
+            raise PermissionDenied()
+        return cast(List[_T], instances)
+
     @classmethod
     def before_save(cls, info: ResolverInfo, instance: _T, cleaned_input: Dict[str, Any]):
         """Perform "before save" operations.
@@ -486,6 +1074,34 @@ class BaseModelMutation(BaseMutation, Generic[_T]):
 
         """
 
+    @classmethod
+    def get_update_fields(cls, instance: _T) -> Optional[List[str]]:
+        """Get the fields that should be written when saving the instance.
+
+        For instances retrieved to be updated, return the concrete fields
+        that changed since then, plus any `auto_now` fields. An empty list
+        means that nothing changed and the instance doesn't need to be
+        written at all. Return `None` (the default for new instances) to
+        write all of its fields.
+
+        Override this to return `None` if the model's `save()` changes
+        fields by itself, otherwise those changes will not be written.
+
+        """
+        original = getattr(instance, _ORIGINAL_ATTR, None)
+        if original is None:
+            return None
+
+        changed = _get_changed_fields(instance, original)
+        if not changed:
+            return []
+
+        return changed + [
+            f.name
+            for f in instance._meta.concrete_fields
+            if getattr(f, "auto_now", False) and f.name not in changed
+        ]
+
     @classmethod
     def save(cls, info: ResolverInfo, instance: _T, cleaned_input: Dict[str, Any]):
         """Save the instance to the database.
@@ -493,27 +1109,26 @@ class BaseModelMutation(BaseMutation, Generic[_T]):
         To do something with the instance "before" or "after" saving it,
         override either :meth:`.before_save` and/or :meth:`.after_save`.
 
+        Only the fields returned by :meth:`.get_update_fields` are written.
+
         """
         cls.before_save(info, instance, cleaned_input=cleaned_input)
-        instance.save()
+        update_fields = cls.get_update_fields(instance)
+        if update_fields is None:
+            instance.save()
+        elif update_fields:
+            instance.save(update_fields=update_fields)
+        instance.__dict__.pop(_ORIGINAL_ATTR, None)
 
         # save m2m and related object's data
-        model = type(instance)
-        for f in itertools.chain(
-            model._meta.many_to_many,
-            model._meta.related_objects,
-            model._meta.private_fields,
-        ):
-            if isinstance(f, (ManyToOneRel, ManyToManyRel)):
-                # Handle reverse side relationships.
-                d = cleaned_input.get(f.related_name or f.name + "_set", None)
-                if d is not None:
-                    target_field = getattr(instance, f.related_name or f.name + "_set")
-                    target_field.set(d)
-            elif hasattr(f, "save_form_data"):
-                d = cleaned_input.get(f.name, None)
-                if d is not None:
-                    f.save_form_data(instance, d)
+        for name, kind, f in cls._meta.save_plan:
+            d = cleaned_input.get(name, None)
+            if d is None:
+                continue
+            if kind is _SAVE_RELATED:
+                getattr(instance, name).set(d)
+            else:
+                f.save_form_data(instance, d)
 
         cls.after_save(info, instance, cleaned_input=cleaned_input)
 
@@ -548,6 +1163,30 @@ class BaseModelMutation(BaseMutation, Generic[_T]):
         instance.delete()
         cls.after_delete(info, instance)
 
+    @classmethod
+    def before_delete_many(cls, info: ResolverInfo, instances: List[_T]):
+        """Perform "before delete" operations for all the instances.
+
+        Override this to perform any operation on the instances before
+        they are deleted. By default, it calls :meth:`.before_delete` for
+        each one of them.
+
+        """
+        for instance in instances:
+            cls.before_delete(info, instance)
+
+    @classmethod
+    def after_delete_many(cls, info: ResolverInfo, instances: List[_T]):
+        """Perform "after delete" operations for all the instances.
+
+        Override this to perform any operation on the instances after
+        they are deleted. By default, it calls :meth:`.after_delete` for
+        each one of them.
+
+        """
+        for instance in instances:
+            cls.after_delete(info, instance)
+
 
 class ModelOperationMutation(BaseModelMutation[_T]):
     """Base mutation for operations on models.
@@ -604,12 +1243,68 @@ class ModelMutation(BaseModelMutation[_T]):
 
     @classmethod
     def clean_instance(cls, info: ResolverInfo, instance: _T, clean_input: Dict[str, Any]) -> _T:
-        """Validate the instance by calling its `.full_clean()` method."""
+        """Validate the instance like its `.full_clean()` method does.
+
+        Foreign keys set to objects resolved from the input are not
+        checked for existence again, but their validators still run.
+
+        When updating an instance and `validate_changed_only` is set (the
+        default), only the fields present in the input are validated, and
+        only unique checks and constraints involving the fields that
+        changed are run, avoiding database queries for the others.
+
+        """
+        original = getattr(instance, _ORIGINAL_ATTR, None)
+        selective = original is not None and cls._meta.validate_changed_only
+
+        fields = {f.name for f in instance._meta.fields}
+        exclude = set(cls._meta.exclude_fields or [])
+        # Relations resolved from their ids are known to exist, no need to query them again
+        resolved = _get_resolved_fields(instance, clean_input) - exclude
+        clean_exclude = exclude | resolved
+        if selective:
+            clean_exclude |= fields - set(clean_input)
+
+        errors: Dict[str, Any] = {}
+        try:
+            instance.clean_fields(exclude=clean_exclude)
+        except ValidationError as e:
+            errors = e.update_error_dict(errors)
+        # Their custom validators still need to run, only the existence check is skipped
+        for name in resolved:
+            f = instance._meta.get_field(name)
+            try:
+                f.run_validators(getattr(instance, f.attname))
+            except ValidationError as e:
+                errors[f.name] = e.error_list
         try:
-            instance.full_clean(exclude=cls._meta.exclude_fields)
+            instance.clean()
         except ValidationError as e:
-            if e.error_dict:
-                raise e
+            errors = e.update_error_dict(errors)
+
+        if selective:
+            # Run unique checks, but only for the fields that changed and passed validation
+            changed = set(_get_changed_fields(instance, original)) - exclude - set(errors)
+            unique_exclude = exclude | (fields - _get_unique_fields(type(instance), changed))
+            # Constraints also depend on the unchanged fields they reference
+            constraint_exclude = exclude | (
+                fields - _get_constraint_fields(type(instance), changed)
+            )
+        else:
+            unique_exclude = constraint_exclude = exclude
+        error_fields = set(errors) - {NON_FIELD_ERRORS}
+        try:
+            instance.validate_unique(exclude=unique_exclude | error_fields)
+        except ValidationError as e:
+            errors = e.update_error_dict(errors)
+        if hasattr(instance, "validate_constraints"):
+            try:
+                instance.validate_constraints(exclude=constraint_exclude | error_fields)
+            except ValidationError as e:
+                errors = e.update_error_dict(errors)
+
+        if errors:
+            raise ValidationError(errors)
 
         return instance
 
@@ -617,21 +1312,18 @@ class ModelMutation(BaseModelMutation[_T]):
     def clean_input(cls, info: ResolverInfo, instance: _T, data: Dict[str, Any]):
         """Clear and normalize the input data."""
         cleaned_input: Dict[str, Any] = {}
+        ids: Dict[str, Union[str, List[str]]] = {}
 
-        for f_name, f_item in cls.Input._meta.fields.items():
+        for f_name, kind in cls._meta.input_plan:
             if f_name not in data:
                 continue
             value = data[f_name]
 
-            if value is not None and _is_list_of_ids(f_item):
-                # list of IDs field
-                instances = cls.get_nodes(info, value, f_name) if value else []
-                cleaned_input[f_name] = instances
-            elif value is not None and _is_id_field(f_item):
-                # ID field
-                instance = cls.get_node(info, value, f_name)
-                cleaned_input[f_name] = instance
-            elif value is not None and _is_upload_field(f_item):
+            if value is not None and (kind is _INPUT_ID or kind is _INPUT_IDS):
+                # ID and list of IDs fields, resolved together below
+                ids[f_name] = value
+                cleaned_input[f_name] = None
+            elif value is not None and kind is _INPUT_UPLOAD:
                 # uploaded files
                 value = info.context.FILES.get(value)
                 cleaned_input[f_name] = value
@@ -639,6 +1331,9 @@ class ModelMutation(BaseModelMutation[_T]):
                 # other fields
                 cleaned_input[f_name] = value
 
+        if ids:
+            cleaned_input.update(cls.get_nodes_for_fields(info, ids))
+
         return cleaned_input
 
     @classmethod
@@ -654,6 +1349,8 @@ class ModelMutation(BaseModelMutation[_T]):
         if obj_id:
             checked_permissions = True
             instance = cls.get_instance(info, obj_id)
+            # Keep the original values to save only the fields that changed
+            setattr(instance, _ORIGINAL_ATTR, _get_field_values(instance))
         else:
             checked_permissions = False
             instance = cls._meta.model()
@@ -669,6 +1366,9 @@ class ModelMutation(BaseModelMutation[_T]):
             # some related objects
             raise PermissionDenied()
 
+        if cls._meta.refetch_payload:
+            instance = cls.refetch_instances(info, [instance])[0]
+
         assert cls._meta.return_field_name
         return cls(**{cls._meta.return_field_name: instance})
 
@@ -745,3 +1445,561 @@ class ModelDeleteMutation(ModelOperationMutation[_T]):
 
         assert cls._meta.return_field_name
         return cls(**{cls._meta.return_field_name: instance})
+
+
+class ModelBulkMutationOptions(ModelMutationOptions[_T]):
+    """Model type options for :class:`ModelBulkMutation` and subclasses."""
+
+    #: How many objects should be written to the database in a single query.
+    #: If not provided, all of them will be written at once, except on
+    #: databases that limit the number of query parameters (e.g. SQLite).
+    batch_size: Optional[int] = None
+
+
+class ModelBulkMutation(ModelMutation[_T]):
+    """Base mutation for multiple objects of a model at once.
+
+    The input receives a list of `objects`, each one having the same
+    fields a :class:`ModelMutation`'s input would have. All of them are
+    validated before anything is written to the database, and any errors
+    are returned with the `index` of the object that caused them.
+
+    """
+
+    class Meta:
+        abstract = True
+
+    if TYPE_CHECKING:
+
+        @classmethod
+        @property
+        def _meta(cls) -> ModelBulkMutationOptions[_T]:
+            ...
+
+    #: A list of errors that happened during the mutation
+    errors = graphene.List(
+        graphene.NonNull(BulkMutationErrorType),
+        description="List of errors that occurred while executing the mutation.",
+    )
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, batch_size=None, _meta=None, **kwargs):
+        if not _meta:
+            _meta = ModelBulkMutationOptions(cls)
+
+        _meta.batch_size = batch_size
+
+        super().__init_subclass_with_meta__(_meta=_meta, **kwargs)
+
+    @classmethod
+    def _get_input_fields(cls, _meta, input_fields):
+        _meta.input_plan = _get_input_plan(None, input_fields)
+        _meta.object_input = type(
+            f"{cls.__name__}ObjectInput",
+            (graphene.InputObjectType,),
+            dict(input_fields),
+        )
+        return {
+            "objects": graphene.InputField(
+                graphene.NonNull(graphene.List(graphene.NonNull(_meta.object_input))),
+                description="The objects to mutate.",
+            ),
+        }
+
+    @classmethod
+    def _get_output_fields(cls, model, return_field_name, registry):
+        if not registry.get_type_for_model(model):  # pragma: no cover
+            raise ImproperlyConfigured(
+                "Unable to find type for model {} in graphene registry".format(
+                    model.__name__,
+                )
+            )
+        f = graphene.Field(
+            graphene.List(graphene.NonNull(lambda: registry.get_type_for_model(model))),
+            description="The mutated objects.",
+        )
+        return {return_field_name: f}
+
+    @classmethod
+    def _get_return_field_name(cls, model):
+        return _get_model_name(model) + "s"
+
+    @classmethod
+    def clean_objects(
+        cls,
+        info: ResolverInfo,
+        instances: List[_T],
+        objects: List[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], List[BulkMutationErrorType]]:
+        """Clean the input and validate each one of the objects.
+
+        Returns the cleaned input of each object and the errors that
+        happened, indexed by the object's position in the input.
+
+        """
+        id_fields = [name for name, kind in cls._meta.input_plan if kind in (_INPUT_ID, _INPUT_IDS)]
+
+        cleaned_inputs = []
+        errors = []
+        # Resolve the ids of all the objects together, with a single query for each model
+        with cls.prefetch_nodes_for_fields(
+            info,
+            [{f: data[f] for f in id_fields if data.get(f) is not None} for data in objects],
+            nodes=[instance for instance in instances if instance.pk is not None],
+        ):
+            for i, (instance, data) in enumerate(zip(instances, objects)):
+                try:
+                    cleaned_input = cls.clean_input(info, instance, data)
+                    cls.create_instance(info, instance, cleaned_input)
+                    cls.clean_instance(info, instance, cleaned_input)
+                except ValidationError as e:
+                    errors.extend(_get_validation_errors(e, BulkMutationErrorType, index=i))
+                    cleaned_input = {}
+                cleaned_inputs.append(cleaned_input)
+
+        failed = {error.index for error in errors}
+        errors.extend(
+            cls.validate_unique_many(
+                info,
+                [(i, instance) for i, instance in enumerate(instances) if i not in failed],
+            )
+        )
+        errors.sort(key=lambda error: error.index)
+
+        return cleaned_inputs, errors
+
+    @classmethod
+    def validate_unique_many(
+        cls,
+        info: ResolverInfo,
+        instances: List[Tuple[int, _T]],
+    ) -> List[BulkMutationErrorType]:
+        """Check the unique constraints between the objects being mutated.
+
+        Each object is validated against the database by
+        :meth:`.clean_instance`, but not against the other objects in the
+        same mutation. Returns an error for each object that has the same
+        unique values as a previous one, indexed by its position.
+
+        """
+        model = cls._meta.model
+        exclude = set(cls._meta.exclude_fields or [])
+        errors = []
+        for check in _get_unique_checks(model):
+            if exclude & set(check):
+                continue
+
+            seen = set()
+            for i, instance in instances:
+                values = tuple(
+                    getattr(instance, model._meta.get_field(name).attname) for name in check
+                )
+                if any(v is None for v in values):
+                    continue
+                if values not in seen:
+                    seen.add(values)
+                    continue
+
+                field = check[0] if len(check) == 1 else NON_FIELD_ERRORS
+                e = ValidationError({field: [instance.unique_error_message(model, check)]})
+                errors.extend(_get_validation_errors(e, BulkMutationErrorType, index=i))
+
+        return errors
+
+    @classmethod
+    def before_save_many(
+        cls,
+        info: ResolverInfo,
+        instances: List[_T],
+        cleaned_inputs: List[Dict[str, Any]],
+    ):
+        """Perform "before save" operations for all the instances.
+
+        Override this to perform any operation on the instances before they
+        are written to the database. By default, it calls
+        :meth:`.before_save` for each one of them.
+
+        """
+        for instance, cleaned_input in zip(instances, cleaned_inputs):
+            cls.before_save(info, instance, cleaned_input=cleaned_input)
+
+    @classmethod
+    def after_save_many(
+        cls,
+        info: ResolverInfo,
+        instances: List[_T],
+        cleaned_inputs: List[Dict[str, Any]],
+    ):
+        """Perform "after save" operations for all the instances.
+
+        Override this to perform any operation on the instances after they
+        are written to the database. By default, it calls
+        :meth:`.after_save` for each one of them.
+
+        """
+        for instance, cleaned_input in zip(instances, cleaned_inputs):
+            cls.after_save(info, instance, cleaned_input=cleaned_input)
+
+    @classmethod
+    def save_related(
+        cls,
+        info: ResolverInfo,
+        instances: List[_T],
+        cleaned_inputs: List[Dict[str, Any]],
+        clear: bool = False,
+    ):
+        """Save the m2m and related object's data of all the instances.
+
+        Many to many relations are written with a single query to each
+        through table (after deleting the existing rows when `clear` is
+        `True`), unless they have a custom through model or `m2m_changed`
+        receivers, in which case each instance's relation is set one at a
+        time.
+
+        """
+        for name, kind, f in cls._meta.save_plan:
+            pending = [
+                (instance, cleaned_input[name])
+                for instance, cleaned_input in zip(instances, cleaned_inputs)
+                if cleaned_input.get(name) is not None
+            ]
+            if not pending:
+                continue
+
+            if isinstance(f, ManyToManyRel):
+                m2m, through = f.field, f.through
+                source, target = m2m.m2m_reverse_field_name(), m2m.m2m_field_name()
+            elif isinstance(f, models.ManyToManyField):
+                m2m, through = f, f.remote_field.through
+                source, target = m2m.m2m_field_name(), m2m.m2m_reverse_field_name()
+            else:
+                m2m = None
+
+            if (
+                m2m is not None
+                and through._meta.auto_created
+                and not models.signals.m2m_changed.has_listeners(through)
+            ):
+                source_field = through._meta.get_field(source)
+                target_field = through._meta.get_field(target)
+                if clear:
+                    through.objects.filter(
+                        **{
+                            f"{source_field.attname}__in": [
+                                getattr(instance, source_field.target_field.attname)
+                                for instance, _ in pending
+                            ]
+                        }
+                    ).delete()
+                rows = {}
+                for instance, objs in pending:
+                    source_value = getattr(instance, source_field.target_field.attname)
+                    for obj in objs:
+                        target_value = getattr(obj, target_field.target_field.attname)
+                        rows[(source_value, target_value)] = through(
+                            **{
+                                source_field.attname: source_value,
+                                target_field.attname: target_value,
+                            }
+                        )
+                through.objects.bulk_create(rows.values(), batch_size=cls._meta.batch_size)
+            elif kind is _SAVE_RELATED:
+                for instance, objs in pending:
+                    getattr(instance, name).set(objs)
+            else:
+                for instance, objs in pending:
+                    f.save_form_data(instance, objs)
+
+
+class ModelBulkCreateMutation(ModelBulkMutation[_T]):
+    """Bulk create mutation for models.
+
+    Just like a :class:`ModelCreateMutation`, but receives a list of
+    objects that are inserted using `QuerySet.bulk_create`.
+
+    Note that, like `bulk_create` itself, the model's `save()` method will
+    not be called and no `pre_save`/`post_save` signals will be sent.
+
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, **kwargs):
+        exclude_fields = kwargs.pop("exclude_fields", []) or []
+        if "id" not in exclude_fields:
+            exclude_fields.append("id")
+        super().__init_subclass_with_meta__(
+            exclude_fields=exclude_fields,
+            **kwargs,
+        )
+
+    @classmethod
+    def save_all(
+        cls,
+        info: ResolverInfo,
+        instances: List[_T],
+        cleaned_inputs: List[Dict[str, Any]],
+    ):
+        """Insert the instances into the database.
+
+        To do something with the instances "before" or "after" saving them,
+        override either :meth:`.before_save_many` and/or
+        :meth:`.after_save_many`.
+
+        """
+        cls.before_save_many(info, instances, cleaned_inputs)
+
+        model = cls._meta.model
+        if connections[router.db_for_write(model)].features.can_return_rows_from_bulk_insert:
+            model.objects.bulk_create(instances, batch_size=cls._meta.batch_size)
+        else:  # pragma: nocover
+            # The instances' pks are required to save their relations
+            for instance in instances:
+                instance.save(force_insert=True)
+
+        cls.save_related(info, instances, cleaned_inputs)
+        cls.after_save_many(info, instances, cleaned_inputs)
+
+    @classmethod
+    @transaction.atomic
+    def perform_mutation(cls: Type[_MM], root, info: ResolverInfo, **data) -> _MM:
+        """Perform the mutation.
+
+        Validate all the objects and, if none of them has errors, insert
+        them into the database.
+
+        """
+        model = cls._meta.model
+        instances = [model() for _ in data["objects"]]
+        cleaned_inputs, errors = cls.clean_objects(info, instances, data["objects"])
+        if errors:
+            return cls(errors=errors)
+
+        cls.save_all(info, instances, cleaned_inputs)
+
+        cls.prefetch_object_permissions(info, instances)
+        if not all(cls.check_object_permissions(info, instance) for instance in instances):
+            raise PermissionDenied()
+
+        if cls._meta.refetch_payload:
+            instances = [i for i in cls.refetch_instances(info, instances) if i is not None]
+
+        assert cls._meta.return_field_name
+        return cls(**{cls._meta.return_field_name: instances})
+
+
+class ModelBulkUpdateMutation(ModelBulkMutation[_T]):
+    """Bulk update mutation for models.
+
+    Just like a :class:`ModelUpdateMutation`, but receives a list of
+    objects that are updated using `QuerySet.bulk_update`, restricted to
+    the fields that were actually changed in any of them.
+
+    Note that, like `bulk_update` itself, the model's `save()` method will
+    not be called and no `pre_save`/`post_save` signals will be sent.
+
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, **kwargs):
+        if "only_fields" in kwargs and "id" not in kwargs["only_fields"]:
+            kwargs["only_fields"].insert(0, "id")
+        required_fields = kwargs.pop("required_fields", []) or []
+        if "id" not in required_fields:
+            required_fields.insert(0, "id")
+        super().__init_subclass_with_meta__(
+            required_fields=required_fields,
+            **kwargs,
+        )
+
+    @classmethod
+    def save_all(
+        cls,
+        info: ResolverInfo,
+        instances: List[_T],
+        cleaned_inputs: List[Dict[str, Any]],
+        fields: List[str],
+    ):
+        """Update the given fields of the instances in the database.
+
+        To do something with the instances "before" or "after" saving them,
+        override either :meth:`.before_save_many` and/or
+        :meth:`.after_save_many`.
+
+        """
+        cls.before_save_many(info, instances, cleaned_inputs)
+        if fields:
+            cls._meta.model.objects.bulk_update(
+                instances,
+                fields,
+                batch_size=cls._meta.batch_size,
+            )
+        cls.save_related(info, instances, cleaned_inputs, clear=True)
+        cls.after_save_many(info, instances, cleaned_inputs)
+
+    @classmethod
+    def _get_bulk_instances(
+        cls,
+        info: ResolverInfo,
+        objects: List[Dict[str, Any]],
+    ) -> Tuple[List[_T], List[BulkMutationErrorType]]:
+        # Different ids can resolve to the same object (e.g. "Type:1" and
+        # "Type:01"), so the objects are matched to the instances by their pk.
+        # They are loaded without raising, so each missing one gets its own error
+        model = cls._meta.model
+        type_name = str(cls._meta.registry.get_type_for_model(model))
+        pks = []
+        for obj in objects:
+            try:
+                node_type, pk = from_global_id(obj["id"])
+                pk = model._meta.pk.to_python(pk) if node_type == type_name else None
+            except Exception:
+                pk = None
+            pks.append(pk)
+
+        by_pk = model.objects.in_bulk({pk for pk in pks if pk is not None})
+        instances = list(by_pk.values())
+        cls.prefetch_object_permissions(info, instances)
+        if not all(cls.check_object_permissions(info, instance) for instance in instances):
+            raise PermissionDenied()
+
+        ordered = []
+        errors = []
+        seen = set()
+        for i, pk in enumerate(pks):
+            instance = by_pk.get(pk)
+            if instance is None:
+                errors.append(
+                    BulkMutationErrorType(field="id", message="Object not found.", index=i),
+                )
+            elif pk in seen:
+                errors.append(
+                    BulkMutationErrorType(field="id", message="Duplicated object.", index=i),
+                )
+            else:
+                seen.add(pk)
+                ordered.append(instance)
+
+        if not errors and len(ordered) != len(objects):  # pragma: nocover
+            errors.append(BulkMutationErrorType(field="id", message="Objects mismatch."))
+
+        return ordered, errors
+
+    @classmethod
+    @transaction.atomic
+    def perform_mutation(cls: Type[_MM], root, info: ResolverInfo, **data) -> _MM:
+        """Perform the mutation.
+
+        Validate all the objects and, if none of them has errors, update
+        the fields that changed in any of them in the database.
+
+        """
+        objects = data["objects"]
+        instances, errors = cls._get_bulk_instances(info, objects)
+        if errors:
+            return cls(errors=errors)
+
+        for instance in instances:
+            setattr(instance, _ORIGINAL_ATTR, _get_field_values(instance))
+        cleaned_inputs, errors = cls.clean_objects(info, instances, objects)
+        if errors:
+            return cls(errors=errors)
+
+        changed = set()
+        for instance in instances:
+            changed.update(_get_changed_fields(instance, instance.__dict__.pop(_ORIGINAL_ATTR)))
+
+        fields = cls._meta.model._meta.concrete_fields
+        cls.save_all(info, instances, cleaned_inputs, [f.name for f in fields if f.name in changed])
+
+        if cls._meta.refetch_payload:
+            instances = [i for i in cls.refetch_instances(info, instances) if i is not None]
+
+        assert cls._meta.return_field_name
+        return cls(**{cls._meta.return_field_name: instances})
+
+
+class ModelBulkDeleteMutation(BaseModelMutation[_T]):
+    """Bulk delete mutation for models.
+
+    Receives a list of `ids` and deletes all of them at once, returning
+    the ids of the deleted objects.
+
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, **kwargs):
+        super().__init_subclass_with_meta__(
+            only_fields=["id"],
+            required_fields=["id"],
+            **kwargs,
+        )
+
+    @classmethod
+    def _get_return_field_name(cls, model):
+        return "deleted_ids"
+
+    @classmethod
+    def _get_input_fields(cls, _meta, input_fields):
+        return {
+            "ids": graphene.InputField(
+                graphene.NonNull(graphene.List(graphene.NonNull(graphene.ID))),
+                description="IDs of the objects to delete.",
+            ),
+        }
+
+    @classmethod
+    def _get_output_fields(cls, model, return_field_name, registry):
+        f = graphene.Field(
+            graphene.List(graphene.NonNull(graphene.ID)),
+            description="IDs of the deleted objects.",
+        )
+        return {return_field_name: f}
+
+    @classmethod
+    def delete_many(cls, info: ResolverInfo, instances: List[_T]):
+        """Delete the instances from the database.
+
+        The instances are deleted by a single `QuerySet.delete()`, which
+        uses a single query when the model has no cascades or signal
+        receivers.
+
+        To do something with the instances "before" or "after" deleting
+        them, override either :meth:`.before_delete_many` and/or
+        :meth:`.after_delete_many`.
+
+        """
+        cls.before_delete_many(info, instances)
+
+        # Django already deletes the queryset with a single query when there
+        # are no cascades or signal receivers to handle
+        model = cls._meta.model
+        model.objects.filter(pk__in=[instance.pk for instance in instances]).delete()
+
+        cls.after_delete_many(info, instances)
+
+    @classmethod
+    @transaction.atomic
+    def perform_mutation(cls: Type[_MM], root, info: ResolverInfo, **data) -> _MM:
+        """Perform the mutation.
+
+        Delete the instances from the database given their `ids` in the
+        input data.
+
+        """
+        graphene_type = cls._meta.registry.get_type_for_model(cls._meta.model)
+        instances = cls.get_instances(info, data["ids"], field="ids")
+        deleted_ids = [to_global_id(graphene_type._meta.name, i.pk) for i in instances]
+
+        cls.delete_many(info, instances)
+
+        assert cls._meta.return_field_name
+        return cls(**{cls._meta.return_field_name: deleted_ids})
@@ -1,9 +1,56 @@
-from typing import List, Optional, Union
+from typing import FrozenSet, Iterable, List, Optional, Union
 
 from django.contrib.auth.models import AbstractUser, AnonymousUser
 
 from .exceptions import PermissionDenied
 
+_PERMS_SNAPSHOT_ATTR = "_graphene_django_plus_perms"
+
+
+def set_perms_snapshot(user: Union[AbstractUser, AnonymousUser], perms: Iterable[str]):
+    """Prime the permission snapshot for the user.
+
+    An upstream auth layer (e.g. a token authentication middleware) that
+    already knows the user's permissions can call this with the request's
+    user, so that no permission tables need to be read while resolving it.
+
+    :param user: the user (`request.user`) to attach the snapshot to
+    :param perms: the user's permissions, in the `app_label.codename` format
+
+    """
+    setattr(user, _PERMS_SNAPSHOT_ATTR, frozenset(perms))
+
+
+def get_perms_snapshot(user: Union[AbstractUser, AnonymousUser]) -> FrozenSet[str]:
+    """Get the user's permissions, cached in the user object.
+
+    The snapshot is built on the first call and reused by the next
+    permission checks for the same user object. The GraphQL views clear it
+    when the request finishes, see :func:`clear_perms_snapshot`.
+
+    :param user: the user itself, which should be the request's user
+
+    """
+    snapshot = getattr(user, _PERMS_SNAPSHOT_ATTR, None)
+    if snapshot is None:
+        snapshot = frozenset(user.get_all_permissions())
+        setattr(user, _PERMS_SNAPSHOT_ATTR, snapshot)
+
+    return snapshot
+
+
+def clear_perms_snapshot(user: Union[AbstractUser, AnonymousUser]):
+    """Clear the user's permission snapshot, forcing it to be built again.
+
+    The permissions cached in the user by django's `ModelBackend` are
+    cleared as well, so that permissions granted or revoked since then
+    are seen by the next check.
+
+    """
+    for attr in [_PERMS_SNAPSHOT_ATTR, "_perm_cache", "_user_perm_cache", "_group_perm_cache"]:
+        if hasattr(user, attr):
+            delattr(user, attr)
+
 
 def check_authenticated(user: Union[AbstractUser, AnonymousUser]):
     return user and user.is_authenticated
@@ -35,7 +82,7 @@ def check_perms(
     if with_superuser and check_superuser(user):
         return True
 
-    u_perms = set(user.get_all_permissions())
+    u_perms = get_perms_snapshot(user)
     f = any if any_perm else all
     return f(p in u_perms for p in perms)
 
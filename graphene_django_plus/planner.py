@@ -0,0 +1,592 @@
+"""Query planner that optimizes querysets based on the GraphQL selection set.
+
+The planner walks the selection of the field being resolved once and
+builds a :class:`QueryPlan` with the `select_related`, `prefetch_related`
+and `only` lookups needed to resolve it without extra queries.
+
+Fields with custom resolvers can declare the columns they need with the
+type's `field_dependencies` option, otherwise all columns will be loaded.
+When `DEBUG` is on, accessing a column that was not loaded will emit a
+:class:`DeferredFieldWarning`.
+
+Plans only depend on the query document and the field path, so they are
+cached per (operation, field path). The querysets used by the prefetches
+are built for each request, passing through the nested type's
+`get_queryset` to keep its permission checks.
+
+"""
+import contextlib
+import contextvars
+import functools
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Type
+import warnings
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Prefetch
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.query import ModelIterable
+from graphene import relay
+from graphene.utils.str_converters import to_camel_case
+from graphene_django import DjangoObjectType
+from graphene_django.utils import bypass_get_queryset
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLIncludeDirective,
+    GraphQLList,
+    GraphQLObjectType,
+    GraphQLOutputType,
+    GraphQLSkipDirective,
+    InlineFragmentNode,
+    SelectionSetNode,
+    get_named_type,
+    get_nullable_type,
+    is_abstract_type,
+)
+from graphql.execution.values import get_directive_values
+
+from .settings import graphene_django_plus_settings
+from .utils import LRUCache
+
+if TYPE_CHECKING:  # pragma: nocover
+    from .types import ResolverInfo
+
+_PLANNED_HINT = "_graphene_django_plus_planned"
+_DEFERRED_WARNING_HINT = "_graphene_django_plus_deferred_warning"
+_FETCHED_HINT = "_graphene_django_plus_fetched"
+_PREFETCH_ATTR = "_graphene_django_plus_prefetched_{}"
+_planning_disabled = contextvars.ContextVar("_planning_disabled", default=False)
+_plan_cache = LRUCache()
+
+#: The field is resolved by a custom resolver or is not a model field
+KIND_CUSTOM = "custom"
+#: The field is the model's primary key
+KIND_PK = "pk"
+#: The field is a concrete, non relational, model field
+KIND_COLUMN = "column"
+#: The field is a forward foreign key or one to one relation
+KIND_FK = "fk"
+#: The field is a reverse foreign key or a many to many relation
+KIND_RELATED = "related"
+
+
+class DeferredFieldWarning(RuntimeWarning):
+    """A column not loaded by the planner was accessed, causing an extra query."""
+
+
+def _warn_refresh_from_db(instance, using=None, fields=None, **kwargs):
+    deferred = instance.get_deferred_fields().intersection(fields or [])
+    if deferred:
+        warnings.warn(
+            "Field(s) {} of {} were not loaded by the query planner and will be "
+            "fetched with an extra query. Declare them in the type's "
+            "`field_dependencies`.".format(
+                ", ".join(repr(f) for f in sorted(deferred)),
+                instance.__class__.__name__,
+            ),
+            DeferredFieldWarning,
+            stacklevel=3,
+        )
+    return type(instance).refresh_from_db(instance, using=using, fields=fields, **kwargs)
+
+
+def _with_deferred_warning(objs):
+    for obj in objs:
+        # Deferred attributes call the instance's refresh_from_db to load themselves
+        obj.refresh_from_db = functools.partial(_warn_refresh_from_db, obj)
+        yield obj
+
+
+class _PlannedIterable(ModelIterable):
+    # What to do with the fetched objects is kept in the queryset's hints,
+    # which are passed to its clones, so a single class handles every case
+    def __iter__(self):
+        hints = self.queryset._hints
+        objs = super().__iter__()
+        if hints.get(_DEFERRED_WARNING_HINT):
+            objs = _with_deferred_warning(objs)
+
+        callback = hints.get(_FETCHED_HINT)
+        if callback is None:
+            return objs
+
+        objs = list(objs)
+        callback(objs)
+        return iter(objs)
+
+
+def _set_iterable_hint(qs: models.QuerySet, key: str, value) -> bool:
+    # Querysets that don't return model instances (e.g. values()) are not changed
+    if qs._iterable_class is ModelIterable:
+        qs._iterable_class = _PlannedIterable
+    elif qs._iterable_class is not _PlannedIterable:
+        return False
+
+    # The hints dict is shared with the manager, so don't modify it in place
+    qs._hints = {**qs._hints, key: value}
+    return True
+
+
+class QueryPlan:
+    """The optimizations to apply to a queryset for a given selection."""
+
+    def __init__(self):
+        #: The columns to load, or `None` if all of them are needed
+        self.only: Optional[Set[str]] = set()
+        #: Relations to join, mapped to the plan of the related model
+        self.select_related: Dict[str, QueryPlan] = {}
+        #: Relations to prefetch, mapped to the related type, its plan and
+        #: the attribute to store the results in (if any)
+        self.prefetch_related: Dict[str, Tuple[Type[DjangoObjectType], QueryPlan, Optional[str]]]
+        self.prefetch_related = {}
+
+    def __repr__(self):
+        return "<QueryPlan only={} select_related={} prefetch_related={}>".format(
+            sorted(self.only) if self.only is not None else None,
+            self.select_related,
+            {k: v[1] for k, v in self.prefetch_related.items()},
+        )
+
+    def add_only(self, *fields: str):
+        if self.only is not None:
+            self.only.update(fields)
+
+    def merge(self, other: "QueryPlan"):
+        """Merge the lookups of another plan into this one."""
+        if self.only is not None:
+            if other.only is None:
+                self.only = None
+            else:
+                self.only |= other.only
+
+        for name, plan in other.select_related.items():
+            if name in self.select_related:
+                self.select_related[name].merge(plan)
+            else:
+                self.select_related[name] = plan
+
+        for name, (graphene_type, plan, to_attr) in other.prefetch_related.items():
+            if name in self.prefetch_related:
+                self.prefetch_related[name][1].merge(plan)
+            else:
+                self.prefetch_related[name] = (graphene_type, plan, to_attr)
+
+    def get_lookups(
+        self,
+        info: "ResolverInfo",
+        prefix: str = "",
+    ) -> Tuple[List[str], List[Prefetch], Optional[Set[str]]]:
+        """Get the `select_related`, `prefetch_related` and `only` lookups."""
+        select: List[str] = []
+        prefetch: List[Prefetch] = []
+        only = {prefix + f for f in self.only} if self.only is not None else None
+
+        for name, plan in self.select_related.items():
+            path = prefix + name
+            s_select, s_prefetch, s_only = plan.get_lookups(info, path + LOOKUP_SEP)
+            select.append(path)
+            select.extend(s_select)
+            prefetch.extend(s_prefetch)
+            if only is not None:
+                # Having only the relation itself will load all of its columns
+                only.add(path)
+                only.update(s_only or [])
+
+        for name, (graphene_type, plan, to_attr) in self.prefetch_related.items():
+            model = graphene_type._meta.model
+            with disable_planning():
+                qs = graphene_type.get_queryset(model._default_manager.all(), info)
+            if isinstance(qs, models.Manager):
+                qs = qs.get_queryset()
+            qs = plan.apply(qs, info)
+            # The hints dict is shared with the manager, so don't modify it in place
+            qs._hints = {**qs._hints, _PLANNED_HINT: True}
+            prefetch.append(Prefetch(prefix + name, queryset=qs, to_attr=to_attr))
+
+        return select, prefetch, only
+
+    def apply(self, qs: models.QuerySet, info: "ResolverInfo") -> models.QuerySet:
+        """Apply the plan to the queryset."""
+        select, prefetch, only = self.get_lookups(info)
+
+        if select:
+            qs = qs.select_related(*select)
+
+        if prefetch:
+            qs = qs.prefetch_related(*prefetch)
+            # Our lookups should replace any other with the same name
+            prl = {
+                i.prefetch_to if isinstance(i, Prefetch) else i: i  # type:ignore
+                for i in qs._prefetch_related_lookups
+            }
+            qs._prefetch_related_lookups = tuple(prl.values())
+
+        # Do not override an only/defer that was already set in the queryset
+        if only is not None and qs.query.deferred_loading == (frozenset(), True):
+            # Related managers set the parent in the objects, which needs
+            # the relation's column to not trigger a refresh for each of them
+            only.update(f.name for f in qs._known_related_objects)
+            qs = qs.only(*only)
+            if settings.DEBUG:
+                _set_iterable_hint(qs, _DEFERRED_WARNING_HINT, True)
+
+        return qs
+
+
+@contextlib.contextmanager
+def disable_planning():
+    """Disable the planning of querysets inside this context."""
+    token = _planning_disabled.set(True)
+    try:
+        yield
+    finally:
+        _planning_disabled.reset(token)
+
+
+def is_planned(qs: models.QuerySet) -> bool:
+    """Check if the queryset was already fetched by a planner's prefetch.
+
+    Those querysets already passed through the type's `get_queryset`, and
+    should be returned as is to avoid querying the database again.
+
+    """
+    return qs._result_cache is not None and bool(qs._hints.get(_PLANNED_HINT))
+
+
+def can_select_related(graphene_type: Type[DjangoObjectType]) -> bool:
+    """Check if the type's objects can be joined instead of prefetched.
+
+    That is only possible when the type's `get_queryset` would not filter
+    out any object, as it will not be called for joined relations.
+
+    """
+    from .types import ModelType
+
+    if issubclass(graphene_type, ModelType):
+        return (
+            graphene_type.get_queryset.__func__ is ModelType.get_queryset.__func__
+            and not graphene_type._meta.object_permissions
+        )
+
+    return graphene_type.get_queryset.__func__ is DjangoObjectType.get_queryset.__func__
+
+
+def get_related_resolver(name: str):
+    """Get a resolver for a foreign key that uses the planner's lookups.
+
+    When the planner prefetched the relation, its results already passed
+    through the related type's `get_queryset`. When it was joined, only the
+    type's permissions need to be checked. Otherwise fall back to
+    graphene-django's behaviour of calling the related type's `get_node`.
+
+    """
+    to_attr = _PREFETCH_ATTR.format(name)
+
+    @bypass_get_queryset
+    def resolver(root, info, **kwargs):
+        if hasattr(root, to_attr):
+            return getattr(root, to_attr)
+
+        field = root._meta.get_field(name)
+        graphene_type = get_named_type(info.return_type).graphene_type
+
+        if field.is_cached(root) and can_select_related(graphene_type):
+            instance = field.get_cached_value(root)
+            check_permissions = getattr(graphene_type, "check_permissions", None)
+            if (
+                instance is not None
+                and check_permissions is not None
+                and not check_permissions(info.context.user)
+            ):
+                return None
+            return instance
+
+        if not issubclass(graphene_type, DjangoObjectType):  # pragma: nocover
+            return getattr(root, name)
+
+        pk = getattr(root, field.attname, None)
+        if pk is None:
+            return None
+
+        return graphene_type.get_node(info, pk)
+
+    resolver._graphene_django_plus_auto = True  # type:ignore
+    return resolver
+
+
+@functools.lru_cache(maxsize=None)
+def get_type_fields(
+    graphene_type: Type[DjangoObjectType],
+) -> Dict[str, Tuple[str, str, Optional[models.Field]]]:
+    """Classify the type's fields for the planner.
+
+    Returns a map of the field's GraphQL name to a tuple containing its
+    python name, its kind and its related model field.
+
+    """
+    model = graphene_type._meta.model
+    related = {
+        f.get_accessor_name(): f
+        for f in model._meta.related_objects
+        if f.get_accessor_name() is not None
+    }
+
+    ret = {}
+    for name, field in graphene_type._meta.fields.items():
+        resolver = getattr(graphene_type, f"resolve_{name}", None)
+        if resolver is not None and getattr(resolver, "_graphene_django_plus_auto", False):
+            resolver = None
+
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            model_field = related.get(name)
+
+        if name == "id" or getattr(model_field, "primary_key", False):
+            kind = KIND_PK
+        elif (
+            model_field is None
+            or resolver is not None
+            or getattr(field, "resolver", None) is not None
+        ):
+            kind = KIND_CUSTOM
+        elif not model_field.is_relation:
+            kind = KIND_COLUMN
+        elif model_field.concrete and (model_field.many_to_one or model_field.one_to_one):
+            kind = KIND_FK
+        elif model_field.one_to_many or model_field.many_to_many:
+            kind = KIND_RELATED
+        else:
+            kind = KIND_CUSTOM
+
+        entry = (name, kind, model_field)
+        ret[getattr(field, "name", None) or to_camel_case(name)] = entry
+        ret.setdefault(name, entry)
+
+    return ret
+
+
+class _Planner:
+    def __init__(self, info: "ResolverInfo"):
+        self.info = info
+        self.cacheable = True
+
+    def should_include(self, node) -> bool:
+        if not node.directives:
+            return True
+
+        # Directives depend on the variables, so this can't be cached
+        self.cacheable = False
+        variables = self.info.variable_values
+        skip = get_directive_values(GraphQLSkipDirective, node, variables)
+        if skip is not None and skip["if"]:
+            return False
+        include = get_directive_values(GraphQLIncludeDirective, node, variables)
+        if include is not None and not include["if"]:
+            return False
+        return True
+
+    def matches(self, type_name: str, gql_type: GraphQLObjectType) -> bool:
+        if type_name == gql_type.name:
+            return True
+        condition = self.info.schema.get_type(type_name)
+        return is_abstract_type(condition) and self.info.schema.is_sub_type(condition, gql_type)
+
+    def iter_fields(
+        self,
+        selection_sets: Iterable[Optional[SelectionSetNode]],
+        gql_type: GraphQLObjectType,
+    ) -> Iterable[FieldNode]:
+        for selection_set in selection_sets:
+            if selection_set is None:
+                continue
+
+            for selection in selection_set.selections:
+                if not self.should_include(selection):
+                    continue
+
+                if isinstance(selection, FieldNode):
+                    yield selection
+                elif isinstance(selection, InlineFragmentNode):
+                    cond = selection.type_condition
+                    if cond is None or self.matches(cond.name.value, gql_type):
+                        yield from self.iter_fields([selection.selection_set], gql_type)
+                elif isinstance(selection, FragmentSpreadNode):
+                    fragment = self.info.fragments.get(selection.name.value)
+                    if fragment is not None and self.matches(
+                        fragment.type_condition.name.value,
+                        gql_type,
+                    ):
+                        yield from self.iter_fields([fragment.selection_set], gql_type)
+
+    def plan(
+        self,
+        graphene_type: Type[DjangoObjectType],
+        gql_type: GraphQLObjectType,
+        nodes: Iterable[FieldNode],
+    ) -> QueryPlan:
+        from .types import ModelType
+
+        plan = QueryPlan()
+        fields = get_type_fields(graphene_type)
+        dependencies = getattr(graphene_type._meta, "field_dependencies", None) or {}
+
+        for node in self.iter_fields([n.selection_set for n in nodes], gql_type):
+            field_name = node.name.value
+            if field_name.startswith("__"):
+                continue
+
+            entry = fields.get(field_name)
+            if entry is None:
+                plan.only = None
+                continue
+
+            name, kind, model_field = entry
+            assert model_field is not None or kind in [KIND_PK, KIND_CUSTOM]
+            if kind == KIND_PK:
+                continue
+            if kind == KIND_CUSTOM:
+                if name in dependencies:
+                    plan.add_only(*dependencies[name])
+                else:
+                    plan.only = None
+                continue
+            if kind == KIND_COLUMN:
+                plan.add_only(name)
+                continue
+
+            gql_field = gql_type.fields.get(field_name)
+            if gql_field is None:  # pragma: nocover
+                plan.only = None
+                continue
+
+            related_gql_type = get_named_type(gql_field.type)
+            related_type = getattr(related_gql_type, "graphene_type", None)
+            is_model_type = (
+                isinstance(related_type, type)
+                and issubclass(related_type, ModelType)
+                and isinstance(related_gql_type, GraphQLObjectType)
+            )
+
+            if kind == KIND_FK:
+                # The foreign key column is needed either to join or to prefetch
+                plan.add_only(name)
+                if not is_model_type:
+                    continue
+
+                related_plan = self.plan(related_type, related_gql_type, [node])
+                if can_select_related(related_type):
+                    sub = QueryPlan()
+                    sub.select_related[name] = related_plan
+                else:
+                    sub = QueryPlan()
+                    sub.prefetch_related[name] = (
+                        related_type,
+                        related_plan,
+                        _PREFETCH_ATTR.format(name),
+                    )
+                plan.merge(sub)
+            elif kind == KIND_RELATED:
+                # Connections are sliced and filtered for each parent, which
+                # would discard the prefetched results. Only plain lists can
+                # make use of them.
+                if not is_model_type or not isinstance(
+                    get_nullable_type(gql_field.type),
+                    GraphQLList,
+                ):
+                    continue
+
+                related_plan = self.plan(related_type, related_gql_type, [node])
+                if model_field.one_to_many:
+                    # The relation to the parent is needed to match the objects
+                    related_plan.add_only(model_field.field.name)
+
+                sub = QueryPlan()
+                sub.prefetch_related[name] = (related_type, related_plan, None)
+                plan.merge(sub)
+
+        return plan
+
+
+def _get_cache_key(graphene_type, info, field_nodes=None):
+    loc = info.operation.loc
+    if loc is None:  # pragma: nocover
+        return None
+
+    return (
+        graphene_type,
+        loc.source.body,
+        info.operation.name.value if info.operation.name else None,
+        tuple(p for p in info.path.as_list() if not isinstance(p, int)),
+        tuple(n.loc.start if n.loc else id(n) for n in field_nodes) if field_nodes else None,
+    )
+
+
+def get_query_plan(
+    graphene_type: Type[DjangoObjectType],
+    info: "ResolverInfo",
+    field_nodes: Optional[List[FieldNode]] = None,
+    return_type: Optional[GraphQLOutputType] = None,
+) -> Optional[QueryPlan]:
+    """Get the query plan for resolving the type in the current field.
+
+    Returns `None` when the field does not return the type, either
+    directly, as a list, as a relay connection or through an interface,
+    or if the planning was disabled.
+
+    :param field_nodes: plan for those field nodes instead of the ones in
+        `info`. They should return the same type as the current field,
+        unless `return_type` is given.
+    :param return_type: the type returned by `field_nodes`
+
+    """
+    if _planning_disabled.get() or not graphene_django_plus_settings.QUERY_PLANNER:
+        return None
+
+    cache_size = graphene_django_plus_settings.QUERY_PLANNER_CACHE_SIZE
+    key = _get_cache_key(graphene_type, info, field_nodes) if cache_size else None
+    if key is not None:
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            return plan
+
+    schema = info.schema
+    gql_type = schema.get_type(graphene_type._meta.name)
+    if not isinstance(gql_type, GraphQLObjectType):  # pragma: nocover
+        return None
+
+    planner = _Planner(info)
+    return_type = get_named_type(return_type or info.return_type)
+    nodes = list(field_nodes if field_nodes is not None else info.field_nodes)
+    if return_type is gql_type:
+        pass
+    elif is_abstract_type(return_type):
+        if not schema.is_sub_type(return_type, gql_type):
+            return None
+    elif (
+        isinstance(return_type, GraphQLObjectType)
+        and issubclass(getattr(return_type, "graphene_type", object), relay.Connection)
+        and return_type.graphene_type._meta.node is graphene_type
+    ):
+        edges_type = get_named_type(return_type.fields["edges"].type)
+        edges = [
+            n
+            for n in planner.iter_fields([n.selection_set for n in nodes], return_type)
+            if n.name.value == "edges"
+        ]
+        nodes = [
+            n
+            for n in planner.iter_fields([n.selection_set for n in edges], edges_type)
+            if n.name.value == "node"
+        ]
+    else:
+        return None
+
+    plan = planner.plan(graphene_type, gql_type, nodes)
+    if key is not None and planner.cacheable:
+        _plan_cache.maxsize = cache_size
+        _plan_cache.set(key, plan)
+
+    return plan
@@ -18,10 +18,20 @@ from django.test.signals import setting_changed
 DEFAULTS = {
     "MUTATIONS_INCLUDE_REVERSE_RELATIONS": True,
     "MUTATIONS_SWALLOW_PERMISSION_DENIED": True,
+    "QUERY_PLANNER": True,
+    "QUERY_PLANNER_CACHE_SIZE": 1024,
+    "BATCH_MAX_SIZE": 20,
+    "DOCUMENT_CACHE_SIZE": 1024,
+    "JSON_ENCODER": "graphene_django_plus.views.json_dumps",
+    "PERSISTED_QUERIES": None,
+    "PERSISTED_QUERIES_ONLY": False,
+    "UPLOAD_CHUNK_SIZE": 64 * 2**10,
+    "UPLOAD_MAX_FILE_SIZE": None,
+    "UPLOAD_MAX_SIZE": None,
 }
 
 # List of settings that may be in string import notation.
-IMPORT_STRINGS = []
+IMPORT_STRINGS = ["JSON_ENCODER"]
 
 
 def perform_import(val, setting_name):
@@ -1,11 +1,22 @@
 import datetime
 import decimal
-from typing import TYPE_CHECKING, Any, Generic, List, Optional, Type, TypeVar, Union
-
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import AbstractUser, AnonymousUser
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
 from django.db import models
-from django.db.models import Prefetch
 from django.db.models.fields import NOT_PROVIDED
 from django.db.models.fields.reverse_related import ManyToManyRel, ManyToOneRel
 from django.http import HttpRequest as DJHttpRequest
@@ -17,21 +28,18 @@ from graphene_django.converter import get_choices
 from graphene_django.registry import get_global_registry
 from graphene_django.types import DjangoObjectTypeOptions
 
-try:
-    import graphene_django_optimizer as gql_optimizer
-
-    _BaseDjangoObjectType = gql_optimizer.OptimizedDjangoObjectType
-except ImportError:
-    gql_optimizer = None
-    _BaseDjangoObjectType = DjangoObjectType
-
-from .models import GuardedModel, GuardedModelManager
+from .loaders import get_node_loader
+from .models import GuardedModel, GuardedModelManager, get_perms_checker
 from .perms import check_authenticated, check_perms
+from .planner import (
+    _FETCHED_HINT,
+    _set_iterable_hint,
+    get_query_plan,
+    get_related_resolver,
+    is_planned,
+)
 from .schema import FieldKind, get_field_schema
-from .utils import get_model_fields, update_dict_nested
-
-if TYPE_CHECKING:  # pragma: nocover
-    _BaseDjangoObjectType = DjangoObjectType
+from .utils import _is_async, get_model_fields, update_dict_nested
 
 _T = TypeVar("_T", bound=models.Model)
 schema_registry = {}
@@ -119,6 +127,18 @@ class MutationErrorType(graphene.ObjectType):
     )
 
 
+class BulkMutationErrorType(MutationErrorType):
+    """An error that happened in a bulk mutation."""
+
+    index = graphene.Int(
+        description=(
+            "The position of the object that caused the error in the input, or "
+            "`null` if it isn't associated with any particular object."
+        ),
+        required=False,
+    )
+
+
 class InputSchemaFieldChoiceType(graphene.ObjectType):
     """An input schema field choice."""
 
@@ -264,6 +284,22 @@ class UploadType(graphene.types.Scalar):
         return value
 
 
+class _ObjectPermissionsPrefetch:
+    # Kept in the queryset's hints to be called with its fetched objects
+
+    def __init__(self, graphene_type, info):
+        self.graphene_type = graphene_type
+        self.info = info
+
+    def __call__(self, instances):
+        if self.graphene_type is not None:
+            self.graphene_type.prefetch_object_permissions(self.info, instances)
+
+    def __reduce__(self):
+        # The resolve info can't be pickled, and is useless once the queryset is
+        return (_ObjectPermissionsPrefetch, (None, None))
+
+
 class ModelTypeOptions(DjangoObjectTypeOptions, Generic[_T]):
     """Model type options for :class:`ModelType`."""
 
@@ -293,8 +329,12 @@ class ModelTypeOptions(DjangoObjectTypeOptions, Generic[_T]):
     #: The fields schema for the schema query
     fields_schema: Optional[dict] = None
 
+    #: A map of fields resolved by custom resolvers to the model fields they
+    #: need loaded, used by the query planner to restrict the loaded columns.
+    field_dependencies: Optional[Dict[str, List[str]]] = None
+
 
-class ModelType(_BaseDjangoObjectType, Generic[_T]):
+class ModelType(DjangoObjectType, Generic[_T]):
     """Base type with automatic optimizations and permissions checking."""
 
     class Meta:
@@ -322,6 +362,7 @@ class ModelType(_BaseDjangoObjectType, Generic[_T]):
         object_permissions_any=True,
         object_permissions_with_superuser=True,
         fields_schema=None,
+        field_dependencies=None,
         public=None,
         only_fields=None,
         fields=None,
@@ -342,6 +383,20 @@ class ModelType(_BaseDjangoObjectType, Generic[_T]):
         _meta.object_permissions_with_superuser = object_permissions_with_superuser
         _meta.public = public
 
+        field_dependencies = {k: list(v) for k, v in (field_dependencies or {}).items()}
+        for name, deps in field_dependencies.items():
+            for dep in deps:
+                try:
+                    f = model._meta.get_field(dep)
+                except FieldDoesNotExist:
+                    f = None
+                if f is None or not f.concrete:
+                    raise ImproperlyConfigured(
+                        f"Dependency '{dep}' of field '{name}' is not a concrete field "
+                        f"of {model.__name__}"
+                    )
+        _meta.field_dependencies = field_dependencies
+
         _fields_schema = {}
         # graphene will handle the deprecated only_fields/exclude_fields for us
         # We just want to mimic the logic here
@@ -374,6 +429,20 @@ class ModelType(_BaseDjangoObjectType, Generic[_T]):
             **kwargs,
         )
 
+        # Resolve foreign keys using the relations loaded by the query planner
+        for name in cls._meta.fields:
+            try:
+                f = cls._meta.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if (
+                f.is_relation
+                and f.concrete
+                and (f.many_to_one or f.one_to_one)
+                and not hasattr(cls, f"resolve_{name}")
+            ):
+                setattr(cls, f"resolve_{name}", get_related_resolver(name))
+
         schema_registry[cls._meta.name] = {
             "object_type": cls._meta.name,
             "fields": list(_meta.fields_schema.values()),
@@ -390,13 +459,18 @@ class ModelType(_BaseDjangoObjectType, Generic[_T]):
         Override the default graphene's `get_queryset` to check for permissions
         and optimize the query performance.
 
-        Note that the query will only be automaticallu optimized if,
-        `graphene_django_optimizer` is installed.
+        The query is optimized by :mod:`graphene_django_plus.planner`, which
+        adds the `select_related`, `prefetch_related` and `only` lookups
+        needed by the requested fields.
 
         """
         if isinstance(qs, models.Manager):
             qs = qs.get_queryset()
 
+        # Results prefetched by the planner already passed through here
+        if is_planned(qs):
+            return qs
+
         if not cls.check_permissions(info.context.user):
             return qs.none()
 
@@ -410,40 +484,75 @@ class ModelType(_BaseDjangoObjectType, Generic[_T]):
                 with_superuser=cls._meta.object_permissions_with_superuser,
             )
 
-        ret = qs
-        if gql_optimizer is not None:
-            ret = gql_optimizer.query(ret, info)
-            prl = {
-                i.to_attr if isinstance(i, Prefetch) else i: i  # type:ignore
-                for i in ret._prefetch_related_lookups
-            }
-            ret._prefetch_related_lookups = tuple(prl.values())
+        plan = get_query_plan(cls, info)
+        if plan is not None:
+            qs = plan.apply(qs, info)
+
+        if cls._meta.object_permissions:
+            # Every list resolved from the queryset (connection pages, list
+            # fields, the planner's prefetches) gets its permissions batched
+            qs = qs.all()
+            _set_iterable_hint(qs, _FETCHED_HINT, _ObjectPermissionsPrefetch(cls, info))
+
+        return qs
+
+    @classmethod
+    async def get_queryset_async(
+        cls,
+        qs: Union[models.QuerySet[_T], models.Manager[_T]],
+        info: ResolverInfo,
+    ) -> models.QuerySet[_T]:
+        """Get the queryset checking for permissions asynchronously.
+
+        The permissions are checked by :meth:`.get_queryset` in a thread.
+        The returned queryset is not evaluated, so it can be consumed by
+        Django's async ORM (e.g. `async for` or `aget`).
 
-        return ret
+        """
+        return await sync_to_async(cls.get_queryset)(qs, info)
 
     @classmethod
     def get_node(cls, info: ResolverInfo, id_: Any) -> Optional[_T]:
-        """Get the node instance given the relay global id."""
+        """Get the node instance given the relay global id.
+
+        Lookups are batched and memoized for the request by
+        :class:`graphene_django_plus.loaders.NodeLoader`.
+
+        When executed by the async view (see
+        :func:`graphene_django_plus.utils.set_async_context`), this returns
+        the awaitable :meth:`.get_node_async` instead.
+
+        """
+        if _is_async(info):
+            return cls.get_node_async(info, id_)
+
         # NOTE: get_queryset will filter allowed models for the user so
         # this will return None if he is not allowed to retrieve this
-
-        if gql_optimizer is not None:
-            # optimizer will ignore queryset so call the same as they call
-            # but passing objects from get_queryset to keep our preferences
-            try:
-                instance = cls.get_queryset(cls._meta.model.objects, info).get(
-                    pk=id_,
-                )
-            except cls._meta.model.DoesNotExist:
-                instance = None
-        else:
-            instance = super().get_node(info, id_)
+        instance = get_node_loader(info.context).load(cls, info, id_)
 
         if instance is not None and not cls.check_object_permissions(info.context.user, instance):
             return None
 
         return instance
 
+    @classmethod
+    async def get_node_async(cls, info: ResolverInfo, id_: Any) -> Optional[_T]:
+        """Get the node instance given the relay global id asynchronously.
+
+        The same as :meth:`.get_node`, but the node is fetched with Django's
+        async ORM, allowing the lookups of concurrent resolvers to overlap.
+
+        """
+        instance = await get_node_loader(info.context).aload(cls, info, id_)
+
+        if instance is not None and not await sync_to_async(cls.check_object_permissions)(
+            info.context.user,
+            instance,
+        ):
+            return None
+
+        return instance
+
     @classmethod
     def check_permissions(cls, user: Union[AbstractUser, AnonymousUser]) -> bool:
         """Check permissions for the given user.
@@ -475,6 +584,10 @@ class ModelType(_BaseDjangoObjectType, Generic[_T]):
         The easiest way when using `guardian` is to inherit it
         from :class:`graphene_django_plus.models.GuardedModel`.
 
+        The user's object permission checker is shared in the request, and
+        will have the permissions prefetched for the instances passed to
+        :meth:`.prefetch_object_permissions`.
+
         """
         if not cls._meta.object_permissions:
             return True
@@ -486,4 +599,25 @@ class ModelType(_BaseDjangoObjectType, Generic[_T]):
             user,
             cls._meta.object_permissions,
             any_perm=cls._meta.object_permissions_any,
+            checker=get_perms_checker(user),
         )
+
+    @classmethod
+    def prefetch_object_permissions(cls, info: ResolverInfo, instances: Iterable[_T]):
+        """Prepare the object permissions of a list of instances to be checked.
+
+        The instances are added to the request's object permission checker,
+        which will prefetch the permissions for all of them at once when the
+        first one gets checked by :meth:`.check_object_permissions`.
+
+        """
+        if not cls._meta.object_permissions:
+            return
+
+        instances = [i for i in instances if isinstance(i, GuardedModel)]
+        if not instances:
+            return
+
+        checker = get_perms_checker(info.context.user)
+        if checker is not None:
+            checker.add(instances)
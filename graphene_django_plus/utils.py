@@ -3,9 +3,14 @@ try:
 except ImportError:
     from collections import Mapping
 
-import itertools
-from typing import List, Optional, Type
-
+import asyncio
+import collections
+import inspect
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Type
+import weakref
+
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models.fields.reverse_related import ManyToOneRel
 import graphene
@@ -14,14 +19,20 @@ from graphene.types.objecttype import ObjectType
 from graphene.types.structures import Structure
 from graphene.types.unmountedtype import UnmountedType
 from graphene.types.utils import yank_fields_from_attrs
-from graphene_django.registry import get_global_registry
+from graphene_django.registry import Registry, get_global_registry
 from graphene_django.types import DjangoObjectType
 from graphql.error import GraphQLError
 from graphql_relay import from_global_id
 
 _registry = get_global_registry()
+_registry_indexes: "weakref.WeakKeyDictionary[Registry, Dict[str, Any]]"
+_registry_indexes = weakref.WeakKeyDictionary()
 _extra_register = {}
+_extra_index = {}
 _input_registry = {}
+_ASYNC_CONTEXT_ATTR = "_graphene_django_plus_async"
+
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
 
 
 def _resolve_nodes(ids, graphene_type=None):
@@ -55,14 +66,32 @@ def _resolve_nodes(ids, graphene_type=None):
     return used_type, pks
 
 
+def _get_registry_index(registry: Registry, rebuild: bool = False) -> Dict[str, Any]:
+    index = _registry_indexes.get(registry)
+    if index is None or rebuild:
+        index = {}
+        for _type in registry._registry.values():
+            index.setdefault(_type._meta.name, _type)
+        _registry_indexes[registry] = index
+    return index
+
+
 def _resolve_graphene_type(type_name, registry=None):
     registry = registry or _registry
-    for _, _type in itertools.chain(_extra_register.items(), registry._registry.items()):
-        if _type._meta.name == type_name:
-            return _type
-    else:  # pragma: no cover
+    _type = _extra_index.get(type_name)
+    if _type is not None:
+        return _type
+
+    _type = _get_registry_index(registry).get(type_name)
+    # Types may have been registered (or replaced) since the index was built
+    if _type is None or registry._registry.get(_type._meta.model) is not _type:
+        _type = _get_registry_index(registry, rebuild=True).get(type_name)
+
+    if _type is None:  # pragma: no cover
         raise AssertionError(f"Could not resolve the type {type_name}")
 
+    return _type
+
 
 def _get_input_attrs(object_type):
     new = {}
@@ -87,9 +116,37 @@ def register_type(graphene_type, name: Optional[str] = None):
     if name is None:
         name = graphene_type._meta.name
     _extra_register[name] = graphene_type
+    _extra_index.clear()
+    for _type in _extra_register.values():
+        _extra_index.setdefault(_type._meta.name, _type)
     return graphene_type
 
 
+def set_async_context(context, value: bool = True):
+    """Mark the context of an operation executed by graphql's async executor.
+
+    Mutations and node lookups resolved with a marked context return
+    awaitables when they are called from the event loop.
+    :class:`graphene_django_plus.views.AsyncGraphQLView` marks its requests
+    already, use this when calling `schema.execute_async` directly.
+
+    """
+    setattr(context, _ASYNC_CONTEXT_ATTR, value)
+
+
+def _is_async(info) -> bool:
+    # Sync executions can happen inside a running loop too (e.g. notebooks or
+    # async_to_sync), and sync resolvers run by the async view in a worker thread
+    # don't have one, so both the context's mark and the loop are needed
+    if not getattr(info.context, _ASYNC_CONTEXT_ATTR, False):
+        return False
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
 def get_node(info, id_: str, graphene_type: Optional[ObjectType] = None, registry=None):
     """Get a node given the relay id."""
     node_type, _id = from_global_id(id_)
@@ -103,16 +160,23 @@ def get_node(info, id_: str, graphene_type: Optional[ObjectType] = None, registr
         return graphene_type.get_node(info, _id)
 
 
-def get_nodes(info, ids: List[str], graphene_type: Optional[ObjectType] = None, registry=None):
-    """Get a list of nodes.
+async def aget_node(info, id_: str, graphene_type: Optional[ObjectType] = None, registry=None):
+    """Get a node given the relay id, using Django's async ORM."""
+    node_type, _id = from_global_id(id_)
+    if not graphene_type:
+        graphene_type = _resolve_graphene_type(node_type, registry)
+    assert graphene_type is not None
 
-    If the `graphene_type` argument is provided, the IDs will be validated
-    against this type. If the type was not provided, it will be looked up in
-    the Graphene's registry.
+    if issubclass(graphene_type, DjangoObjectType):
+        return await graphene_type._meta.model.objects.aget(pk=_id)
+    else:
+        node = graphene_type.get_node(info, _id)
+        if inspect.isawaitable(node):
+            node = await node
+        return node
 
-    Raises an error if not all IDs are of the same type.
 
-    """
+def _get_nodes_lookup(ids, graphene_type=None, registry=None):
     if not ids:  # pragma: nocover
         raise ValueError("ids list cannot be empty")
 
@@ -125,22 +189,94 @@ def get_nodes(info, ids: List[str], graphene_type: Optional[ObjectType] = None,
         graphene_type = _resolve_graphene_type(nodes_type, registry)
     assert graphene_type is not None
 
-    if issubclass(graphene_type, DjangoObjectType):
-        nodes = list(graphene_type._meta.model.objects.filter(pk__in=pks))
-        nodes.sort(key=lambda e: pks.index(str(e.pk)))  # preserve order in pks
-
-        diff = set(pks) - {str(n.pk) for n in nodes}
-        if diff:
-            raise GraphQLError(
-                "There is no node of type {} with pk {}".format(
-                    graphene_type,
-                    ", ".join(diff),
-                )
+    if not issubclass(graphene_type, DjangoObjectType):
+        return graphene_type, pks, None, []
+
+    # Convert each pk only once, mapping it to its position in the result
+    pk_field = graphene_type._meta.model._meta.pk
+    positions: Dict[Any, int] = {}
+    missing = []
+    for pk in pks:
+        try:
+            value = pk_field.to_python(pk)
+        except ValidationError:
+            missing.append(pk)
+            continue
+        positions.setdefault(value, len(positions))
+
+    return graphene_type, pks, positions, missing
+
+
+def _get_nodes_result(graphene_type, positions, missing, nodes):
+    found: List[Any] = [None] * len(positions)
+    for node in nodes:
+        found[positions[node.pk]] = node
+    if not missing:
+        missing = [str(pk) for pk, node in zip(positions, found) if node is None]
+
+    if missing:
+        raise GraphQLError(
+            "There is no node of type {} with pk {}".format(
+                graphene_type,
+                ", ".join(missing),
             )
-    else:
+        )
+
+    return found
+
+
+def get_nodes(info, ids: List[str], graphene_type: Optional[ObjectType] = None, registry=None):
+    """Get a list of nodes.
+
+    If the `graphene_type` argument is provided, the IDs will be validated
+    against this type. If the type was not provided, it will be looked up in
+    the Graphene's registry.
+
+    Raises an error if not all IDs are of the same type.
+
+    The nodes are returned in the order of the IDs. Duplicated IDs will only
+    return their node once, in the position of their first occurrence.
+
+    """
+    graphene_type, pks, positions, missing = _get_nodes_lookup(ids, graphene_type, registry)
+    if positions is None:
+        return [graphene_type.get_node(info, id_) for id_ in pks]
+
+    nodes = []
+    if positions and not missing:
+        nodes = graphene_type._meta.model.objects.in_bulk(list(positions)).values()
+
+    return _get_nodes_result(graphene_type, positions, missing, nodes)
+
+
+async def aget_nodes(
+    info,
+    ids: List[str],
+    graphene_type: Optional[ObjectType] = None,
+    registry=None,
+):
+    """Get a list of nodes, using Django's async ORM.
+
+    The same as :func:`get_nodes`, but the nodes of types that are not
+    Django models are awaited concurrently.
+
+    """
+    graphene_type, pks, positions, missing = _get_nodes_lookup(ids, graphene_type, registry)
+    if positions is None:
         nodes = [graphene_type.get_node(info, id_) for id_ in pks]
+        if not any(inspect.isawaitable(n) for n in nodes):
+            return nodes
+
+        async def _await(n):
+            return await n if inspect.isawaitable(n) else n
 
-    return nodes
+        return list(await asyncio.gather(*[_await(n) for n in nodes]))
+
+    nodes = []
+    if positions and not missing:
+        nodes = (await graphene_type._meta.model.objects.ain_bulk(list(positions))).values()
+
+    return _get_nodes_result(graphene_type, positions, missing, nodes)
 
 
 def get_inputtype(name, object_type):
@@ -176,6 +312,54 @@ def get_model_fields(model: Type[models.Model]):
     return fields
 
 
+class LRUCache:
+    """A thread safe dict-like cache that discards the least recently used items.
+
+    :param maxsize: the maximum number of items to keep in the cache
+
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "collections.OrderedDict[Hashable, Any]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get an item from the cache, marking it as the most recently used."""
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any):  # noqa: A003
+        """Store an item in the cache, discarding the oldest ones if it is full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Remove all items from the cache and reset its statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """Get the cache statistics, like `functools.lru_cache` does."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+
 def update_dict_nested(d: dict, u: dict) -> dict:
     for k, v in u.items():
         if isinstance(v, Mapping):
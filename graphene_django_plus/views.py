@@ -1,7 +1,56 @@
 import contextlib
+from functools import partial
+import inspect
 import json
+from typing import Any, Dict, Tuple
 
+try:
+    import orjson
+
+    has_orjson = True
+except ImportError:  # pragma: no cover
+    has_orjson = False
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadhandler import FileUploadHandler
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Manager, Model, QuerySet
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed
+from django.middleware.csrf import get_token
+from django.utils.decorators import method_decorator
+from django.utils.functional import empty
+from django.views.decorators.csrf import ensure_csrf_cookie
+from graphene import relay
+from graphene.relay.node import GlobalID
+from graphene.types.resolver import attr_resolver, dict_or_attr_resolver, dict_resolver
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
 from graphene_django.views import GraphQLView as _GraphQLView
+from graphene_django.views import HttpError
+from graphql import (
+    DocumentNode,
+    ExecutionResult,
+    GraphQLError,
+    GraphQLSchema,
+    OperationType,
+    execute,
+    get_named_type,
+    get_operation_ast,
+    parse,
+    validate_schema,
+)
+from graphql.execution.middleware import MiddlewareManager
+from graphql.pyutils import is_awaitable
+from graphql.validation import validate
+
+from .models import clear_perms_checker
+from .mutations import BaseMutation
+from .perms import clear_perms_snapshot
+from .settings import graphene_django_plus_settings
+from .types import ModelType
+from .utils import CacheInfo, LRUCache, set_async_context
 
 
 def _get_key(key):
@@ -26,38 +75,211 @@ def _get_shallow_property(obj, prop):
 def _obj_set(obj, path, value):
     if isinstance(path, int):
         path = [path]
+    elif isinstance(path, str):
+        path = [_get_key(part) for part in path.split(".")]
 
     if not path:
-        return obj
+        return
 
-    if isinstance(path, str):
-        new_path = [_get_key(part) for part in path.split(".")]
-        return _obj_set(obj, new_path, value)
+    for key, next_key in zip(path, path[1:]):
+        current_value = _get_shallow_property(obj, key)
+        if current_value is None:
+            current_value = [] if isinstance(next_key, int) else {}
+            obj[key] = current_value
+        obj = current_value
 
-    current_path = path[0]
-    current_value = _get_shallow_property(obj, current_path)
+    obj[path[-1]] = value
 
-    if len(path) == 1:
-        obj[current_path] = value
 
-    if current_value is None:
-        with contextlib.suppress(IndexError):
-            if isinstance(path[1], int):
-                obj[current_path] = []
-            else:
-                obj[current_path] = {}
+def _json_default(obj):
+    return DjangoJSONEncoder().default(obj)
+
+
+def json_dumps(data: Any, pretty: bool = False) -> bytes:
+    """Encode the response `data` to json.
+
+    Uses `orjson <https://github.com/ijl/orjson>`_ when it is installed
+    (``pip install graphene-django-plus[orjson]``), which writes the bytes
+    directly, falling back to the stdlib's json for anything orjson can't
+    encode (e.g. integers larger than 64 bits). Either way, the output
+    matches django's ``DjangoJSONEncoder``.
+
+    This is the default ``JSON_ENCODER`` setting.
+
+    """
+    if has_orjson:
+        # Dates and times are passed to DjangoJSONEncoder, which formats them
+        # differently (e.g. milliseconds and "Z"). UUIDs are encoded by orjson
+        # as str(uuid), just like it does.
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if pretty:
+            option |= orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+        with contextlib.suppress(orjson.JSONEncodeError):
+            return orjson.dumps(data, default=_json_default, option=option)
+
+    if pretty:
+        content = json.dumps(
+            data,
+            sort_keys=True,
+            indent=2,
+            separators=(",", ": "),
+            cls=DjangoJSONEncoder,
+        )
+    else:
+        content = json.dumps(data, separators=(",", ":"), cls=DjangoJSONEncoder)
+    return content.encode()
+
+
+def _payload_too_large(message):
+    return HttpError(HttpResponse(message, status=413))
+
+
+class UploadLimitHandler(FileUploadHandler):
+    """Upload handler enforcing the ``UPLOAD_MAX_*`` settings.
+
+    Django's multipart parser streams the body through the upload handlers in
+    ``UPLOAD_CHUNK_SIZE`` chunks, so the limits are checked while the body is
+    being read and the request is rejected as soon as one is exceeded. The
+    chunks are passed on to the next handlers, which spool them to memory or to
+    a temporary file as usual.
+
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.chunk_size = graphene_django_plus_settings.UPLOAD_CHUNK_SIZE
+        self.max_file_size = graphene_django_plus_settings.UPLOAD_MAX_FILE_SIZE
+        self.max_size = graphene_django_plus_settings.UPLOAD_MAX_SIZE
+        self.total_size = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if self.max_size is not None and content_length > self.max_size:
+            raise _payload_too_large("Request body exceeds the maximum upload size.")
+
+    def receive_data_chunk(self, raw_data, start):
+        size = len(raw_data)
+        if self.max_file_size is not None and start + size > self.max_file_size:
+            raise _payload_too_large(f"File {self.file_name} exceeds the maximum file size.")
+
+        self.total_size += size
+        if self.max_size is not None and self.total_size > self.max_size:
+            raise _payload_too_large("Request body exceeds the maximum upload size.")
+
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+_document_cache = LRUCache()
+_persisted_documents: Dict[Tuple[GraphQLSchema, str], Dict[str, DocumentNode]] = {}
+
+
+def load_persisted_documents(schema: GraphQLSchema, path: str) -> Dict[str, DocumentNode]:
+    """Load the persisted queries manifest at `path`.
+
+    The manifest is a json object mapping the query ids to their text. Each
+    query is parsed and validated against `schema` only once.
+
+    :raises ImproperlyConfigured: if the manifest or a query is not valid
 
-    return _obj_set(obj[current_path], path[1:], value)
+    """
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ImproperlyConfigured(f"Could not load the persisted queries manifest: {e}")
+    if not isinstance(manifest, dict):
+        raise ImproperlyConfigured("The persisted queries manifest must be a json object.")
+
+    documents = {}
+    for id_, query in manifest.items():
+        try:
+            document = parse(query)
+        except Exception as e:
+            raise ImproperlyConfigured(f"Persisted query {id_} is not valid: {e}")
+
+        errors = validate(schema, document)
+        if errors:
+            raise ImproperlyConfigured(f"Persisted query {id_} is not valid: {errors[0].message}")
+
+        documents[id_] = document
+
+    return documents
+
+
+def get_document_cache_info() -> CacheInfo:
+    """Get the hits, misses and size of the parsed documents cache."""
+    return _document_cache.info()
+
+
+def get_persisted_documents(schema: GraphQLSchema) -> Dict[str, DocumentNode]:
+    """Get the documents from the ``PERSISTED_QUERIES`` manifest for `schema`."""
+    path = graphene_django_plus_settings.PERSISTED_QUERIES
+    if not path:
+        return {}
+
+    key = (schema, path)
+    documents = _persisted_documents.get(key)
+    if documents is None:
+        documents = _persisted_documents[key] = load_persisted_documents(schema, path)
+
+    return documents
+
+
+def _clear_user_caches(request):
+    # The same user object can be used by other requests (e.g. by test clients
+    # or authentication backends), which must not see permissions cached here
+    user = getattr(request, "user", None)
+    if user is None or getattr(user, "_wrapped", None) is empty:
+        return
+
+    clear_perms_snapshot(user)
+    clear_perms_checker(user)
 
 
 class GraphQLView(_GraphQLView):
-    """GraphQLView with file upload support.
+    """GraphQLView with file upload and persisted queries support.
+
+    When created with ``batch=True``, it receives a list of operations (e.g.
+    the ones sent by apollo's batch link) and runs them in order, sharing the
+    request as their context. Per-request caches (permissions, node loaders,
+    object permission checkers) are shared by all of them. The number of
+    operations is limited by the ``BATCH_MAX_SIZE`` setting.
 
     Based on:
         https://github.com/mirumee/saleor/blob/master/saleor/graphql/views.py
 
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The manifest is only loaded once, this makes sure it is valid
+        get_persisted_documents(self.schema.graphql_schema)
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Fail on startup instead of on the first request when the
+        # persisted queries manifest is not valid
+        cls(**initkwargs)
+        return view
+
+    def parse_body(self, request):
+        content_type = self.get_content_type(request)
+        if content_type == "multipart/form-data" and not hasattr(request, "_files"):
+            request.upload_handlers.insert(0, UploadLimitHandler(request))
+
+        data = super().parse_body(request)
+
+        max_size = graphene_django_plus_settings.BATCH_MAX_SIZE
+        if isinstance(data, list) and max_size is not None and len(data) > max_size:
+            raise HttpError(
+                HttpResponseBadRequest(f"Batch requests are limited to {max_size} operations.")
+            )
+
+        return data
+
     @staticmethod
     def get_graphql_params(request, data):
         query, variables, operation_name, id_ = _GraphQLView.get_graphql_params(
@@ -67,8 +289,12 @@ class GraphQLView(_GraphQLView):
 
         content_type = _GraphQLView.get_content_type(request)
         if content_type == "multipart/form-data":
-            operations = json.loads(data.get("operations", "{}"))
-            files_map = json.loads(data.get("map", "{}"))
+            try:
+                operations = json.loads(data.get("operations", "{}"))
+                files_map = json.loads(data.get("map", "{}"))
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Multipart body sent invalid JSON."))
+
             for k, v in files_map.items():
                 for f in v:
                     _obj_set(operations, f, k)
@@ -76,3 +302,370 @@ class GraphQLView(_GraphQLView):
             variables = operations.get("variables")
 
         return query, variables, operation_name, id_
+
+    @method_decorator(ensure_csrf_cookie)
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            if not self.batch:
+                return super().dispatch(request, *args, **kwargs)
+
+            self.check_method(request)
+            data = self.parse_body(request)
+            responses = [self.get_response(request, entry) for entry in data]
+            return self.get_batch_response(responses)
+        except HttpError as e:
+            return self.get_error_response(request, e)
+        finally:
+            _clear_user_caches(request)
+
+    def check_method(self, request):
+        if request.method.lower() not in ("get", "post"):
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["GET", "POST"],
+                    "GraphQL only supports GET and POST requests.",
+                )
+            )
+
+    def get_batch_response(self, responses):
+        status_code = max(response[1] for response in responses)
+        return HttpResponse(
+            status=status_code,
+            content=b"[" + b",".join(response[0] for response in responses) + b"]",
+            content_type="application/json",
+        )
+
+    def get_error_response(self, request, error):
+        response = error.response
+        response["Content-Type"] = "application/json"
+        response.content = self.json_encode(request, {"errors": [self.format_error(error)]})
+        return response
+
+    def json_encode(self, request, d, pretty=False):
+        pretty = self.pretty or pretty or bool(request.GET.get("pretty"))
+        return graphene_django_plus_settings.JSON_ENCODER(d, pretty=pretty)
+
+    @property
+    def atomic_mutations(self):
+        return (
+            graphene_settings.ATOMIC_MUTATIONS is True
+            or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+        )
+
+    def get_document(self, request, data, query, show_graphiql=False):
+        """Get the parsed and validated document to execute.
+
+        Persisted queries are looked up by the request's ``id`` and are
+        returned directly, as they were already validated when loaded. Other
+        queries are parsed and validated once and kept in a LRU cache of
+        ``DOCUMENT_CACHE_SIZE`` documents.
+
+        :returns: a tuple with the document (or ``None`` when there's nothing
+            to execute) and a list of errors
+
+        """
+        schema = self.schema.graphql_schema
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return None, schema_validation_errors
+
+        id_ = request.GET.get("id") or data.get("id")
+        if id_:
+            document = get_persisted_documents(schema).get(id_)
+            if document is not None:
+                return document, []
+            if not query:
+                return None, [GraphQLError(f"Unknown persisted query: {id_}")]
+
+        if not query:
+            if show_graphiql:
+                return None, []
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        if graphene_django_plus_settings.PERSISTED_QUERIES_ONLY:
+            return None, [GraphQLError("Only persisted queries are allowed.")]
+
+        cache_size = graphene_django_plus_settings.DOCUMENT_CACHE_SIZE
+        key = (schema, query)
+        if cache_size:
+            cached = _document_cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            document = parse(query)
+        except Exception as e:
+            return None, [e]
+
+        result = document, validate(schema, document)
+        if cache_size:
+            _document_cache.maxsize = cache_size
+            _document_cache.set(key, result)
+
+        return result
+
+    def get_execute_options(self, request, variables, operation_name):
+        execute_options = {
+            "root_value": self.get_root_value(request),
+            "context_value": self.get_context(request),
+            "variable_values": variables,
+            "operation_name": operation_name,
+            "middleware": self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            execute_options["execution_context_class"] = self.execution_context_class
+
+        return execute_options
+
+    def execute_graphql_request(
+        self,
+        request,
+        data,
+        query,
+        variables,
+        operation_name,
+        show_graphiql=False,
+    ):
+        document, errors = self.get_document(request, data, query, show_graphiql)
+        if errors:
+            return ExecutionResult(data=None, errors=errors)
+        if document is None:
+            return None
+
+        operation_ast = get_operation_ast(document, operation_name)
+        operation = operation_ast and operation_ast.operation
+        if request.method.lower() == "get" and operation not in (None, OperationType.QUERY):
+            if show_graphiql:
+                return None
+
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    f"Can only perform a {operation.value} operation from a POST request.",
+                )
+            )
+
+        schema = self.schema.graphql_schema
+        try:
+            execute_options = self.get_execute_options(request, variables, operation_name)
+            if operation == OperationType.MUTATION and self.atomic_mutations:
+                with transaction.atomic():
+                    result = execute(schema, document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            return execute(schema, document, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+
+def _evaluate(result):
+    if isinstance(result, Manager):
+        result = result.all()
+    if isinstance(result, QuerySet):
+        result = list(result)
+    return result
+
+
+def _resolve_in_thread(next_, root, info, **kwargs):
+    return _evaluate(next_(root, info, **kwargs))
+
+
+def _get_default_attname(resolve):
+    # The attribute read by graphene's default resolvers, None for any other resolver
+    if not isinstance(resolve, partial):
+        return None
+    if resolve.func is GlobalID.id_resolver:
+        return _get_default_attname(resolve.args[0])
+    if resolve.func in (dict_or_attr_resolver, attr_resolver, dict_resolver):
+        return resolve.args[0]
+    return None
+
+
+def _resolves_in_loop(root, info) -> bool:
+    # Resolvers that are known to not touch the database synchronously
+    field = info.parent_type.fields.get(info.field_name)
+    # Introspection fields (__typename, __schema, __type) only read the schema
+    if field is None or info.field_name.startswith("__"):
+        return True
+
+    resolve = field.resolve
+    if inspect.iscoroutinefunction(resolve):
+        return True
+
+    # Mutations and node lookups return awaitables when called from the event loop
+    graphene_type = getattr(get_named_type(info.return_type), "graphene_type", None)
+    if isinstance(graphene_type, type):
+        if issubclass(graphene_type, BaseMutation):
+            return info.parent_type is info.schema.mutation_type
+        if (
+            issubclass(graphene_type, ModelType)
+            and isinstance(resolve, partial)
+            and getattr(resolve.func, "__func__", None) is relay.Node.node_resolver.__func__
+        ):
+            return True
+
+    attname = _get_default_attname(resolve)
+    if attname is None:
+        return False
+    if not isinstance(root, Model):
+        return True
+
+    # Only the data already loaded in the instance, anything else may be fetched
+    return attname in root.__dict__ or attname in root._state.fields_cache
+
+
+def _sync_resolver_middleware(next_, root, info, **kwargs):
+    """Keep synchronous ORM access out of the event loop.
+
+    Resolvers that are not known to be safe to run in the event loop (e.g.
+    custom sync resolvers, relations or fields that are not loaded yet) are
+    run in a worker thread from the start, and are never retried, so their
+    side effects only happen once. Lazy querysets returned by a resolver
+    are evaluated in a worker thread too.
+
+    """
+    if not _resolves_in_loop(root, info):
+        return sync_to_async(_resolve_in_thread)(next_, root, info, **kwargs)
+
+    result = next_(root, info, **kwargs)
+    if isinstance(result, Manager) or (
+        isinstance(result, QuerySet) and result._result_cache is None
+    ):
+        return sync_to_async(_evaluate)(result)
+
+    return result
+
+
+class AsyncGraphQLView(GraphQLView):
+    """GraphQLView for ASGI deployments.
+
+    The request body is parsed in a worker thread and the operation is run with
+    graphql's async executor, so async resolvers (e.g. the ones from
+    :class:`graphene_django_plus.mutations.ModelMutation`) run on the event
+    loop without taking a thread for the whole request. Synchronous
+    resolvers that may access the database are run in a worker thread.
+
+    Mutations are run synchronously in a worker thread when ``ATOMIC_MUTATIONS``
+    is enabled, since a transaction can't span the event loop.
+
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        get_token(request)
+
+        try:
+            self.check_method(request)
+            data = await sync_to_async(self.parse_body)(request)
+            if self.graphiql and self.can_display_graphiql(request, data):
+                return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+            if self.batch:
+                return self.get_batch_response(
+                    [await self.get_response_async(request, entry) for entry in data]
+                )
+
+            result, status_code = await self.get_response_async(request, data)
+            return HttpResponse(
+                status=status_code,
+                content=result,
+                content_type="application/json",
+            )
+        except HttpError as e:
+            return self.get_error_response(request, e)
+        finally:
+            _clear_user_caches(request)
+
+    async def get_response_async(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id_ = self.get_graphql_params(request, data)
+
+        execution_result = await self.execute_graphql_request_async(
+            request,
+            data,
+            query,
+            variables,
+            operation_name,
+            show_graphiql,
+        )
+
+        status_code = 200
+        if execution_result:
+            response = {}
+
+            if execution_result.errors:
+                response["errors"] = [self.format_error(e) for e in execution_result.errors]
+
+            if execution_result.errors and any(
+                not getattr(e, "path", None) for e in execution_result.errors
+            ):
+                status_code = 400
+            else:
+                response["data"] = execution_result.data
+
+            if self.batch:
+                response["id"] = id_
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+        else:
+            result = None
+
+        return result, status_code
+
+    def get_async_middleware(self, request):
+        middleware = self.get_middleware(request)
+        if isinstance(middleware, MiddlewareManager):
+            middleware = middleware.middlewares
+
+        # graphql applies the first middleware closest to the resolver
+        return [_sync_resolver_middleware, *(middleware or [])]
+
+    async def execute_graphql_request_async(
+        self,
+        request,
+        data,
+        query,
+        variables,
+        operation_name,
+        show_graphiql=False,
+    ):
+        document, errors = self.get_document(request, data, query, show_graphiql)
+        if errors:
+            return ExecutionResult(data=None, errors=errors)
+        if document is None:
+            return None
+
+        operation_ast = get_operation_ast(document, operation_name)
+        operation = operation_ast and operation_ast.operation
+        if request.method.lower() == "get" and operation not in (None, OperationType.QUERY):
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    f"Can only perform a {operation.value} operation from a POST request.",
+                )
+            )
+
+        if operation == OperationType.MUTATION and self.atomic_mutations:
+            return await sync_to_async(self.execute_graphql_request)(
+                request,
+                data,
+                query,
+                variables,
+                operation_name,
+                show_graphiql,
+            )
+
+        try:
+            execute_options = self.get_execute_options(request, variables, operation_name)
+            execute_options["middleware"] = self.get_async_middleware(request)
+            set_async_context(execute_options["context_value"])
+
+            result = execute(self.schema.graphql_schema, document, **execute_options)
+            if is_awaitable(result):
+                result = await result
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
@@ -146,3 +146,63 @@ class MilestoneComment(models.Model):
         blank=True,
         on_delete=models.SET_NULL,
     )
+
+
+class LabelGroup(models.Model):
+
+    labels: "RelatedManager[Label]"
+
+    id = models.BigAutoField(  # noqa: A003
+        verbose_name="ID",
+        primary_key=True,
+    )
+    name = models.CharField(
+        max_length=255,
+    )
+
+
+class Label(models.Model):
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(code__isnull=True) | ~models.Q(code=models.F("name")),
+                name="label_code_not_name",
+            ),
+        ]
+
+    id = models.BigAutoField(  # noqa: A003
+        verbose_name="ID",
+        primary_key=True,
+    )
+    name = models.CharField(
+        max_length=255,
+    )
+    code = models.CharField(
+        max_length=32,
+        unique=True,
+        null=True,
+        blank=True,
+        default=None,
+    )
+    created_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=None,
+    )
+    data = models.JSONField(
+        default=dict,
+        blank=True,
+    )
+    main_group = models.ForeignKey[LabelGroup](
+        LabelGroup,
+        related_name="main_labels",
+        null=True,
+        blank=True,
+        default=None,
+        on_delete=models.SET_NULL,
+    )
+    groups = models.ManyToManyField(
+        LabelGroup,
+        related_name="labels",
+        blank=True,
+    )
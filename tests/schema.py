@@ -37,6 +37,15 @@ class MilestoneType(ModelType):
         connection_class = CountableConnection
         interfaces = [relay.Node]
         filter_fields = {}
+        field_dependencies = {
+            "display_name": ["name", "due_date"],
+        }
+
+    display_name = graphene.String()
+
+    @staticmethod
+    def resolve_display_name(root: Milestone, info):
+        return f"{root.name} ({root.due_date})" if root.due_date else root.name
 
 
 class ProjectType(ModelType):
@@ -74,6 +83,7 @@ class Query(graphene.ObjectType, _Query):
     project_name_only = relay.Node.Field(ProjectNameOnlyType)
 
     milestones = OrderableConnectionField(MilestoneType)
+    milestones_keyset = OrderableConnectionField(MilestoneType, keyset=True)
     milestone = relay.Node.Field(MilestoneType)
 
     issues = OrderableConnectionField(IssueType)
@@ -1,7 +1,30 @@
+import datetime
 import json
+import pickle
 from unittest import mock
 
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+import graphene
+from graphene import relay
+from graphene_django import DjangoListField
+from graphene_django.registry import Registry
+from graphql_relay import from_global_id, offset_to_cursor
+
+from graphene_django_plus.fields import (
+    CachedCount,
+    CountableConnection,
+    EstimatedCount,
+    OrderableConnectionField,
+    WindowCount,
+)
+from graphene_django_plus.types import ModelType, schema_registry
+
 from .base import BaseTestCase
+from .models import Issue, Label, LabelGroup, Milestone
+from .schema import IssueType, MilestoneType
 
 
 class TestModels(BaseTestCase):
@@ -107,8 +130,115 @@ class TestModels(BaseTestCase):
             {"data": {"issues": {"totalCount": 2}}},
         )
 
-    @mock.patch("graphene_django_plus.types.gql_optimizer", None)
-    def test_total_count_no_gql_optimizer(self):
+    def test_prefetch_object_permissions(self):
+        with mock.patch.object(IssueType, "prefetch_object_permissions") as prefetch:
+            r = self.query(
+                """
+                query issues {
+                    issues {
+                        edges {
+                            node {
+                                name
+                            }
+                        }
+                    }
+                }
+                """,
+                operation_name="issues",
+            )
+        self.assertEqual(len(json.loads(r.content)["data"]["issues"]["edges"]), 2)
+        prefetch.assert_called_once()
+        self.assertEqual(prefetch.call_args[0][1], self.allowed_issues)
+
+    @override_settings(DEBUG=True)
+    def test_prefetch_object_permissions_debug(self):
+        with mock.patch.object(IssueType, "prefetch_object_permissions") as prefetch:
+            r = self.query(
+                """
+                query issues {
+                    issues {
+                        edges {
+                            node {
+                                name
+                            }
+                        }
+                    }
+                }
+                """,
+                operation_name="issues",
+            )
+        self.assertEqual(len(json.loads(r.content)["data"]["issues"]["edges"]), 2)
+        prefetch.assert_called_once()
+        self.assertEqual(prefetch.call_args[0][1], self.allowed_issues)
+
+    def test_prefetch_object_permissions_pickle(self):
+        querysets = []
+
+        class Query(graphene.ObjectType):
+            issues = graphene.List(IssueType)
+
+            def resolve_issues(root, info):
+                qs = IssueType.get_queryset(Issue.objects.all(), info)
+                querysets.append(qs)
+                return qs
+
+        context = RequestFactory().post("/graphql")
+        context.user = self.user
+        r = graphene.Schema(query=Query).execute("query { issues { name } }", context_value=context)
+        self.assertIsNone(r.errors)
+        (qs,) = querysets
+        self.assertEqual(list(pickle.loads(pickle.dumps(qs))), self.allowed_issues)
+
+    def test_prefetch_object_permissions_list(self):
+        class Query(graphene.ObjectType):
+            issues = DjangoListField(IssueType)
+
+        context = RequestFactory().post("/graphql")
+        context.user = self.user
+        with mock.patch.object(IssueType, "prefetch_object_permissions") as prefetch:
+            r = graphene.Schema(query=Query).execute(
+                "query { issues { name } }",
+                context_value=context,
+            )
+        self.assertIsNone(r.errors)
+        self.assertEqual(len(r.data["issues"]), 2)
+        prefetch.assert_called_once()
+        self.assertEqual(prefetch.call_args[0][1], self.allowed_issues)
+
+    def test_prefetch_object_permissions_nested(self):
+        with mock.patch.object(IssueType, "prefetch_object_permissions") as prefetch:
+            r = self.query(
+                """
+                query milestones {
+                    milestones {
+                        edges {
+                            node {
+                                issues {
+                                    edges {
+                                        node {
+                                            name
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+                """,
+                operation_name="milestones",
+            )
+        self.assertNotIn("errors", json.loads(r.content))
+        # Each milestone's page is batched by itself
+        self.assertEqual(
+            [c[0][1] for c in prefetch.call_args_list],
+            [
+                [i for i in self.allowed_issues if i.milestone == m]
+                for m in [self.milestone_1, self.milestone_2]
+            ],
+        )
+
+    @override_settings(GRAPHENE_DJANGO_PLUS={"QUERY_PLANNER": False})
+    def test_total_count_no_query_planner(self):
         # projects
         r = self.query(
             """
@@ -156,3 +286,274 @@ class TestModels(BaseTestCase):
             json.loads(r.content),
             {"data": {"issues": {"totalCount": 2}}},
         )
+
+
+class TestKeysetPagination(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        for i, due_date in enumerate([None, datetime.date(2040, 1, 1), datetime.date(2050, 1, 1)]):
+            Milestone.objects.create(
+                name=f"Milestone {i + 1}",
+                due_date=due_date,
+                project=self.project,
+            )
+
+    def paginate(self, orderby, size, backwards=False):
+        query = """
+            query milestones ($orderby: [String], $first: Int, $last: Int,
+                              $after: String, $before: String) {
+                milestonesKeyset (orderby: $orderby, first: $first, last: $last,
+                                  after: $after, before: $before) {
+                    totalCount
+                    pageInfo {
+                        hasNextPage
+                        hasPreviousPage
+                        startCursor
+                        endCursor
+                    }
+                    edges {
+                        node {
+                            id
+                        }
+                    }
+                }
+            }
+        """
+        ret = []
+        cursor = None
+        while True:
+            variables = {"orderby": orderby}
+            if backwards:
+                variables.update({"last": size, "before": cursor})
+            else:
+                variables.update({"first": size, "after": cursor})
+            r = self.query(query, operation_name="milestones", variables=variables)
+            data = json.loads(r.content)
+            self.assertNotIn("errors", data)
+            connection = data["data"]["milestonesKeyset"]
+            self.assertEqual(connection["totalCount"], Milestone.objects.count())
+            ids = [int(from_global_id(e["node"]["id"])[1]) for e in connection["edges"]]
+            self.assertLessEqual(len(ids), size)
+            page_info = connection["pageInfo"]
+            if backwards:
+                ret = ids + ret
+                has_more = page_info["hasPreviousPage"]
+                cursor = page_info["startCursor"]
+            else:
+                ret.extend(ids)
+                has_more = page_info["hasNextPage"]
+                cursor = page_info["endCursor"]
+            if not has_more:
+                return ret
+
+    def test_paginate(self):
+        milestones = list(Milestone.objects.all())
+        # Nulls are considered greater than other values
+        max_date = datetime.date.max
+        for orderby, key in [
+            (None, lambda m: m.pk),
+            (["name"], lambda m: (m.name, m.pk)),
+            (["dueDate"], lambda m: (m.due_date or max_date, m.pk)),
+        ]:
+            expected = [m.pk for m in sorted(milestones, key=key)]
+            for size in [1, 2, 10]:
+                self.assertEqual(self.paginate(orderby, size), expected)
+                self.assertEqual(self.paginate(orderby, size, backwards=True), expected)
+
+    def test_paginate_descending(self):
+        milestones = list(Milestone.objects.all())
+        expected = [
+            m.pk
+            for m in sorted(
+                milestones,
+                key=lambda m: (m.due_date or datetime.date.max, m.name),
+                reverse=True,
+            )
+        ]
+        for size in [1, 2, 10]:
+            self.assertEqual(self.paginate(["-dueDate", "-name"], size), expected)
+            self.assertEqual(self.paginate(["-dueDate", "-name"], size, backwards=True), expected)
+
+    def test_no_offset(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(len(self.paginate(["name"], 2)), Milestone.objects.count())
+
+        sqls = [q["sql"] for q in ctx.captured_queries if "tests_milestone" in q["sql"]]
+        self.assertTrue(sqls)
+        self.assertFalse(any("OFFSET" in sql for sql in sqls))
+
+        r = self.query(
+            """
+            query milestones {
+                milestonesKeyset (offset: 1) {
+                    edges {
+                        node {
+                            id
+                        }
+                    }
+                }
+            }
+            """,
+            operation_name="milestones",
+        )
+        self.assertIn("offset", json.loads(r.content)["errors"][0]["message"])
+
+
+class TestKeysetValues(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        label_registry = Registry()
+
+        class LabelType(ModelType):
+            class Meta:
+                model = Label
+                connection_class = CountableConnection
+                interfaces = [relay.Node]
+                fields = "__all__"
+                registry = label_registry
+
+        self.addCleanup(schema_registry.pop, "LabelType", None)
+        self.connection = LabelType._meta.connection
+
+    def paginate(self, qs, size):
+        ret = []
+        cursor = None
+        for _ in range(qs.count() + 1):
+            page = OrderableConnectionField.resolve_keyset_connection(
+                self.connection,
+                {"first": size, "after": cursor},
+                qs,
+            )
+            ret.extend(edge.node.pk for edge in page.edges)
+            if not page.page_info.has_next_page:
+                break
+            cursor = page.page_info.end_cursor
+        else:
+            self.fail(f"Pagination did not end: {ret}")
+
+        return ret
+
+    def test_microseconds(self):
+        now = datetime.datetime(2050, 1, 1, 12, 0, 0, 123000)
+        labels = [
+            Label.objects.create(
+                name=f"Label {i}",
+                created_at=now + datetime.timedelta(microseconds=i * 100),
+            )
+            for i in [2, 0, 3, 1]
+        ]
+        expected = [label.pk for label in sorted(labels, key=lambda label: label.created_at)]
+        qs = Label.objects.order_by("created_at")
+        for size in [1, 2, 10]:
+            self.assertEqual(self.paginate(qs, size), expected)
+
+    def test_nullable_relation(self):
+        groups = [LabelGroup.objects.create(name=name) for name in ["B", "A"]]
+        labels = [
+            Label.objects.create(name="Label 1", main_group=groups[0]),
+            Label.objects.create(name="Label 2"),
+            Label.objects.create(name="Label 3", main_group=groups[1]),
+        ]
+        # Nulls are considered greater than other values
+        expected = [labels[2].pk, labels[0].pk, labels[1].pk]
+        qs = Label.objects.order_by("main_group__name")
+        for size in [1, 2, 10]:
+            self.assertEqual(self.paginate(qs, size), expected)
+
+
+class TestTotalCount(BaseTestCase):
+    query_milestones = """
+        query milestones ($first: Int, $last: Int, $after: String, $before: String,
+                          $offset: Int) {
+            milestones (orderby: ["name"], first: $first, last: $last, after: $after,
+                        before: $before, offset: $offset) {
+                totalCount
+                pageInfo {
+                    hasNextPage
+                    hasPreviousPage
+                }
+                edges {
+                    node {
+                        name
+                    }
+                }
+            }
+        }
+    """
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3, 6):
+            Milestone.objects.create(name=f"Milestone {i}", project=self.project)
+        cache.clear()
+
+    def query_page(self, **variables):
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.query(self.query_milestones, operation_name="milestones", variables=variables)
+        data = json.loads(r.content)
+        self.assertNotIn("errors", data)
+        counts = [q["sql"] for q in ctx.captured_queries if "COUNT(*)" in q["sql"]]
+        return data["data"]["milestones"], counts
+
+    def test_pagination(self):
+        names = [f"Milestone {i}" for i in range(1, 6)]
+        for variables, expected, has_previous, has_next in [
+            ({}, names, False, False),
+            ({"first": 2}, names[:2], False, True),
+            ({"first": 2, "after": offset_to_cursor(2)}, names[3:], False, False),
+            ({"first": 2, "offset": 1}, names[1:3], False, True),
+            ({"first": 2, "before": offset_to_cursor(2)}, names[:2], False, False),
+            ({"last": 2, "before": offset_to_cursor(3)}, names[1:3], True, False),
+            ({"last": 2}, names[3:], True, False),
+            ({"first": 2, "after": offset_to_cursor(10)}, [], False, False),
+        ]:
+            page, _ = self.query_page(**variables)
+            self.assertEqual([e["node"]["name"] for e in page["edges"]], expected, variables)
+            self.assertEqual(
+                page["pageInfo"],
+                {"hasPreviousPage": has_previous, "hasNextPage": has_next},
+                variables,
+            )
+            self.assertEqual(page["totalCount"], len(names))
+
+    def test_not_counted(self):
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.query(
+                "query milestones { milestones (first: 2) { edges { node { name } } } }",
+                operation_name="milestones",
+            )
+        self.assertEqual(len(json.loads(r.content)["data"]["milestones"]["edges"]), 2)
+        self.assertFalse([q for q in ctx.captured_queries if "COUNT(*)" in q["sql"]])
+
+    def test_window_count(self):
+        strategy = WindowCount()
+        with mock.patch.object(MilestoneType._meta.connection, "total_count_strategy", strategy):
+            page, counts = self.query_page(first=2)
+            self.assertEqual(page["totalCount"], 5)
+            self.assertEqual(len(counts), 1)
+            self.assertIn("OVER", counts[0])
+
+            # Empty pages fall back to a count query
+            page, counts = self.query_page(first=2, after=offset_to_cursor(10))
+            self.assertEqual(page["totalCount"], 5)
+            self.assertEqual(len(counts), 2)
+            self.assertNotIn("OVER", counts[1])
+
+    def test_cached_count(self):
+        strategy = CachedCount(timeout=60)
+        with mock.patch.object(MilestoneType._meta.connection, "total_count_strategy", strategy):
+            page, counts = self.query_page(first=2)
+            self.assertEqual(page["totalCount"], 5)
+            self.assertEqual(len(counts), 1)
+
+            page, counts = self.query_page(first=2, after=offset_to_cursor(1))
+            self.assertEqual(page["totalCount"], 5)
+            self.assertEqual(counts, [])
+
+    def test_estimated_count(self):
+        # The estimate is only available on PostgreSQL
+        strategy = EstimatedCount(threshold=0)
+        with mock.patch.object(MilestoneType._meta.connection, "total_count_strategy", strategy):
+            page, counts = self.query_page(first=2)
+        self.assertEqual(page["totalCount"], 5)
+        self.assertEqual(len(counts), connection.vendor != "postgresql")
@@ -0,0 +1,114 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from graphql_relay import to_global_id
+
+from graphene_django_plus import planner
+from graphene_django_plus.loaders import NodeLoader, get_node_loader
+from graphene_django_plus.utils import set_async_context
+
+from .base import BaseTestCase
+from .schema import schema
+
+
+class TestNodeLoader(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        planner._plan_cache.clear()
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def issue_queries(self, ctx):
+        return [
+            q["sql"] for q in ctx.captured_queries if q["sql"].startswith('SELECT "tests_issue"')
+        ]
+
+    def test_aliases(self):
+        issues = self.allowed_issues + self.unallowed_issues
+        query = "query {{ {} }}".format(
+            " ".join(
+                f'i{n}: issue(id: "{to_global_id("IssueType", i.pk)}") {{ name }}'
+                for n, i in enumerate(issues)
+            )
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            r = schema.execute(query, context_value=self.request)
+
+        self.assertIsNone(r.errors)
+        self.assertEqual(
+            [(r.data[f"i{n}"] or {}).get("name") for n in range(len(issues))],
+            [i.name for i in self.allowed_issues] + [None for _ in self.unallowed_issues],
+        )
+        self.assertEqual(len(self.issue_queries(ctx)), 1)
+
+    def test_aliases_async(self):
+        issues = self.allowed_issues + self.unallowed_issues
+        query = "query {{ {} }}".format(
+            " ".join(
+                f'i{n}: issue(id: "{to_global_id("IssueType", i.pk)}") {{ name }}'
+                for n, i in enumerate(issues)
+            )
+        )
+        aload = NodeLoader.aload
+        with CaptureQueriesContext(connection) as ctx, mock.patch.object(
+            NodeLoader,
+            "aload",
+            autospec=True,
+            side_effect=aload,
+        ) as m:
+            set_async_context(self.request)
+            r = async_to_sync(schema.execute_async)(query, context_value=self.request)
+
+        self.assertIsNone(r.errors)
+        self.assertEqual(
+            [(r.data[f"i{n}"] or {}).get("name") for n in range(len(issues))],
+            [i.name for i in self.allowed_issues] + [None for _ in self.unallowed_issues],
+        )
+        # The concurrent resolvers waited for the same query
+        self.assertEqual(m.call_count, len(issues))
+        self.assertEqual(len(self.issue_queries(ctx)), 1)
+
+    def test_aliases_merge_selections(self):
+        first, second = self.allowed_issues[:2]
+        query = """
+            query issues ($first: ID!, $second: ID!) {
+              first: issue(id: $first) { name }
+              second: issue(id: $second) { priority }
+            }
+        """
+        variables = {
+            "first": to_global_id("IssueType", first.pk),
+            "second": to_global_id("IssueType", second.pk),
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            r = schema.execute(query, context_value=self.request, variable_values=variables)
+
+        self.assertIsNone(r.errors)
+        self.assertEqual(r.data["first"], {"name": first.name})
+        self.assertEqual(r.data["second"], {"priority": second.priority})
+        # No deferred field got refreshed for the second alias
+        self.assertEqual(len(self.issue_queries(ctx)), 1)
+
+    def test_memoized(self):
+        issue = self.allowed_issues[0]
+        query = f'query {{ issue(id: "{to_global_id("IssueType", issue.pk)}") {{ name }} }}'
+        schema.execute(query, context_value=self.request)
+
+        with CaptureQueriesContext(connection) as ctx:
+            r = schema.execute(query, context_value=self.request)
+
+        self.assertIsNone(r.errors)
+        self.assertEqual(r.data["issue"], {"name": issue.name})
+        self.assertEqual(self.issue_queries(ctx), [])
+
+        get_node_loader(self.request).clear()
+        with CaptureQueriesContext(connection) as ctx:
+            schema.execute(query, context_value=self.request)
+        self.assertEqual(len(self.issue_queries(ctx)), 1)
+
+    def test_no_context(self):
+        self.assertIsNot(get_node_loader(), get_node_loader())
+        self.assertIs(get_node_loader(self.request), get_node_loader(self.request))
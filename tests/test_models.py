@@ -3,6 +3,12 @@ from unittest import mock
 from django.contrib.auth.models import Permission, User
 from django.contrib.contenttypes.models import ContentType
 
+from graphene_django_plus.models import (
+    BatchedPermissionChecker,
+    clear_perms_checker,
+    get_perms_checker,
+)
+
 from .base import BaseTestCase
 from .models import Issue, IssueComment
 
@@ -227,3 +233,46 @@ class TestGuardedRelatedModel(BaseTestCase):
         for i in self.issues_comments:
             self.assertTrue(i.has_perm(self.user, ["tests.can_read"]))
             self.assertTrue(i.has_perm(self.user, "tests.can_read"))
+
+
+class TestBatchedPermissionChecker(BaseTestCase):
+    def test_get_perms(self):
+        checker = get_perms_checker(self.user)
+        checker.add(self.issues)
+
+        # Load the user's global permissions before counting the queries
+        self.user.has_perm("tests.can_read")
+        ContentType.objects.get_for_model(Issue)
+        with self.assertNumQueries(2):
+            self.assertTrue(self.allowed_issues[0].has_perm(self.user, "can_read", checker=checker))
+        with self.assertNumQueries(0):
+            for i in self.issues:
+                self.assertEqual(
+                    i.has_perm(self.user, "can_read", checker=checker),
+                    i in self.allowed_issues,
+                )
+
+    def test_get_perms_related(self):
+        checker = get_perms_checker(self.user)
+        comments = list(IssueComment.objects.all())
+        checker.add(comments)
+
+        self.user.has_perm("tests.can_read")
+        ContentType.objects.get_for_model(IssueComment)
+        with self.assertNumQueries(5):
+            comments[0].has_perm(self.user, "can_read", checker=checker)
+        with self.assertNumQueries(0):
+            for c in comments:
+                self.assertEqual(
+                    c.has_perm(self.user, "can_read", checker=checker),
+                    c in self.allowed_issues_comments,
+                )
+
+    def test_shared_in_user(self):
+        checker = get_perms_checker(self.user)
+        self.assertIsInstance(checker, BatchedPermissionChecker)
+        self.assertIs(get_perms_checker(self.user), checker)
+        self.assertIsNot(get_perms_checker(User.objects.get(pk=self.user.pk)), checker)
+
+        clear_perms_checker(self.user)
+        self.assertIsNot(get_perms_checker(self.user), checker)
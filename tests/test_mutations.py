@@ -1,24 +1,43 @@
 import base64
 import json
+from unittest import mock
 
-from django.test.utils import override_settings
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
 import graphene
 from graphene import relay
-from graphene_django.registry import get_global_registry
+from graphene_django.registry import Registry, get_global_registry
 from graphql_relay import to_global_id
 
-from graphene_django_plus.mutations import ModelCreateMutation
+from graphene_django_plus.models import get_perms_checker
+from graphene_django_plus.mutations import (
+    _ORIGINAL_ATTR,
+    ModelBulkCreateMutation,
+    ModelBulkDeleteMutation,
+    ModelBulkUpdateMutation,
+    ModelCreateMutation,
+    ModelUpdateMutation,
+    _get_field_values,
+)
+from graphene_django_plus.perms import get_perms_snapshot
+from graphene_django_plus.types import ModelType, schema_registry
+from graphene_django_plus.utils import set_async_context
 
 from .base import BaseTestCase
-from .models import Issue, Milestone, MilestoneComment, Project
+from .models import Issue, Label, LabelGroup, Milestone, MilestoneComment, Project
 from .schema import (
     IssueType,
     MilestoneCommentType,
+    MilestoneCreateMutation,
     MilestoneType,
     ProjectNameOnlyUpdateMutation,
     ProjectType,
     ProjectUpdateMutation,
     project_name_only_registry,
+    schema,
 )
 
 
@@ -179,6 +198,191 @@ class TestTypes(BaseTestCase):
             },
         )
 
+    def test_mutation_update_fields(self):
+        """Test that updates only write the fields that changed."""
+        p_id = to_global_id("ProjectType", self.project.id)
+        query = """
+            mutation projectUpdate {
+              projectUpdate (input: {id: "%s" name: "%s"}) {
+                project {
+                  name
+                }
+              }
+            }
+        """
+
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.query(query % (p_id, "XXX"), operation_name="projectUpdate")
+        self.assertEqual(
+            json.loads(r.content),
+            {"data": {"projectUpdate": {"project": {"name": "XXX"}}}},
+        )
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('SET "name" = ', updates[0])
+        self.assertNotIn('"due_date"', updates[0])
+
+        # Nothing changed, nothing to update
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.query(query % (p_id, "XXX"), operation_name="projectUpdate")
+        self.assertEqual(
+            json.loads(r.content),
+            {"data": {"projectUpdate": {"project": {"name": "XXX"}}}},
+        )
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")])
+
+    def test_mutation_update_fields_mutable(self):
+        """Test that in-place changes to mutable values are detected."""
+        label = Label.objects.create(name="Label", data={"tags": ["a"]})
+        setattr(label, _ORIGINAL_ATTR, _get_field_values(label))
+        self.assertEqual(ModelUpdateMutation.get_update_fields(label), [])
+
+        label.data["tags"].append("b")
+        self.assertEqual(ModelUpdateMutation.get_update_fields(label), ["data"])
+
+    def test_mutation_update_validate_changed_only(self):
+        """Test that updates only validate the fields in the input."""
+        m_id = to_global_id("MilestoneType", self.milestone_1.id)
+        query = """
+            mutation milestoneUpdate {
+              milestoneUpdate (input: {id: "%s" name: "%s"}) {
+                milestone {
+                  name
+                }
+                errors {
+                  field
+                }
+              }
+            }
+        """
+
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.query(query % (m_id, "XXX"), operation_name="milestoneUpdate")
+        self.assertEqual(
+            json.loads(r.content),
+            {"data": {"milestoneUpdate": {"milestone": {"name": "XXX"}, "errors": []}}},
+        )
+        # Neither the project's existence nor the pk's uniqueness was checked
+        self.assertFalse([q for q in ctx.captured_queries if "tests_project" in q["sql"]])
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith("SELECT 1")])
+
+        r = self.query(query % (m_id, ""), operation_name="milestoneUpdate")
+        self.assertEqual(
+            json.loads(r.content),
+            {"data": {"milestoneUpdate": {"milestone": None, "errors": [{"field": "name"}]}}},
+        )
+
+        class MilestoneFullCleanUpdateMutation(ModelUpdateMutation):
+            class Meta:
+                model = Milestone
+                validate_changed_only = False
+
+        class Query(graphene.ObjectType):
+            milestone = relay.Node.Field(MilestoneType)
+
+        class Mutation(graphene.ObjectType):
+            milestone_update = MilestoneFullCleanUpdateMutation.Field()
+
+        self.addCleanup(schema_registry.pop, "MilestoneFullCleanUpdateMutationInput", None)
+        schema = graphene.Schema(query=Query, mutation=Mutation)
+        context = RequestFactory().post("/graphql")
+        context.user = self.user
+        with CaptureQueriesContext(connection) as ctx:
+            result = schema.execute(
+                query % (m_id, "YYY"),
+                context_value=context,
+                operation_name="milestoneUpdate",
+            )
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data["milestoneUpdate"]["errors"], [])
+        self.assertTrue([q for q in ctx.captured_queries if "tests_project" in q["sql"]])
+
+    def test_mutation_refetch_payload(self):
+        """Test that the payload can be re-fetched optimized by the planner."""
+
+        class MilestoneRefetchUpdateMutation(ModelUpdateMutation):
+            class Meta:
+                model = Milestone
+                refetch_payload = True
+
+        class Query(graphene.ObjectType):
+            milestone = relay.Node.Field(MilestoneType)
+
+        class Mutation(graphene.ObjectType):
+            milestone_update = MilestoneRefetchUpdateMutation.Field()
+
+        self.addCleanup(schema_registry.pop, "MilestoneRefetchUpdateMutationInput", None)
+        schema = graphene.Schema(query=Query, mutation=Mutation)
+        context = RequestFactory().post("/graphql")
+        context.user = self.user
+        with CaptureQueriesContext(connection) as ctx:
+            result = schema.execute(
+                """
+                mutation milestoneUpdate {
+                  milestoneUpdate (input: {id: "%s" name: "XXX"}) {
+                    milestone {
+                      name
+                      project {
+                        name
+                      }
+                    }
+                  }
+                }
+                """
+                % (to_global_id("MilestoneType", self.milestone_1.id),),
+                context_value=context,
+            )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["milestoneUpdate"]["milestone"],
+            {"name": "XXX", "project": {"name": "Test Project"}},
+        )
+        # The project was joined when re-fetching the milestone
+        project_queries = [q["sql"] for q in ctx.captured_queries if "tests_project" in q["sql"]]
+        self.assertEqual(len(project_queries), 1)
+        self.assertIn("JOIN", project_queries[0])
+
+    def test_mutation_async(self):
+        """Test that mutations can be executed by the async executor."""
+        context = RequestFactory().post("/graphql")
+        context.user = self.user
+        set_async_context(context)
+        query = """
+            mutation projectUpdate {
+              projectUpdate (input: {id: "%s" name: "%s"}) {
+                project {
+                  name
+                }
+                errors {
+                  field
+                }
+              }
+            }
+        """
+        p_id = to_global_id("ProjectType", self.project.id)
+
+        result = async_to_sync(schema.execute_async)(
+            query % (p_id, "XXX"),
+            context_value=context,
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["projectUpdate"],
+            {"project": {"name": "XXX"}, "errors": []},
+        )
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.name, "XXX")
+
+        result = async_to_sync(schema.execute_async)(
+            query % (p_id, ""),
+            context_value=context,
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["projectUpdate"],
+            {"project": None, "errors": [{"field": "name"}]},
+        )
+
     def test_mutation_delete(self):
         # project
         p_id = base64.b64encode(
@@ -543,6 +747,80 @@ class TestMutationRelatedObjects(BaseTestCase):
             },
         )
 
+    def test_get_nodes_for_fields(self):
+        """Test that the ids of all fields are fetched with one query per model."""
+        info = object()
+        project_id = to_global_id("ProjectType", self.project.id)
+        issue_ids = [to_global_id("IssueType", i.id) for i in self.issues]
+
+        with self.assertNumQueries(2):
+            nodes = MilestoneCreateMutation.get_nodes_for_fields(
+                info,
+                {
+                    "project": project_id,
+                    "issues": issue_ids[:2] + issue_ids[:1],
+                    "other_issues": issue_ids[2:],
+                    "empty": [],
+                },
+            )
+        self.assertEqual(
+            nodes,
+            {
+                "project": self.project,
+                "issues": self.issues[:2],
+                "other_issues": self.issues[2:],
+                "empty": [],
+            },
+        )
+
+        # Errors are reported for the field, just like get_nodes
+        with self.assertRaises(ValidationError) as ctx:
+            MilestoneCreateMutation.get_nodes_for_fields(
+                info,
+                {
+                    "project": project_id,
+                    "issues": issue_ids + [to_global_id("IssueType", 9999)],
+                },
+            )
+        self.assertEqual(list(ctx.exception.message_dict), ["issues"])
+        self.assertIn("9999", ctx.exception.message_dict["issues"][0])
+
+    def test_input_plan(self):
+        """Test that the input fields are classified when the mutation is created."""
+        self.assertEqual(
+            list(MilestoneCreateMutation._meta.input_plan),
+            [
+                ("name", "value"),
+                ("due_date", "value"),
+                ("project", "id"),
+                ("issues", "ids"),
+                ("milestonecomment_set", "ids"),
+            ],
+        )
+
+        class MilestoneWithInputMutation(ModelCreateMutation):
+            class Meta:
+                model = Milestone
+                only_fields = ["name"]
+
+            class Input:
+                extra_issues = graphene.List(graphene.ID)
+
+        self.addCleanup(schema_registry.pop, "MilestoneWithInputMutationInput", None)
+        self.assertEqual(
+            list(MilestoneWithInputMutation._meta.input_plan),
+            [("extra_issues", "ids"), ("name", "value")],
+        )
+        self.assertIn("extra_issues", MilestoneWithInputMutation.Input._meta.fields)
+
+    def test_save_plan(self):
+        """Test that only the relations present in the input are saved."""
+        self.assertEqual(
+            [(name, kind) for name, kind, _ in MilestoneCreateMutation._meta.save_plan],
+            [("issues", "related"), ("milestonecomment_set", "related")],
+        )
+        self.assertEqual(ProjectNameOnlyUpdateMutation._meta.save_plan, ())
+
 
 class TestMutationRelatedObjectsWithOverrideSettings(BaseTestCase):
     """Tests for creating and updating reverse side of FK and M2M relationships."""
@@ -674,3 +952,547 @@ class TestMutationRelatedObjectsWithOverrideSettings(BaseTestCase):
                 }
             },
         )
+
+
+class TestBulkMutations(BaseTestCase):
+    def get_schema(self, **meta):
+        label_registry = Registry()
+
+        class LabelGroupType(ModelType):
+            class Meta:
+                model = LabelGroup
+                interfaces = [relay.Node]
+                fields = "__all__"
+                registry = label_registry
+
+        class LabelType(ModelType):
+            class Meta:
+                model = Label
+                interfaces = [relay.Node]
+                fields = "__all__"
+                registry = label_registry
+
+        class LabelBulkCreateMutation(ModelBulkCreateMutation):
+            Meta = type(
+                "Meta",
+                (),
+                {"model": Label, "registry": label_registry, "public": True, **meta},
+            )
+
+        class LabelBulkUpdateMutation(ModelBulkUpdateMutation):
+            Meta = type(
+                "Meta",
+                (),
+                {"model": Label, "registry": label_registry, "public": True, **meta},
+            )
+
+        class LabelBulkDeleteMutation(ModelBulkDeleteMutation):
+            class Meta:
+                model = Label
+                registry = label_registry
+                public = True
+
+        class CommentType(ModelType):
+            class Meta:
+                model = MilestoneComment
+                interfaces = [relay.Node]
+                fields = ["id", "text"]
+                registry = label_registry
+
+        class CommentBulkDeleteMutation(ModelBulkDeleteMutation):
+            class Meta:
+                model = MilestoneComment
+                registry = label_registry
+                public = True
+
+        for name in [
+            "LabelGroupType",
+            "LabelType",
+            "LabelBulkCreateMutationInput",
+            "LabelBulkUpdateMutationInput",
+            "LabelBulkDeleteMutationInput",
+            "CommentType",
+            "CommentBulkDeleteMutationInput",
+        ]:
+            self.addCleanup(schema_registry.pop, name, None)
+
+        class Query(graphene.ObjectType):
+            label = relay.Node.Field(LabelType)
+
+        class Mutation(graphene.ObjectType):
+            label_bulk_create = LabelBulkCreateMutation.Field()
+            label_bulk_update = LabelBulkUpdateMutation.Field()
+            label_bulk_delete = LabelBulkDeleteMutation.Field()
+            comment_bulk_delete = CommentBulkDeleteMutation.Field()
+
+        self.label_groups = [LabelGroup.objects.create(name=f"Group {i}") for i in range(3)]
+        return graphene.Schema(query=Query, mutation=Mutation)
+
+    def execute(self, schema, query, **kwargs):
+        context = RequestFactory().post("/graphql")
+        context.user = self.user
+        return schema.execute(query, context_value=context, **kwargs)
+
+    def test_bulk_create(self):
+        schema = self.get_schema()
+        group_ids = [to_global_id("LabelGroupType", g.pk) for g in self.label_groups]
+        query = """
+            mutation labelBulkCreate($objects: [LabelBulkCreateMutationObjectInput!]!) {
+              labelBulkCreate (input: {objects: $objects}) {
+                labels {
+                  name
+                  groups {
+                    edges {
+                      node {
+                        name
+                      }
+                    }
+                  }
+                }
+                errors {
+                  field
+                  message
+                  index
+                }
+              }
+            }
+        """
+        objects = [
+            {"name": f"Label {i}", "groups": group_ids[: i + 1] + group_ids[:1]} for i in range(3)
+        ]
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.execute(schema, query, variable_values={"objects": objects})
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data["labelBulkCreate"]["errors"], [])
+        self.assertEqual(
+            [
+                [e["node"]["name"] for e in label["groups"]["edges"]]
+                for label in result.data["labelBulkCreate"]["labels"]
+            ],
+            [["Group 0"], ["Group 0", "Group 1"], ["Group 0", "Group 1", "Group 2"]],
+        )
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(
+            sorted(
+                Label.objects.filter(name__startswith="Label").values_list("name", "groups__name")
+            ),
+            [
+                ("Label 0", "Group 0"),
+                ("Label 1", "Group 0"),
+                ("Label 1", "Group 1"),
+                ("Label 2", "Group 0"),
+                ("Label 2", "Group 1"),
+                ("Label 2", "Group 2"),
+            ],
+        )
+
+    def test_bulk_create_errors(self):
+        schema = self.get_schema()
+        result = self.execute(
+            schema,
+            """
+            mutation labelBulkCreate {
+              labelBulkCreate (input: {objects: [{name: "Foo"}, {name: ""}, {name: "Bar"}]}) {
+                labels {
+                  name
+                }
+                errors {
+                  field
+                  index
+                }
+              }
+            }
+            """,
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["labelBulkCreate"],
+            {"labels": None, "errors": [{"field": "name", "index": 1}]},
+        )
+        self.assertFalse(Label.objects.exists())
+
+    def test_bulk_create_unique(self):
+        schema = self.get_schema()
+        Label.objects.create(name="Existing", code="E")
+        query = """
+            mutation labelBulkCreate($objects: [LabelBulkCreateMutationObjectInput!]!) {
+              labelBulkCreate (input: {objects: $objects}) {
+                labels {
+                  code
+                }
+                errors {
+                  field
+                  message
+                  index
+                }
+              }
+            }
+        """
+        objects = [
+            {"name": "Label A", "code": "A"},
+            {"name": "B", "code": "E"},
+            {"name": "C", "code": "A"},
+            {"name": "D"},
+            {"name": "E"},
+        ]
+        result = self.execute(schema, query, variable_values={"objects": objects})
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["labelBulkCreate"],
+            {
+                "labels": None,
+                "errors": [
+                    {
+                        "field": "code",
+                        "message": "Label with this Code already exists.",
+                        "index": 1,
+                    },
+                    {
+                        "field": "code",
+                        "message": "Label with this Code already exists.",
+                        "index": 2,
+                    },
+                ],
+            },
+        )
+        self.assertEqual(Label.objects.count(), 1)
+
+    def test_bulk_create_resolved_relations(self):
+        schema = self.get_schema()
+        group_id = to_global_id("LabelGroupType", self.label_groups[0].pk)
+        objects = [{"name": f"Label {i}", "mainGroup": group_id} for i in range(3)]
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.execute(
+                schema,
+                """
+                mutation labelBulkCreate($objects: [LabelBulkCreateMutationObjectInput!]!) {
+                  labelBulkCreate (input: {objects: $objects}) {
+                    errors {
+                      field
+                    }
+                  }
+                }
+                """,
+                variable_values={"objects": objects},
+            )
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data["labelBulkCreate"]["errors"], [])
+        # The group is fetched once and not validated again for each label
+        selects = [q["sql"] for q in ctx.captured_queries if "tests_labelgroup" in q["sql"]]
+        self.assertEqual(len(selects), 1)
+        self.assertEqual(
+            list(Label.objects.values_list("main_group", flat=True)),
+            [self.label_groups[0].pk] * 3,
+        )
+
+    def test_bulk_create_resolved_relations_validators(self):
+        schema = self.get_schema()
+        rejected = self.label_groups[1]
+
+        def validate_group(value):
+            if value == rejected.pk:
+                raise ValidationError("Invalid group.")
+
+        objects = [
+            {
+                "name": "Label 0",
+                "mainGroup": to_global_id("LabelGroupType", self.label_groups[0].pk),
+            },
+            {"name": "Label 1", "mainGroup": to_global_id("LabelGroupType", rejected.pk)},
+        ]
+        field = Label._meta.get_field("main_group")
+        with mock.patch.dict(field.__dict__, {"validators": [validate_group]}):
+            result = self.execute(
+                schema,
+                """
+                mutation labelBulkCreate($objects: [LabelBulkCreateMutationObjectInput!]!) {
+                  labelBulkCreate (input: {objects: $objects}) {
+                    errors {
+                      field
+                      message
+                      index
+                    }
+                  }
+                }
+                """,
+                variable_values={"objects": objects},
+            )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["labelBulkCreate"]["errors"],
+            [{"field": "mainGroup", "message": "Invalid group.", "index": 1}],
+        )
+        self.assertEqual(Label.objects.count(), 0)
+
+    def test_bulk_create_batch_size(self):
+        schema = self.get_schema(batch_size=2)
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.execute(
+                schema,
+                """
+                mutation labelBulkCreate {
+                  labelBulkCreate (input: {objects: [{name: "A"}, {name: "B"}, {name: "C"}]}) {
+                    labels {
+                      name
+                    }
+                  }
+                }
+                """,
+            )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["labelBulkCreate"]["labels"],
+            [{"name": "A"}, {"name": "B"}, {"name": "C"}],
+        )
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(writes), 2)
+
+    def test_bulk_update(self):
+        schema = self.get_schema()
+        labels = [Label.objects.create(name=f"Label {i}") for i in range(3)]
+        labels[0].groups.set(self.label_groups[:2])
+        query = """
+            mutation labelBulkUpdate($objects: [LabelBulkUpdateMutationObjectInput!]!) {
+              labelBulkUpdate (input: {objects: $objects}) {
+                labels {
+                  name
+                }
+                errors {
+                  field
+                  index
+                }
+              }
+            }
+        """
+        objects = [
+            {
+                "id": to_global_id("LabelType", labels[0].pk),
+                "name": "Label 0",
+                "groups": [to_global_id("LabelGroupType", self.label_groups[2].pk)],
+            },
+            {"id": to_global_id("LabelType", labels[2].pk), "name": "Renamed"},
+        ]
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.execute(schema, query, variable_values={"objects": objects})
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["labelBulkUpdate"],
+            {"labels": [{"name": "Label 0"}, {"name": "Renamed"}], "errors": []},
+        )
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('SET "name"', updates[0])
+        self.assertEqual(
+            list(Label.objects.order_by("pk").values_list("name", flat=True)),
+            ["Label 0", "Label 1", "Renamed"],
+        )
+        self.assertEqual(list(labels[0].groups.all()), [self.label_groups[2]])
+
+        # Nothing changed, nothing to update
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.execute(schema, query, variable_values={"objects": objects[1:]})
+        self.assertIsNone(result.errors)
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")])
+
+        # Duplicated objects
+        result = self.execute(schema, query, variable_values={"objects": objects[1:] * 2})
+        self.assertEqual(
+            result.data["labelBulkUpdate"],
+            {"labels": None, "errors": [{"field": "id", "index": 1}]},
+        )
+
+        # Different ids for the same object are duplicated too
+        aliased = [
+            {"id": to_global_id("LabelType", labels[0].pk), "name": "A"},
+            {"id": to_global_id("LabelType", f"0{labels[0].pk}"), "name": "B"},
+            {"id": to_global_id("LabelType", labels[1].pk), "name": "C"},
+        ]
+        result = self.execute(schema, query, variable_values={"objects": aliased})
+        self.assertEqual(
+            result.data["labelBulkUpdate"],
+            {"labels": None, "errors": [{"field": "id", "index": 1}]},
+        )
+        self.assertEqual(
+            list(Label.objects.order_by("pk").values_list("name", flat=True)),
+            ["Label 0", "Label 1", "Renamed"],
+        )
+
+        # Each object that doesn't exist gets its own error
+        missing = [
+            {"id": to_global_id("LabelType", labels[0].pk), "name": "A"},
+            {"id": to_global_id("LabelType", 0), "name": "B"},
+            {"id": to_global_id("LabelGroupType", labels[1].pk), "name": "C"},
+        ]
+        result = self.execute(schema, query, variable_values={"objects": missing})
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["labelBulkUpdate"],
+            {
+                "labels": None,
+                "errors": [{"field": "id", "index": 1}, {"field": "id", "index": 2}],
+            },
+        )
+        self.assertEqual(
+            list(Label.objects.order_by("pk").values_list("name", flat=True)),
+            ["Label 0", "Label 1", "Renamed"],
+        )
+
+        # The objects are matched by pk, regardless of their order
+        result = self.execute(schema, query, variable_values={"objects": aliased[2:0:-1]})
+        self.assertEqual(
+            result.data["labelBulkUpdate"],
+            {"labels": [{"name": "C"}, {"name": "B"}], "errors": []},
+        )
+        self.assertEqual(
+            list(Label.objects.order_by("pk").values_list("name", flat=True)),
+            ["B", "C", "Renamed"],
+        )
+
+    def test_bulk_update_unique(self):
+        schema = self.get_schema()
+        labels = [Label.objects.create(name=f"Label {i}", code=str(i)) for i in range(3)]
+        objects = [
+            {"id": to_global_id("LabelType", labels[0].pk), "code": "Z"},
+            {"id": to_global_id("LabelType", labels[1].pk), "name": "Renamed"},
+            {"id": to_global_id("LabelType", labels[2].pk), "code": "Z"},
+        ]
+        result = self.execute(
+            schema,
+            """
+            mutation labelBulkUpdate($objects: [LabelBulkUpdateMutationObjectInput!]!) {
+              labelBulkUpdate (input: {objects: $objects}) {
+                errors {
+                  field
+                  index
+                }
+              }
+            }
+            """,
+            variable_values={"objects": objects},
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["labelBulkUpdate"]["errors"],
+            [{"field": "code", "index": 2}],
+        )
+        self.assertEqual(
+            list(Label.objects.order_by("pk").values_list("name", "code")),
+            [("Label 0", "0"), ("Label 1", "1"), ("Label 2", "2")],
+        )
+
+    def test_bulk_update_constraints(self):
+        schema = self.get_schema()
+        labels = [Label.objects.create(name=f"Label {i}") for i in range(2)]
+        objects = [
+            {"id": to_global_id("LabelType", labels[0].pk), "code": "Label 0"},
+            {"id": to_global_id("LabelType", labels[1].pk), "code": "Label 0"},
+        ]
+        result = self.execute(
+            schema,
+            """
+            mutation labelBulkUpdate($objects: [LabelBulkUpdateMutationObjectInput!]!) {
+              labelBulkUpdate (input: {objects: $objects}) {
+                errors {
+                  field
+                  index
+                }
+              }
+            }
+            """,
+            variable_values={"objects": objects},
+        )
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data["labelBulkUpdate"]["errors"],
+            [{"field": None, "index": 0}],
+        )
+        self.assertEqual(
+            list(Label.objects.order_by("pk").values_list("name", "code")),
+            [("Label 0", None), ("Label 1", None)],
+        )
+
+    def test_clear_perms(self):
+        schema = self.get_schema()
+        label = Label.objects.create(name="Label")
+        snapshot = get_perms_snapshot(self.user)
+        checker = get_perms_checker(self.user)
+        result = self.execute(
+            schema,
+            """
+            mutation labelBulkDelete($ids: [ID!]!) {
+              labelBulkDelete (input: {ids: $ids}) {
+                deletedIds
+              }
+            }
+            """,
+            variable_values={"ids": [to_global_id("LabelType", label.pk)]},
+        )
+        self.assertIsNone(result.errors)
+        # The permissions may have changed during the mutation
+        self.assertIsNot(get_perms_snapshot(self.user), snapshot)
+        self.assertIsNot(get_perms_checker(self.user), checker)
+
+    def test_bulk_delete(self):
+        schema = self.get_schema()
+        labels = [Label.objects.create(name=f"Label {i}") for i in range(3)]
+        labels[0].groups.set(self.label_groups)
+        ids = [to_global_id("LabelType", label.pk) for label in labels[:2]]
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.execute(
+                schema,
+                """
+                mutation labelBulkDelete($ids: [ID!]!) {
+                  labelBulkDelete (input: {ids: $ids}) {
+                    deletedIds
+                    errors {
+                      field
+                      message
+                    }
+                  }
+                }
+                """,
+                variable_values={"ids": ids},
+            )
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data["labelBulkDelete"], {"deletedIds": ids, "errors": []})
+        self.assertEqual(list(Label.objects.all()), labels[2:])
+        self.assertFalse(Label.groups.through.objects.exists())
+        deletes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 2)
+
+    def test_bulk_delete_fast(self):
+        schema = self.get_schema()
+        comments = [
+            MilestoneComment.objects.create(text=f"Comment {i}", milestone=self.milestone_1)
+            for i in range(3)
+        ]
+        ids = [to_global_id("CommentType", comment.pk) for comment in comments]
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.execute(
+                schema,
+                """
+                mutation commentBulkDelete($ids: [ID!]!) {
+                  commentBulkDelete (input: {ids: $ids}) {
+                    deletedIds
+                  }
+                }
+                """,
+                variable_values={"ids": ids},
+            )
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data["commentBulkDelete"], {"deletedIds": ids})
+        self.assertFalse(MilestoneComment.objects.exists())
+        # A single query to fetch the objects and another to delete them
+        self.assertEqual(
+            [
+                q["sql"].split(" ", 1)[0]
+                for q in ctx.captured_queries
+                if "SAVEPOINT" not in q["sql"]
+            ],
+            ["SELECT", "DELETE"],
+        )
@@ -0,0 +1,105 @@
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.test import RequestFactory
+from graphql_relay import to_global_id
+from guardian.shortcuts import assign_perm, remove_perm
+
+from graphene_django_plus.perms import (
+    check_perms,
+    clear_perms_snapshot,
+    get_perms_snapshot,
+    set_perms_snapshot,
+)
+from graphene_django_plus.views import AsyncGraphQLView, GraphQLView
+
+from .base import BaseTestCase
+from .models import Issue
+from .schema import IssueType, schema
+
+
+class TestPerms(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        ct = ContentType.objects.get_for_model(Issue)
+        permission = Permission.objects.get(content_type=ct, codename="can_read")
+        self.user.user_permissions.add(permission)
+        self.user = User.objects.get(pk=self.user.pk)
+
+    def test_snapshot(self):
+        with mock.patch.object(
+            self.user,
+            "get_all_permissions",
+            wraps=self.user.get_all_permissions,
+        ) as get_all_permissions:
+            snapshot = get_perms_snapshot(self.user)
+            self.assertIsInstance(snapshot, frozenset)
+            self.assertIn("tests.can_read", snapshot)
+            self.assertTrue(check_perms(self.user, ["tests.can_read"]))
+            self.assertFalse(check_perms(self.user, ["tests.can_write"]))
+            self.assertTrue(IssueType.check_permissions(self.user))
+            self.assertIs(get_perms_snapshot(self.user), snapshot)
+            self.assertEqual(get_all_permissions.call_count, 1)
+
+    def test_snapshot_primed(self):
+        set_perms_snapshot(self.user, ["tests.can_write"])
+        with mock.patch.object(self.user, "get_all_permissions") as get_all_permissions:
+            self.assertFalse(check_perms(self.user, ["tests.can_read"]))
+            self.assertTrue(check_perms(self.user, ["tests.can_write"]))
+            get_all_permissions.assert_not_called()
+
+    def test_snapshot_clear(self):
+        self.assertFalse(check_perms(self.user, ["tests.can_write"]))
+        ct = ContentType.objects.get_for_model(Issue)
+        permission = Permission.objects.get(content_type=ct, codename="can_write")
+        self.user.user_permissions.add(permission)
+        self.assertFalse(check_perms(self.user, ["tests.can_write"]))
+
+        clear_perms_snapshot(self.user)
+        self.assertTrue(check_perms(self.user, ["tests.can_write"]))
+
+    def test_check_permissions_override(self):
+        def check_permissions(cls, user):
+            return False
+
+        with mock.patch.object(IssueType, "check_permissions", classmethod(check_permissions)):
+            r = self.query(
+                """
+                query issues {
+                  issues {
+                    edges {
+                      node {
+                        name
+                      }
+                    }
+                  }
+                }
+                """,
+                operation_name="issues",
+            )
+        self.assertEqual(json.loads(r.content), {"data": {"issues": {"edges": []}}})
+
+    def execute(self, view, query):
+        request = RequestFactory().post(
+            "/graphql",
+            json.dumps({"query": query}),
+            content_type="application/json",
+        )
+        # The same user object is used by every request
+        request.user = self.user
+        if view.view_class.view_is_async:
+            return json.loads(async_to_sync(view)(request).content)
+        return json.loads(view(request).content)
+
+    def test_cleared_after_request(self):
+        issue = self.unallowed_issues[0]
+        query = 'query { issue (id: "%s") { name } }' % to_global_id("IssueType", issue.pk)
+
+        for view in [GraphQLView.as_view(schema=schema), AsyncGraphQLView.as_view(schema=schema)]:
+            remove_perm("can_read", self.user, issue)
+            self.assertEqual(self.execute(view, query), {"data": {"issue": None}})
+            assign_perm("can_read", self.user, issue)
+            self.assertEqual(self.execute(view, query), {"data": {"issue": {"name": issue.name}}})
@@ -0,0 +1,161 @@
+from unittest import mock
+import warnings
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from graphene_django_plus import planner
+from graphene_django_plus.types import ModelType
+
+from .base import BaseTestCase
+from .models import Milestone
+from .schema import MilestoneType, schema
+
+
+class TestPlanner(BaseTestCase):
+    query_issues = """
+        query issues {
+          issues {
+            edges {
+              node {
+                name
+                milestone {
+                  name
+                  project {
+                    name
+                  }
+                }
+              }
+            }
+          }
+        }
+    """
+
+    def setUp(self):
+        super().setUp()
+        planner._plan_cache.clear()
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def execute(self, query, num_queries):
+        with self.assertNumQueries(num_queries):
+            r = schema.execute(query, context_value=self.request)
+        self.assertIsNone(r.errors)
+        return r.data
+
+    def test_select_related(self):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.execute(self.query_issues, 3)
+
+        self.assertEqual(
+            [e["node"] for e in data["issues"]["edges"]],
+            [
+                {
+                    "name": i.name,
+                    "milestone": {"name": "Milestone 1", "project": {"name": "Test Project"}},
+                }
+                for i in self.allowed_issues
+            ],
+        )
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertIn('"tests_project"."name"', sql)
+        self.assertNotIn('"tests_issue"."priority"', sql)
+        self.assertNotIn('"tests_milestone"."due_date"', sql)
+
+    def test_prefetch_related(self):
+        # Types that can't be joined get prefetched through their get_queryset
+        with mock.patch.object(planner, "can_select_related", return_value=False):
+            data = self.execute(self.query_issues, 5)
+
+        self.assertEqual(
+            [e["node"]["milestone"]["project"] for e in data["issues"]["edges"]],
+            [{"name": "Test Project"} for _ in self.allowed_issues],
+        )
+
+    def test_no_planner(self):
+        with self.settings(GRAPHENE_DJANGO_PLUS={"QUERY_PLANNER": False}):
+            # Nodes are still memoized, so each milestone/project is fetched once
+            milestones = {i.milestone_id for i in self.allowed_issues}
+            self.execute(self.query_issues, 3 + 2 * len(milestones))
+
+    def test_plan_cache(self):
+        infos = []
+        with mock.patch.object(
+            MilestoneType,
+            "get_queryset",
+            side_effect=lambda qs, info: infos.append(info) or qs,
+        ):
+            schema.execute(
+                "query { milestones { edges { node { name } } } }", context_value=self.request
+            )
+            schema.execute(
+                "query { milestones { edges { node { name } } } }", context_value=self.request
+            )
+
+        plans = [planner.get_query_plan(MilestoneType, info) for info in infos]
+        self.assertEqual(len(plans), 2)
+        self.assertIs(plans[0], plans[1])
+        self.assertEqual(plans[0].only, {"name"})
+
+    def test_directives(self):
+        query = """
+            query milestones ($withDate: Boolean!) {
+              milestones {
+                edges {
+                  node {
+                    name
+                    dueDate @include(if: $withDate)
+                  }
+                }
+              }
+            }
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            schema.execute(query, context_value=self.request, variable_values={"withDate": False})
+            schema.execute(query, context_value=self.request, variable_values={"withDate": True})
+
+        milestone_queries = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith('SELECT "tests_milestone"')
+        ]
+        self.assertEqual(len(milestone_queries), 2)
+        self.assertNotIn("due_date", milestone_queries[0])
+        self.assertIn("due_date", milestone_queries[1])
+
+    def test_field_dependencies(self):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.execute("query { milestones { edges { node { displayName } } } }", 1)
+
+        self.assertEqual(
+            [e["node"]["displayName"] for e in data["milestones"]["edges"]],
+            [
+                f"{m.name} ({m.due_date})" if m.due_date else m.name
+                for m in Milestone.objects.order_by("pk")
+            ],
+        )
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertIn('"tests_milestone"."due_date"', sql)
+        self.assertNotIn('"tests_milestone"."project_id"', sql)
+
+    def test_field_dependencies_invalid(self):
+        with self.assertRaises(ImproperlyConfigured):
+
+            class InvalidMilestoneType(ModelType):
+                class Meta:
+                    model = Milestone
+                    field_dependencies = {"display_name": ["foobar"]}
+
+    @override_settings(DEBUG=True)
+    @mock.patch.dict(MilestoneType._meta.field_dependencies, {"display_name": ["name"]})
+    def test_deferred_field_warning(self):
+        query = "query { milestones { edges { node { displayName } } } }"
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.execute(query, 1 + Milestone.objects.count())
+
+        self.assertTrue(w)
+        self.assertTrue(all(issubclass(i.category, planner.DeferredFieldWarning) for i in w))
+        self.assertIn("'due_date' of Milestone", str(w[0].message))
@@ -2,6 +2,7 @@ import base64
 import json
 from unittest import mock
 
+from django.test import override_settings
 from graphene_django import DjangoObjectType
 from graphql_relay import to_global_id
 
@@ -129,8 +130,8 @@ class TestTypes(BaseTestCase):
             },
         )
 
-    @mock.patch("graphene_django_plus.types.gql_optimizer", None)
-    def test_results_no_gql_optimizer(self):
+    @override_settings(GRAPHENE_DJANGO_PLUS={"QUERY_PLANNER": False})
+    def test_results_no_query_planner(self):
         # projects
         r = self.query(
             """
@@ -356,8 +357,8 @@ class TestTypes(BaseTestCase):
             {"data": {"issue": None}},
         )
 
-    @mock.patch("graphene_django_plus.types.gql_optimizer", None)
-    def test_result_no_gql_optimizer(self):
+    @override_settings(GRAPHENE_DJANGO_PLUS={"QUERY_PLANNER": False})
+    def test_result_no_query_planner(self):
         # project
         p_id = base64.b64encode(
             "ProjectType:{}".format(
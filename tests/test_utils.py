@@ -1,12 +1,31 @@
+import asyncio
 import base64
+from types import SimpleNamespace
 
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
 from graphene_django.registry import Registry
 from graphql.error import GraphQLError
+from graphql_relay import to_global_id
 
-from graphene_django_plus.utils import get_nodes
+from graphene_django_plus.types import ModelType, schema_registry
+from graphene_django_plus.utils import (
+    _is_async,
+    _resolve_graphene_type,
+    aget_node,
+    aget_nodes,
+    get_nodes,
+    set_async_context,
+)
 
 from .base import BaseTestCase
-from .schema import IssueType, ProjectType
+from .models import Project
+from .schema import (
+    IssueType,
+    ProjectNameOnlyType,
+    ProjectType,
+    project_name_only_registry,
+)
 
 
 class TestTypes(BaseTestCase):
@@ -39,3 +58,87 @@ class TestTypes(BaseTestCase):
         issues_with_wrong_id.append(base64.b64encode(b"IssueType:9999").decode())
         with self.assertRaises(GraphQLError):
             get_nodes(info, issues_with_wrong_id)
+
+    def test_resolve_graphene_type(self):
+        self.assertIs(_resolve_graphene_type("IssueType"), IssueType)
+        self.assertIs(
+            _resolve_graphene_type("ProjectNameOnlyType", project_name_only_registry),
+            ProjectNameOnlyType,
+        )
+        with self.assertRaises(AssertionError):
+            _resolve_graphene_type("ProjectNameOnlyType")
+
+        # Types registered after the index was built are found
+        other_registry = Registry()
+        for name in ["OtherProjectType", "AnotherProjectType"]:
+            self.addCleanup(schema_registry.pop, name, None)
+        with self.assertRaises(AssertionError):
+            _resolve_graphene_type("OtherProjectType", other_registry)
+
+        class OtherProjectType(ModelType):
+            class Meta:
+                model = Project
+                fields = ["id", "name"]
+                registry = other_registry
+
+        self.assertIs(_resolve_graphene_type("OtherProjectType", other_registry), OtherProjectType)
+
+        # Replaced types are not returned anymore
+        class AnotherProjectType(ModelType):
+            class Meta:
+                model = Project
+                fields = ["id", "name"]
+                registry = other_registry
+
+        self.assertIs(
+            _resolve_graphene_type("AnotherProjectType", other_registry), AnotherProjectType
+        )
+        with self.assertRaises(AssertionError):
+            _resolve_graphene_type("OtherProjectType", other_registry)
+
+    def test_get_nodes_order(self):
+        info = object()
+        issues = list(reversed(self.issues))
+        ids = [to_global_id("IssueType", issue.pk) for issue in issues]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_nodes(info, ids), issues)
+
+        # Duplicated ids return their node once, in the first position
+        self.assertEqual(get_nodes(info, [ids[1], ids[0], ids[1]]), [issues[1], issues[0]])
+
+        with self.assertRaises(GraphQLError) as ctx:
+            get_nodes(info, ids + [to_global_id("IssueType", 9999)])
+        self.assertIn("9999", str(ctx.exception))
+
+        with self.assertNumQueries(0), self.assertRaises(GraphQLError) as ctx:
+            get_nodes(info, ids + [to_global_id("IssueType", "foobar")])
+        self.assertIn("foobar", str(ctx.exception))
+
+    def test_aget_nodes(self):
+        info = object()
+        issues = list(reversed(self.issues))
+        ids = [to_global_id("IssueType", issue.pk) for issue in issues]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(async_to_sync(aget_nodes)(info, ids), issues)
+        self.assertEqual(async_to_sync(aget_node)(info, ids[0]), issues[0])
+
+        with self.assertRaises(GraphQLError):
+            async_to_sync(aget_nodes)(info, ids + [to_global_id("IssueType", 9999)])
+
+    def test_is_async(self):
+        context = RequestFactory().post("/graphql")
+        info = SimpleNamespace(context=context)
+
+        async def is_async():
+            return _is_async(info)
+
+        # Sync executions inside a running loop (e.g. in a notebook) stay sync
+        self.assertFalse(asyncio.run(is_async()))
+        set_async_context(context)
+        self.assertTrue(asyncio.run(is_async()))
+        # Sync resolvers run by the async view in a worker thread
+        self.assertFalse(_is_async(info))
+        set_async_context(context, False)
+        self.assertFalse(asyncio.run(is_async()))
@@ -0,0 +1,528 @@
+import datetime
+import decimal
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+import graphene
+from graphql_relay import to_global_id
+
+from graphene_django_plus import views
+from graphene_django_plus.utils import CacheInfo
+from graphene_django_plus.views import (
+    AsyncGraphQLView,
+    GraphQLView,
+    _obj_set,
+    get_document_cache_info,
+    has_orjson,
+    json_dumps,
+    load_persisted_documents,
+)
+
+from .base import BaseTestCase
+from .models import Project
+from .schema import schema
+
+
+class TestAsyncGraphQLView(BaseTestCase):
+    GRAPHQL_URL = "/graphql-async"
+
+    async def execute(self, query, variables=None, **kwargs):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        r = await self.async_client.post(
+            self.GRAPHQL_URL,
+            json.dumps({"query": query, "variables": variables}),
+            content_type="application/json",
+            **kwargs,
+        )
+        return r.status_code, json.loads(r.content)
+
+    async def test_query(self):
+        status_code, d = await self.execute(
+            """
+            query {
+              projects {
+                edges {
+                  node {
+                    name
+                    milestones {
+                      edges {
+                        node {
+                          name
+                          issues {
+                            totalCount
+                          }
+                        }
+                      }
+                    }
+                  }
+                }
+              }
+            }
+            """
+        )
+        self.assertEqual(status_code, 200)
+        self.assertNotIn("errors", d)
+        self.assertEqual(
+            d["data"]["projects"]["edges"],
+            [
+                {
+                    "node": {
+                        "name": "Test Project",
+                        "milestones": {
+                            "edges": [
+                                {"node": {"name": "Milestone 1", "issues": {"totalCount": 2}}},
+                                {"node": {"name": "Milestone 2", "issues": {"totalCount": 0}}},
+                            ],
+                        },
+                    },
+                },
+            ],
+        )
+
+    async def test_node(self):
+        status_code, d = await self.execute(
+            """
+            query project ($id: ID!) {
+              project (id: $id) {
+                name
+              }
+            }
+            """,
+            {"id": to_global_id("ProjectType", self.project.pk)},
+        )
+        self.assertEqual(status_code, 200)
+        self.assertEqual(d, {"data": {"project": {"name": "Test Project"}}})
+
+    async def test_introspection(self):
+        status_code, d = await self.execute(
+            """
+            query project ($id: ID!) {
+              __typename
+              project (id: $id) {
+                __typename
+                name
+              }
+              __type (name: "ProjectType") {
+                name
+              }
+              __schema {
+                queryType {
+                  name
+                }
+              }
+            }
+            """,
+            {"id": to_global_id("ProjectType", self.project.pk)},
+        )
+        self.assertEqual(status_code, 200)
+        self.assertEqual(
+            d,
+            {
+                "data": {
+                    "__typename": "Query",
+                    "project": {"__typename": "ProjectType", "name": "Test Project"},
+                    "__type": {"name": "ProjectType"},
+                    "__schema": {"queryType": {"name": "Query"}},
+                },
+            },
+        )
+
+    async def test_mutation(self):
+        status_code, d = await self.execute(
+            """
+            mutation projectCreate {
+              projectCreate (input: {name: "Async Project"}) {
+                project {
+                  name
+                }
+                errors {
+                  field
+                  message
+                }
+              }
+            }
+            """
+        )
+        self.assertEqual(status_code, 200)
+        self.assertEqual(
+            d["data"]["projectCreate"],
+            {"project": {"name": "Async Project"}, "errors": []},
+        )
+        self.assertTrue(await Project.objects.filter(name="Async Project").aexists())
+
+    async def test_multipart(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        operations = {
+            "query": "query { projects { edges { node { name } } } }",
+            "variables": {},
+        }
+        r = await self.async_client.post(
+            self.GRAPHQL_URL,
+            {"operations": json.dumps(operations), "map": "{}"},
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(
+            json.loads(r.content),
+            {"data": {"projects": {"edges": [{"node": {"name": "Test Project"}}]}}},
+        )
+
+    async def test_errors(self):
+        status_code, d = await self.execute("query { foobar }")
+        self.assertEqual(status_code, 400)
+        self.assertIn("errors", d)
+
+        r = await self.async_client.put(self.GRAPHQL_URL)
+        self.assertEqual(r.status_code, 405)
+
+        r = await self.async_client.get(
+            self.GRAPHQL_URL,
+            {"query": 'mutation { projectDelete (input: {id: "x"}) { errors { field } } }'},
+        )
+        self.assertEqual(r.status_code, 405)
+
+    async def test_sync_mutation(self):
+        calls = []
+
+        class ProjectCreate(graphene.Mutation):
+            class Arguments:
+                name = graphene.String(required=True)
+
+            name = graphene.String()
+
+            @staticmethod
+            def mutate(root, info, name):
+                calls.append(name)
+                return ProjectCreate(name=Project.objects.create(name=name).name)
+
+        class Mutation(graphene.ObjectType):
+            project_create = ProjectCreate.Field()
+
+        view = AsyncGraphQLView.as_view(
+            schema=graphene.Schema(query=schema.query, mutation=Mutation)
+        )
+        request = RequestFactory().post(
+            self.GRAPHQL_URL,
+            json.dumps({"query": 'mutation { projectCreate (name: "Sync") { name } }'}),
+            content_type="application/json",
+        )
+        r = await view(request)
+        self.assertEqual(json.loads(r.content), {"data": {"projectCreate": {"name": "Sync"}}})
+        # Run in a thread from the start, never retried after failing in the event loop
+        self.assertEqual(calls, ["Sync"])
+        self.assertEqual(await Project.objects.filter(name="Sync").acount(), 1)
+
+
+class TestUploads(BaseTestCase):
+    query = "query { projects { edges { node { name } } } }"
+
+    def post(self, contents):
+        files = [SimpleUploadedFile(f"file{i}.txt", c) for i, c in enumerate(contents)]
+        return self.client.post(
+            self.GRAPHQL_URL,
+            {
+                "operations": json.dumps(
+                    {"query": self.query, "variables": {"files": [None] * len(files)}},
+                ),
+                "map": json.dumps({str(i): [f"variables.files.{i}"] for i in range(len(files))}),
+                **{str(i): f for i, f in enumerate(files)},
+            },
+        )
+
+    def test_obj_set(self):
+        obj = {"variables": {"files": [None, None]}}
+        _obj_set(obj, "variables.files.1", "1")
+        _obj_set(obj, "variables.input.file", "2")
+        _obj_set(obj, "variables.input.others.file", "3")
+        self.assertEqual(
+            obj,
+            {
+                "variables": {
+                    "files": [None, "1"],
+                    "input": {"file": "2", "others": {"file": "3"}},
+                },
+            },
+        )
+
+    def test_get_graphql_params(self):
+        request = RequestFactory().post(
+            self.GRAPHQL_URL,
+            {
+                "operations": json.dumps({"query": self.query, "variables": {"file": None}}),
+                "map": json.dumps({"0": ["variables.file"]}),
+                "0": SimpleUploadedFile("foo.txt", b"foo"),
+            },
+        )
+        query, variables, _, _ = GraphQLView.get_graphql_params(request, request.POST)
+        self.assertEqual(query, self.query)
+        self.assertEqual(variables, {"file": "0"})
+        self.assertEqual(request.FILES["0"].read(), b"foo")
+
+    def test_upload_limits(self):
+        files = [b"x" * 100, b"y"]
+        self.assertEqual(self.post(files).status_code, 200)
+
+        with override_settings(GRAPHENE_DJANGO_PLUS={"UPLOAD_MAX_FILE_SIZE": 50}):
+            r = self.post(files)
+            self.assertEqual(r.status_code, 413)
+            self.assertEqual(
+                json.loads(r.content)["errors"][0]["message"],
+                "File file0.txt exceeds the maximum file size.",
+            )
+            self.assertEqual(self.post(files[1:]).status_code, 200)
+
+        with override_settings(GRAPHENE_DJANGO_PLUS={"UPLOAD_MAX_SIZE": 5000}):
+            self.assertEqual(self.post(files).status_code, 200)
+            self.assertEqual(self.post(files * 30).status_code, 413)
+
+    def test_invalid_operations(self):
+        r = self.client.post(self.GRAPHQL_URL, {"operations": "{", "map": "{}"})
+        self.assertEqual(r.status_code, 400)
+
+
+class TestPersistedQueries(BaseTestCase):
+    query = "query { projects { edges { node { name } } } }"
+    result = {"data": {"projects": {"edges": [{"node": {"name": "Test Project"}}]}}}
+
+    def setUp(self):
+        super().setUp()
+        f = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        self.addCleanup(os.remove, f.name)
+        with f:
+            json.dump({"projects": self.query}, f)
+
+        settings = override_settings(GRAPHENE_DJANGO_PLUS={"PERSISTED_QUERIES": f.name})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.manifest = f.name
+
+    def post(self, data, url=None):
+        r = self.client.post(
+            url or self.GRAPHQL_URL,
+            json.dumps(data),
+            content_type="application/json",
+        )
+        return r.status_code, json.loads(r.content)
+
+    def test_persisted_query(self):
+        self.assertEqual(self.post({"id": "projects"}), (200, self.result))
+        self.assertEqual(self.post({"id": "projects"}, url="/graphql-async"), (200, self.result))
+        self.assertEqual(self.client.get(self.GRAPHQL_URL, {"id": "projects"}).json(), self.result)
+
+        with mock.patch("graphene_django_plus.views.parse") as parse:
+            self.assertEqual(self.post({"id": "projects"}), (200, self.result))
+        parse.assert_not_called()
+
+        status_code, d = self.post({"id": "foobar"})
+        self.assertEqual(status_code, 400)
+        self.assertEqual(d["errors"][0]["message"], "Unknown persisted query: foobar")
+
+        self.assertEqual(self.post({"query": self.query}), (200, self.result))
+
+    def test_persisted_queries_only(self):
+        with override_settings(
+            GRAPHENE_DJANGO_PLUS={
+                "PERSISTED_QUERIES": self.manifest,
+                "PERSISTED_QUERIES_ONLY": True,
+            }
+        ):
+            self.assertEqual(self.post({"id": "projects"}), (200, self.result))
+
+            status_code, d = self.post({"query": self.query})
+            self.assertEqual(status_code, 400)
+            self.assertEqual(d["errors"][0]["message"], "Only persisted queries are allowed.")
+
+    def test_invalid_manifest(self):
+        with open(self.manifest, "w") as f:
+            json.dump({"foobar": "query { foobar }"}, f)
+
+        with self.assertRaisesMessage(ImproperlyConfigured, "Persisted query foobar is not valid"):
+            load_persisted_documents(schema.graphql_schema, self.manifest)
+
+        with self.assertRaisesMessage(ImproperlyConfigured, "Persisted query foobar is not valid"):
+            GraphQLView.as_view(schema=schema)
+
+        with open(self.manifest, "w") as f:
+            f.write("{")
+
+        with self.assertRaisesMessage(ImproperlyConfigured, "Could not load the persisted"):
+            GraphQLView.as_view(schema=schema)
+
+
+class TestDocumentCache(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        views._document_cache.clear()
+
+    def post(self, query):
+        r = self.client.post(
+            self.GRAPHQL_URL,
+            json.dumps({"query": query}),
+            content_type="application/json",
+        )
+        return r.status_code, json.loads(r.content)
+
+    def test_document_cache(self):
+        query = "query { projects { edges { node { name } } } }"
+        result = {"data": {"projects": {"edges": [{"node": {"name": "Test Project"}}]}}}
+
+        self.assertEqual(self.post(query), (200, result))
+        status_code, d = self.post("query { foobar }")
+        self.assertEqual(status_code, 400)
+        self.assertEqual(get_document_cache_info(), CacheInfo(0, 2, 1024, 2))
+
+        with mock.patch("graphene_django_plus.views.parse") as parse:
+            self.assertEqual(self.post(query), (200, result))
+            self.assertEqual(self.post("query { foobar }"), (status_code, d))
+            self.assertEqual(self.post(query), (200, result))
+        parse.assert_not_called()
+        self.assertEqual(get_document_cache_info(), CacheInfo(3, 2, 1024, 2))
+
+        with override_settings(GRAPHENE_DJANGO_PLUS={"DOCUMENT_CACHE_SIZE": 1}):
+            self.assertEqual(self.post(query), (200, result))
+            self.assertEqual(get_document_cache_info(), CacheInfo(4, 2, 1024, 2))
+            self.post("query { projects { totalCount } }")
+            self.assertEqual(get_document_cache_info(), CacheInfo(4, 3, 1, 1))
+
+        with override_settings(GRAPHENE_DJANGO_PLUS={"DOCUMENT_CACHE_SIZE": 0}):
+            self.assertEqual(self.post(query), (200, result))
+            self.assertEqual(get_document_cache_info(), CacheInfo(4, 3, 1, 1))
+
+    def test_invalid_query(self):
+        status_code, d = self.post(123)
+        self.assertEqual(status_code, 400)
+        self.assertEqual(d, {"errors": [{"message": "object of type 'int' has no len()"}]})
+
+
+class TestBatch(BaseTestCase):
+    GRAPHQL_URL = "/graphql-batch"
+
+    query = """
+        query issue ($id: ID!) {
+          issue (id: $id) {
+            name
+          }
+        }
+    """
+
+    def post(self, operations, url=None):
+        r = self.client.post(
+            url or self.GRAPHQL_URL,
+            json.dumps(operations),
+            content_type="application/json",
+        )
+        return r.status_code, json.loads(r.content)
+
+    def get_operations(self, issues):
+        return [
+            {"id": i, "query": self.query, "variables": {"id": to_global_id("IssueType", issue.pk)}}
+            for i, issue in enumerate(issues)
+        ]
+
+    def test_batch(self):
+        issue_1, issue_2 = self.allowed_issues
+        for url in [self.GRAPHQL_URL, "/graphql-batch-async"]:
+            status_code, d = self.post(self.get_operations([issue_2, issue_1, issue_2]), url=url)
+            self.assertEqual(status_code, 200)
+            self.assertEqual(
+                d,
+                [
+                    {"id": 0, "status": 200, "data": {"issue": {"name": issue_2.name}}},
+                    {"id": 1, "status": 200, "data": {"issue": {"name": issue_1.name}}},
+                    {"id": 2, "status": 200, "data": {"issue": {"name": issue_2.name}}},
+                ],
+            )
+
+    def test_batch_shares_context(self):
+        with CaptureQueriesContext(connection) as single:
+            self.post(self.get_operations(self.allowed_issues[:1]))
+        with CaptureQueriesContext(connection) as batch:
+            self.post(self.get_operations(self.allowed_issues[:1] * 3))
+
+        # the session, the user and the permissions are loaded only once and
+        # the repeated node is memoized by the request's node loader
+        self.assertEqual(len(batch), len(single))
+
+    def test_batch_max_size(self):
+        with override_settings(GRAPHENE_DJANGO_PLUS={"BATCH_MAX_SIZE": 2}):
+            self.assertEqual(self.post(self.get_operations(self.allowed_issues))[0], 200)
+
+            status_code, d = self.post(self.get_operations(self.issues))
+            self.assertEqual(status_code, 400)
+            self.assertEqual(
+                d["errors"][0]["message"],
+                "Batch requests are limited to 2 operations.",
+            )
+
+
+def _upper_encoder(data, pretty=False):
+    return json.dumps(data).upper().encode()
+
+
+class TestJSONEncoder(BaseTestCase):
+    data = {
+        "decimal": decimal.Decimal("1.10"),
+        "datetime": datetime.datetime(2050, 1, 1, 12, 30, 0, 123456),
+        "datetime_utc": datetime.datetime(2050, 1, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        "date": datetime.date(2050, 1, 1),
+        "time": datetime.time(12, 30, 0, 123456),
+        "timedelta": datetime.timedelta(hours=1),
+        "uuid": uuid.UUID("b8c5e2d4-9a36-4b6b-9f3e-6f0f4b9c0a1d"),
+        "list": [1, "á", 2**70],
+    }
+    expected = {
+        "decimal": "1.10",
+        "datetime": "2050-01-01T12:30:00.123",
+        "datetime_utc": "2050-01-01T12:30:00Z",
+        "date": "2050-01-01",
+        "time": "12:30:00.123",
+        "timedelta": "P0DT01H00M00S",
+        "uuid": "b8c5e2d4-9a36-4b6b-9f3e-6f0f4b9c0a1d",
+        "list": [1, "á", 2**70],
+    }
+
+    def assert_json_dumps(self):
+        content = json_dumps(self.data)
+        self.assertIsInstance(content, bytes)
+        self.assertNotIn(b" ", content)
+        self.assertEqual(json.loads(content), self.expected)
+
+        content = json_dumps(self.data, pretty=True)
+        self.assertEqual(json.loads(content), self.expected)
+        self.assertTrue(content.startswith(b'{\n  "date": "2050-01-01",\n'))
+
+    @unittest.skipUnless(has_orjson, "orjson is not installed")
+    def test_json_dumps_orjson(self):
+        self.assert_json_dumps()
+        # Only the data orjson can't encode falls back to the stdlib's json
+        with mock.patch("graphene_django_plus.views.json.dumps", wraps=json.dumps) as dumps:
+            json_dumps({"list": [1, 2]})
+            dumps.assert_not_called()
+
+    @mock.patch("graphene_django_plus.views.has_orjson", False)
+    def test_json_dumps(self):
+        self.assert_json_dumps()
+
+    def test_json_encoder_setting(self):
+        query = "query { projects { edges { node { name } } } }"
+        with override_settings(
+            GRAPHENE_DJANGO_PLUS={"JSON_ENCODER": "tests.test_views._upper_encoder"}
+        ):
+            r = self.query(query)
+            self.assertEqual(
+                json.loads(r.content),
+                {"DATA": {"PROJECTS": {"EDGES": [{"NODE": {"NAME": "TEST PROJECT"}}]}}},
+            )
+
+            r = self.client.put(self.GRAPHQL_URL)
+            self.assertEqual(r.status_code, 405)
+            self.assertIn(b"ERRORS", r.content)
@@ -1,9 +1,12 @@
 from django.urls import path
 
-from graphene_django_plus.views import GraphQLView
+from graphene_django_plus.views import AsyncGraphQLView, GraphQLView
 
 from .schema import schema
 
 urlpatterns = [
     path(r"graphql", GraphQLView.as_view(graphiql=True, schema=schema)),
+    path(r"graphql-async", AsyncGraphQLView.as_view(graphiql=True, schema=schema)),
+    path(r"graphql-batch", GraphQLView.as_view(batch=True, schema=schema)),
+    path(r"graphql-batch-async", AsyncGraphQLView.as_view(batch=True, schema=schema)),
 ]